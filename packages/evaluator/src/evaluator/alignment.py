@@ -0,0 +1,57 @@
+"""
+Prompt alignment scoring.
+
+Lexical stand-in for the embedding-based scorer described in todo.md:
+a track counts as "aligned" when its title or artist shares a content
+word with the prompt. Cheap enough to run over whole benchmark sweeps.
+"""
+
+import re
+from functools import lru_cache
+from typing import FrozenSet
+
+from evaluator.compact import PlaylistRecord
+
+MAX_SCORE = 10.0
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS: FrozenSet[str] = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how",
+    "i", "if", "in", "into", "is", "it", "its", "me", "my", "of", "on", "or",
+    "s", "so", "that", "the", "their", "them", "they", "this", "to", "was",
+    "what", "when", "while", "who", "with", "would", "you", "your",
+    "playlist", "playlists", "song", "songs", "music", "soundtrack", "track",
+    "tracks", "listen", "listening",
+})
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: str) -> FrozenSet[str]:
+    """Lowercased content words of `text`, with stopwords removed (memoized:
+    prompts and popular tracks recur across a sweep)."""
+    return frozenset(w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS)
+
+
+def score_alignment(playlist: PlaylistRecord) -> float:
+    """
+    Scores how strongly the tracks reference the prompt.
+
+    Args:
+        playlist: Prompt and tracks to score.
+
+    Returns:
+        float: Fraction of tracks sharing a content word with the prompt,
+            scaled to 0..MAX_SCORE. Empty playlists score 0.
+    """
+    tracks = playlist.tracks
+    if not tracks:
+        return 0.0
+    prompt_words = tokenize(playlist.prompt)
+    if not prompt_words:
+        return 0.0
+    hits = sum(
+        1 for title, artist in tracks
+        if not prompt_words.isdisjoint(tokenize(title)) or not prompt_words.isdisjoint(tokenize(artist))
+    )
+    return MAX_SCORE * hits / len(playlist.tracks)
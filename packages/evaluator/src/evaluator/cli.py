@@ -0,0 +1,265 @@
+"""
+Evaluator CLI
+=============
+
+Bridges the generator's benchmark output and the evaluator models.
+Rows are streamed from CSV files written by the benchmark runners
+(`json` column for the OpenAI runner, `output` for the Ollama runner)
+or from JSONL files, converted into `PlaylistInput`, scored in
+fixed-size chunks, and appended to a JSONL file one `EvaluationResult`
+per line. Memory use is bounded by the chunk size, not the input size.
+
+Usage
+-----
+    playlist-evaluate output/20250101_120000 -o scores.jsonl --chunk-size 256
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from evaluator.cohesion import make_cohesion_component
+from evaluator.compact import PlaylistRecord, TrackTable
+from evaluator.models import PlaylistInput
+from evaluator.scorer import DEFAULT_COMPONENTS, score_record
+from evaluator.track_store import TrackStore
+
+# Benchmark CSV cells hold whole model outputs; lift the 128 KiB default.
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+SOURCE_SUFFIXES = (".csv", ".jsonl")
+PLAYLIST_COLUMNS = ("json", "output", "tracks")
+META_FIELDS = ("model", "effort", "verbosity")
+
+
+@dataclass
+class ScoreStats:
+    """Running counters for a scoring pass."""
+    rows_read: int = 0
+    rows_scored: int = 0
+    rows_skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_scored / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def iter_source_files(path: Path, exclude: Optional[Path] = None) -> Iterator[Path]:
+    """Yields `path` itself, or every CSV/JSONL file in it (sorted) if it is a directory."""
+    if path.is_dir():
+        skip = exclude.resolve() if exclude else None
+        for child in sorted(path.iterdir()):
+            if child.is_file() and child.suffix in SOURCE_SUFFIXES and child.resolve() != skip:
+                yield child
+    else:
+        yield path
+
+
+def iter_rows(path: Path, exclude: Optional[Path] = None) -> Iterator[Dict[str, object]]:
+    """
+    Lazily yields raw benchmark rows from a file or run directory.
+
+    Args:
+        path: A CSV/JSONL file or a run directory containing them.
+        exclude: File to leave out of a directory scan (e.g. the output file).
+
+    Yields:
+        dict: One row per CSV record or JSONL line. Blank JSONL lines and
+            lines that are not JSON objects are skipped.
+    """
+    for source in iter_source_files(path, exclude):
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            if source.suffix == ".jsonl":
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(row, dict):
+                        yield row
+            else:
+                yield from csv.DictReader(f)
+
+
+def row_to_record(row: Dict[str, object]) -> Optional[PlaylistRecord]:
+    """
+    Converts a benchmark row into the compact scoring representation.
+
+    Args:
+        row: Raw row from `iter_rows`.
+
+    Returns:
+        PlaylistRecord or None: None for error rows, summary rows, and rows
+            whose playlist column is missing or not a JSON array of tracks.
+            Track entries without string title/artist are dropped.
+    """
+    prompt = row.get("prompt")
+    model = row.get("model")
+    if not isinstance(prompt, str) or not prompt:
+        return None
+    if isinstance(model, str) and model.startswith("ERROR"):
+        return None
+
+    raw = None
+    for column in PLAYLIST_COLUMNS:
+        if row.get(column):
+            raw = row[column]
+            break
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(raw, list):
+        return None
+
+    return PlaylistRecord(prompt, TrackTable.from_raw(raw))
+
+
+def row_to_playlist(row: Dict[str, object]) -> Optional[PlaylistInput]:
+    """Converts a benchmark row into a PlaylistInput (see `row_to_record`)."""
+    record = row_to_record(row)
+    return record.to_input() if record is not None else None
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Yields successive lists of at most `size` items."""
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_stream(
+        rows: Iterable[Dict[str, object]],
+        out: TextIO,
+        chunk_size: int = 256,
+        progress: Optional[Callable[[ScoreStats], None]] = None,
+        **scorer_kwargs,
+) -> ScoreStats:
+    """
+    Scores rows chunk by chunk and writes one JSON line per result.
+
+    Args:
+        rows: Raw benchmark rows, typically from `iter_rows`.
+        out: Text stream receiving JSONL records; flushed after each chunk.
+        chunk_size: Rows converted and scored per batch.
+        progress: Optional callback invoked with the running stats after each chunk.
+        **scorer_kwargs: Forwarded to `score_record` (components, weights).
+
+    Returns:
+        ScoreStats: Final counters for the pass.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    stats = ScoreStats()
+    start = time.perf_counter()
+    for chunk in chunked(rows, chunk_size):
+        converted: List[Tuple[Dict[str, object], PlaylistRecord]] = []
+        for row in chunk:
+            record = row_to_record(row)
+            if record is None:
+                stats.rows_skipped += 1
+            else:
+                converted.append((row, record))
+        stats.rows_read += len(chunk)
+
+        lines = []
+        for row, record in converted:
+            scored = score_record(record, **scorer_kwargs)
+            meta = {field: row.get(field) for field in META_FIELDS if field in row}
+            lines.append(json.dumps(scored.to_dict(meta), ensure_ascii=False))
+        if lines:
+            out.write("\n".join(lines) + "\n")
+            out.flush()
+        stats.rows_scored += len(lines)
+        stats.elapsed = time.perf_counter() - start
+        if progress:
+            progress(stats)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _print_progress(stats: ScoreStats) -> None:
+    print(
+        f"\rscored {stats.rows_scored} / read {stats.rows_read} rows "
+        f"({stats.rows_per_sec:.1f} rows/s, {stats.rows_skipped} skipped)",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="playlist-evaluate",
+        description="Score benchmark CSV/JSONL output into EvaluationResult JSONL.",
+    )
+    parser.add_argument("source", type=Path, help="Benchmark run directory or a single CSV/JSONL file.")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Output JSONL path (default: <source dir>/evaluation_results.jsonl).")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Rows scored per batch.")
+    parser.add_argument("--track-store", type=Path, default=None,
+                        help="Track metadata SQLite store; enables the Cohesion component.")
+    parser.add_argument("--quiet", action="store_true", help="Disable progress reporting.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.source.exists():
+        print(f"error: {args.source} does not exist", file=sys.stderr)
+        return 2
+    if args.track_store is not None and not args.track_store.is_file():
+        print(f"error: track store {args.track_store} does not exist", file=sys.stderr)
+        return 2
+
+    output = args.output
+    if output is None:
+        base = args.source if args.source.is_dir() else args.source.parent
+        output = base / "evaluation_results.jsonl"
+
+    components = dict(DEFAULT_COMPONENTS)
+    store = None
+    if args.track_store is not None:
+        store = TrackStore(str(args.track_store))
+        components["Cohesion"] = make_cohesion_component(store)
+
+    try:
+        with open(output, "w", encoding="utf-8") as out:
+            stats = score_stream(
+                iter_rows(args.source, exclude=output),
+                out,
+                chunk_size=args.chunk_size,
+                progress=None if args.quiet else _print_progress,
+                components=components,
+            )
+    finally:
+        if store is not None:
+            store.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(
+        f"Scored {stats.rows_scored} of {stats.rows_read} rows "
+        f"({stats.rows_skipped} skipped) in {stats.elapsed:.2f}s "
+        f"[{stats.rows_per_sec:.1f} rows/s] -> {output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Musical cohesion scoring.
+
+Uses metadata from the track store (see `evaluator.track_store`):
+genre overlap across the playlist and the spread of bounded audio
+features. Tracks the store does not know are ignored.
+"""
+
+from collections import Counter
+from statistics import pstdev
+from typing import Callable, List, Optional
+
+from evaluator.alignment import MAX_SCORE
+from evaluator.compact import PlaylistRecord
+from evaluator.track_store import TrackMetadata, TrackStore
+
+# Features on a 0..1 scale, whose population stdev is at most 0.5
+UNIT_FEATURES = ("danceability", "energy", "valence", "acousticness")
+
+
+def genre_overlap(metadata: List[TrackMetadata]) -> Optional[float]:
+    """Share of genre-tagged tracks carrying the playlist's most common genre."""
+    tagged = [m.genres for m in metadata if m.genres]
+    if len(tagged) < 2:
+        return None
+    counts = Counter(g for genres in tagged for g in set(genres))
+    return counts.most_common(1)[0][1] / len(tagged)
+
+
+def feature_consistency(metadata: List[TrackMetadata]) -> Optional[float]:
+    """1 minus the mean normalized spread of UNIT_FEATURES (1.0 = identical)."""
+    spreads = []
+    for name in UNIT_FEATURES:
+        values = [v for v in (m.feature(name) for m in metadata) if v is not None]
+        if len(values) >= 2:
+            spreads.append(min(pstdev(values) / 0.5, 1.0))
+    if not spreads:
+        return None
+    return 1.0 - sum(spreads) / len(spreads)
+
+
+def score_cohesion(playlist: PlaylistRecord, store: TrackStore) -> float:
+    """
+    Scores how well the tracks belong together.
+
+    Args:
+        playlist: Prompt and tracks to score.
+        store: Track metadata store to read genres and features from.
+
+    Returns:
+        float: Mean of genre overlap and feature consistency scaled to
+            0..MAX_SCORE; 0 when fewer than two tracks have metadata.
+    """
+    metadata = list(store.get_many(playlist.tracks).values())
+    if len(metadata) < 2:
+        return 0.0
+    parts = [p for p in (genre_overlap(metadata), feature_consistency(metadata)) if p is not None]
+    if not parts:
+        return 0.0
+    return MAX_SCORE * sum(parts) / len(parts)
+
+
+def make_cohesion_component(store: TrackStore) -> Callable[[PlaylistRecord], float]:
+    """Binds `score_cohesion` to a store for use as a scorer component."""
+    return lambda playlist: score_cohesion(playlist, store)
@@ -0,0 +1,103 @@
+"""
+Compact internal representation used inside scoring.
+
+The Pydantic models in `evaluator.models` validate data at the API
+boundary; once data is trusted, scoring runs on these slotted, frozen
+dataclasses instead. Tracks are stored struct-of-arrays style (one tuple
+of titles, one of artists), so a playlist costs two tuples rather than
+one validated model object per track. Conversions back to the Pydantic
+models use `model_construct`, which skips re-validation.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from evaluator.models import EvaluationResult, PlaylistInput, ScoreComponent, Track
+
+
+@dataclass(frozen=True, slots=True)
+class TrackTable:
+    """Column-oriented track list: `titles[i]` is by `artists[i]`."""
+    titles: Tuple[str, ...] = ()
+    artists: Tuple[str, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return zip(self.titles, self.artists)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, str]]) -> "TrackTable":
+        pairs = tuple(pairs)
+        if not pairs:
+            return cls()
+        titles, artists = zip(*pairs)
+        return cls(titles, artists)
+
+    @classmethod
+    def from_tracks(cls, tracks: Iterable[Track]) -> "TrackTable":
+        return cls.from_pairs((t.title, t.artist) for t in tracks)
+
+    @classmethod
+    def from_raw(cls, items: Iterable[Any]) -> "TrackTable":
+        """Builds a table from decoded JSON, keeping only dicts with string title/artist."""
+        return cls.from_pairs(
+            (item["title"], item["artist"])
+            for item in items
+            if isinstance(item, dict)
+            and isinstance(item.get("title"), str)
+            and isinstance(item.get("artist"), str)
+        )
+
+    def to_tracks(self) -> List[Track]:
+        return [Track.model_construct(title=t, artist=a) for t, a in self]
+
+    def to_dicts(self) -> List[Dict[str, str]]:
+        return [{"title": t, "artist": a} for t, a in self]
+
+
+@dataclass(frozen=True, slots=True)
+class PlaylistRecord:
+    """Trusted prompt plus tracks, the unit every scoring component receives."""
+    prompt: str
+    tracks: TrackTable
+
+    @classmethod
+    def from_input(cls, playlist: PlaylistInput) -> "PlaylistRecord":
+        return cls(playlist.prompt, TrackTable.from_tracks(playlist.tracks))
+
+    def to_input(self) -> PlaylistInput:
+        return PlaylistInput.model_construct(prompt=self.prompt, tracks=self.tracks.to_tracks())
+
+
+@dataclass(frozen=True, slots=True)
+class ScoredRecord:
+    """Scoring output before conversion to `EvaluationResult`."""
+    prompt: str
+    overall_score: float
+    components: Tuple[Tuple[str, float], ...]
+    max_value: float
+    tracks: TrackTable
+
+    def to_result(self) -> EvaluationResult:
+        return EvaluationResult.model_construct(
+            prompt=self.prompt,
+            overall_score=self.overall_score,
+            components=[
+                ScoreComponent.model_construct(name=n, value=v, max_value=self.max_value)
+                for n, v in self.components
+            ],
+            evaluated_tracks=self.tracks.to_tracks(),
+        )
+
+    def to_dict(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Same shape as `EvaluationResult.model_dump()`, with `extra` keys first."""
+        data: Dict[str, Any] = dict(extra) if extra else {}
+        data["prompt"] = self.prompt
+        data["overall_score"] = self.overall_score
+        data["components"] = [
+            {"name": n, "value": v, "max_value": self.max_value} for n, v in self.components
+        ]
+        data["evaluated_tracks"] = self.tracks.to_dicts()
+        return data
@@ -0,0 +1,83 @@
+"""
+Aggregation of component scores into a single EvaluationResult.
+
+Each component is a callable taking a `PlaylistRecord` (see
+`evaluator.compact`) and returning a value on 0..MAX_SCORE. The overall
+score is the weighted mean of the components expressed as a percentage.
+
+`score_record` is the hot path used for bulk scoring; `evaluate_playlist`
+is the validated API that accepts and returns Pydantic models.
+"""
+
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+from evaluator.alignment import MAX_SCORE, score_alignment
+from evaluator.compact import PlaylistRecord, ScoredRecord
+from evaluator.models import EvaluationResult, PlaylistInput
+
+ComponentFn = Callable[[PlaylistRecord], float]
+
+DEFAULT_COMPONENTS: Dict[str, ComponentFn] = {
+    "Alignment": score_alignment,
+}
+
+
+def score_record(
+        record: PlaylistRecord,
+        components: Optional[Mapping[str, ComponentFn]] = None,
+        weights: Optional[Mapping[str, float]] = None,
+) -> ScoredRecord:
+    """
+    Scores a trusted playlist without constructing any Pydantic objects.
+
+    Args:
+        record: Prompt and tracks to score.
+        components: Name -> scoring function. Defaults to DEFAULT_COMPONENTS.
+        weights: Optional per-component weights; missing names weigh 1.0.
+
+    Returns:
+        ScoredRecord: Overall score (0..100) plus per-component values.
+    """
+    components = DEFAULT_COMPONENTS if components is None else components
+    weights = weights or {}
+
+    parts = []
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for name, fn in components.items():
+        value = float(fn(record))
+        weight = float(weights.get(name, 1.0))
+        parts.append((name, value))
+        weighted_sum += weight * value
+        total_weight += weight
+
+    overall = 100.0 * weighted_sum / (total_weight * MAX_SCORE) if total_weight else 0.0
+    return ScoredRecord(record.prompt, overall, tuple(parts), MAX_SCORE, record.tracks)
+
+
+def evaluate_playlist(
+        playlist: PlaylistInput,
+        components: Optional[Mapping[str, ComponentFn]] = None,
+        weights: Optional[Mapping[str, float]] = None,
+) -> EvaluationResult:
+    """
+    Scores a playlist with every component and combines the results.
+
+    Args:
+        playlist: Prompt and tracks to score.
+        components: Name -> scoring function. Defaults to DEFAULT_COMPONENTS.
+        weights: Optional per-component weights; missing names weigh 1.0.
+
+    Returns:
+        EvaluationResult: Overall score (0..100) plus per-component scores.
+    """
+    return score_record(PlaylistRecord.from_input(playlist), components, weights).to_result()
+
+
+def evaluate_many(
+        playlists: Iterable[PlaylistInput],
+        components: Optional[Mapping[str, ComponentFn]] = None,
+        weights: Optional[Mapping[str, float]] = None,
+) -> List[EvaluationResult]:
+    """Scores a batch of playlists with the same components and weights."""
+    return [evaluate_playlist(p, components, weights) for p in playlists]
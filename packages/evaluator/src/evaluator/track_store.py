@@ -0,0 +1,86 @@
+"""
+Read-only access to the track metadata store.
+
+The store is a SQLite file written by the generator's enrichment step
+(`utils.track_store` in playlist-genai). Generated (title, artist) pairs
+resolve to a Spotify track through the indexed `lookups` table; this
+module only depends on that file format.
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+FEATURE_COLUMNS = (
+    "danceability",
+    "energy",
+    "valence",
+    "tempo",
+    "acousticness",
+    "instrumentalness",
+    "speechiness",
+    "loudness",
+)
+
+
+def lookup_key(text: str) -> str:
+    """Case- and whitespace-insensitive key; must match the generator's."""
+    return " ".join(str(text).casefold().split())
+
+
+@dataclass(frozen=True, slots=True)
+class TrackMetadata:
+    id: str
+    genres: Tuple[str, ...]
+    # Aligned with FEATURE_COLUMNS; None where Spotify had no value
+    features: Tuple[Optional[float], ...]
+
+    def feature(self, name: str) -> Optional[float]:
+        return self.features[FEATURE_COLUMNS.index(name)]
+
+
+_QUERY = f"""
+SELECT t.id, t.genres, {", ".join(f"t.{c}" for c in FEATURE_COLUMNS)}
+FROM lookups l JOIN tracks t ON t.id = l.track_id
+WHERE l.title_key = ? AND l.artist_key = ?
+"""
+
+
+class TrackStore:
+    """Memoizing reader over a track metadata database."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._cache: Dict[Tuple[str, str], Optional[TrackMetadata]] = {}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "TrackStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, title: str, artist: str) -> Optional[TrackMetadata]:
+        """Metadata for a generated (title, artist), or None if never enriched."""
+        key = (lookup_key(title), lookup_key(artist))
+        if key in self._cache:
+            return self._cache[key]
+        row = self._conn.execute(_QUERY, key).fetchone()
+        meta = None
+        if row:
+            meta = TrackMetadata(row[0], tuple(json.loads(row[1] or "[]")), tuple(row[2:]))
+        self._cache[key] = meta
+        return meta
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], TrackMetadata]:
+        """Metadata for every pair that resolves; unknown pairs are omitted."""
+        found = {}
+        for title, artist in pairs:
+            meta = self.get(title, artist)
+            if meta is not None:
+                found[(title, artist)] = meta
+        return found
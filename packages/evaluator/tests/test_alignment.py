@@ -0,0 +1,35 @@
+from evaluator.alignment import MAX_SCORE, score_alignment, tokenize
+from evaluator.compact import PlaylistRecord
+from evaluator.models import PlaylistInput, Track
+
+
+def _record(prompt, tracks):
+    return PlaylistRecord.from_input(PlaylistInput(prompt=prompt, tracks=tracks))
+
+
+def test_tokenize_drops_stopwords_and_case():
+    # test that filler words and playlist vocabulary are ignored
+    assert tokenize("Songs for a Rainy Day") == {"rainy", "day"}
+
+
+def test_alignment_counts_tracks_referencing_prompt():
+    # test that half the tracks referencing the prompt gives half the max score
+    playlist = _record(
+        "Music for a rainy afternoon",
+        [
+            Track(title="Rainy Days and Mondays", artist="Carpenters"),
+            Track(title="Africa", artist="Toto"),
+        ],
+    )
+    assert score_alignment(playlist) == MAX_SCORE / 2
+
+
+def test_alignment_matches_artist_names():
+    # test that artist names count as thematic references
+    playlist = _record("Queen of the kitchen", [Track(title="Bicycle Race", artist="Queen")])
+    assert score_alignment(playlist) == MAX_SCORE
+
+
+def test_alignment_empty_playlist_scores_zero():
+    # test that a playlist without tracks cannot be aligned
+    assert score_alignment(_record("Anything", [])) == 0.0
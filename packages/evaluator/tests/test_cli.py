@@ -0,0 +1,87 @@
+from evaluator.cli import iter_rows, main, row_to_playlist, score_stream
+import csv
+import io
+import json
+
+
+FIELDS = ["prompt", "model", "effort", "verbosity", "json"]
+
+
+def _write_benchmark_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def _row(prompt, tracks, model="gpt-5-nano"):
+    return {
+        "prompt": prompt,
+        "model": model,
+        "effort": "minimal",
+        "verbosity": "low",
+        "json": json.dumps(tracks),
+    }
+
+
+def test_row_to_playlist_parses_json_column():
+    # test that the OpenAI runner's json column becomes a PlaylistInput
+    playlist = row_to_playlist(_row("Rain", [{"title": "Rain", "artist": "The Beatles"}, {"title": "x"}]))
+    assert playlist.prompt == "Rain"
+    assert [t.title for t in playlist.tracks] == ["Rain"]
+
+
+def test_row_to_playlist_rejects_error_and_malformed_rows():
+    # test that error rows, summary rows and non-array output are skipped
+    assert row_to_playlist({"prompt": "p", "model": "ERROR: boom"}) is None
+    assert row_to_playlist({"model": "=== Summary by Model ==="}) is None
+    assert row_to_playlist({"prompt": "p", "json": '"JSON ERROR"'}) is None
+    assert row_to_playlist({"prompt": "p", "output": "not json"}) is None
+
+
+def test_iter_rows_reads_csv_and_jsonl_from_run_dir(tmp_path):
+    # test that a run directory yields rows from every CSV and JSONL file
+    _write_benchmark_csv(tmp_path / "a.csv", [_row("p1", [])])
+    (tmp_path / "b.jsonl").write_text(
+        json.dumps({"prompt": "p2", "tracks": []}) + "\n\nnot json\n", encoding="utf-8"
+    )
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    assert [r["prompt"] for r in iter_rows(tmp_path)] == ["p1", "p2"]
+
+
+def test_score_stream_writes_results_per_chunk():
+    # test that results are flushed chunk by chunk with run metadata attached
+    rows = [_row(f"p{i}", [{"title": "Song", "artist": "Band"}]) for i in range(5)]
+    rows.append({"prompt": "bad", "model": "ERROR: x"})
+    out = io.StringIO()
+    seen = []
+
+    stats = score_stream(iter(rows), out, chunk_size=2, progress=lambda s: seen.append(s.rows_read))
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(records) == 5
+    assert records[0]["model"] == "gpt-5-nano"
+    assert records[0]["components"][0]["name"] == "Alignment"
+    assert stats.rows_read == 6 and stats.rows_scored == 5 and stats.rows_skipped == 1
+    assert seen == [2, 4, 6]
+
+
+def test_main_scores_run_directory(tmp_path, capsys):
+    # test the CLI end to end against a run directory
+    _write_benchmark_csv(tmp_path / "results.csv", [_row("p", [{"title": "Song", "artist": "Band"}])])
+
+    assert main([str(tmp_path), "--quiet"]) == 0
+
+    out_file = tmp_path / "evaluation_results.jsonl"
+    lines = out_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    assert "Scored 1 of 1 rows" in capsys.readouterr().out
+
+
+def test_main_reports_missing_track_store(tmp_path, capsys):
+    _write_benchmark_csv(tmp_path / "results.csv", [_row("p", [{"title": "Song", "artist": "Band"}])])
+
+    assert main([str(tmp_path), "--quiet", "--track-store", str(tmp_path / "missing.sqlite")]) == 2
+    assert "track store" in capsys.readouterr().err
+    assert not (tmp_path / "evaluation_results.jsonl").exists()
@@ -0,0 +1,66 @@
+from evaluator.cohesion import genre_overlap, make_cohesion_component, score_cohesion
+from evaluator.compact import PlaylistRecord, TrackTable
+from evaluator.track_store import FEATURE_COLUMNS, TrackMetadata, TrackStore
+import json
+import sqlite3
+import pytest
+
+
+def _features(**values):
+    return tuple(values.get(c) for c in FEATURE_COLUMNS)
+
+
+def _write_store(path, tracks):
+    # mirror of the generator's schema, reduced to the columns read here
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tracks (id TEXT PRIMARY KEY, genres TEXT, "
+        + ", ".join(f"{c} REAL" for c in FEATURE_COLUMNS) + ")"
+    )
+    conn.execute("CREATE TABLE lookups (title_key TEXT, artist_key TEXT, track_id TEXT, PRIMARY KEY (title_key, artist_key))")
+    for i, (title, artist, genres, energy) in enumerate(tracks):
+        conn.execute(
+            "INSERT INTO tracks (id, genres, energy) VALUES (?, ?, ?)",
+            (f"t{i}", json.dumps(genres), energy),
+        )
+        conn.execute("INSERT INTO lookups VALUES (?, ?, ?)", (title.lower(), artist.lower(), f"t{i}"))
+    conn.commit()
+    conn.close()
+
+
+def test_genre_overlap_uses_most_common_genre():
+    # test that two of three tracks sharing a genre gives 2/3 overlap
+    meta = [
+        TrackMetadata("a", ("rock", "pop"), _features()),
+        TrackMetadata("b", ("rock",), _features()),
+        TrackMetadata("c", ("jazz",), _features()),
+    ]
+    assert genre_overlap(meta) == pytest.approx(2 / 3)
+
+
+def test_store_lookup_is_case_and_space_insensitive(tmp_path):
+    # test that generated titles resolve regardless of casing and spacing
+    path = tmp_path / "tracks.db"
+    _write_store(path, [("Starman", "David Bowie", ["glam rock"], 0.5)])
+    with TrackStore(str(path)) as store:
+        meta = store.get("  STARMAN", "david   bowie")
+        assert meta.genres == ("glam rock",)
+        assert meta.feature("energy") == 0.5
+        assert store.get("Unknown", "Nobody") is None
+
+
+def test_score_cohesion_rewards_uniform_playlists(tmp_path):
+    # test that a same-genre, same-energy playlist outscores a mixed one
+    path = tmp_path / "tracks.db"
+    _write_store(path, [
+        ("A", "X", ["disco"], 0.8),
+        ("B", "X", ["disco"], 0.8),
+        ("C", "Y", ["metal"], 0.0),
+    ])
+    with TrackStore(str(path)) as store:
+        uniform = PlaylistRecord("p", TrackTable.from_pairs([("A", "X"), ("B", "X")]))
+        mixed = PlaylistRecord("p", TrackTable.from_pairs([("A", "X"), ("C", "Y")]))
+        unknown = PlaylistRecord("p", TrackTable.from_pairs([("Q", "Z"), ("A", "X")]))
+        assert score_cohesion(uniform, store) == pytest.approx(10.0)
+        assert score_cohesion(mixed, store) < score_cohesion(uniform, store)
+        assert make_cohesion_component(store)(unknown) == 0.0
@@ -0,0 +1,59 @@
+from evaluator.compact import PlaylistRecord, ScoredRecord, TrackTable
+from evaluator.models import EvaluationResult, PlaylistInput, Track
+from evaluator.scorer import evaluate_playlist, score_record
+import pytest
+
+
+def test_track_table_is_slotted_and_immutable():
+    # test that tables carry no per-instance dict and cannot be mutated
+    table = TrackTable.from_pairs([("Starman", "David Bowie")])
+    assert not hasattr(table, "__dict__")
+    with pytest.raises(AttributeError):
+        table.titles = ()
+
+
+def test_track_table_from_raw_filters_malformed_entries():
+    # test that decoded JSON entries without string title/artist are dropped
+    table = TrackTable.from_raw([
+        {"title": "Hey Jude", "artist": "The Beatles"},
+        {"title": "No artist"},
+        {"title": 1, "artist": "x"},
+        "garbage",
+    ])
+    assert list(table) == [("Hey Jude", "The Beatles")]
+
+
+def test_empty_track_table():
+    # test that an empty table has no rows
+    table = TrackTable.from_pairs([])
+    assert len(table) == 0
+    assert table.to_tracks() == []
+
+
+def test_playlist_record_round_trip():
+    # test that PlaylistInput -> PlaylistRecord -> PlaylistInput preserves data
+    playlist = PlaylistInput(
+        prompt="Space",
+        tracks=[Track(title="Starman", artist="David Bowie"), Track(title="Rocket Man", artist="Elton John")],
+    )
+    record = PlaylistRecord.from_input(playlist)
+    assert record.tracks.titles == ("Starman", "Rocket Man")
+    assert record.to_input() == playlist
+
+
+def test_scored_record_dict_matches_model_dump():
+    # test that the fast serializer emits the same shape as EvaluationResult.model_dump
+    record = PlaylistRecord("Space", TrackTable.from_pairs([("Starman", "David Bowie")]))
+    scored = score_record(record)
+    assert isinstance(scored, ScoredRecord)
+    result = scored.to_result()
+    assert isinstance(result, EvaluationResult)
+    assert scored.to_dict() == result.model_dump()
+    assert scored.to_dict({"model": "m"})["model"] == "m"
+
+
+def test_evaluate_playlist_matches_fast_path():
+    # test that the validated API and the compact path agree
+    playlist = PlaylistInput(prompt="Space", tracks=[Track(title="Space Oddity", artist="David Bowie")])
+    fast = score_record(PlaylistRecord.from_input(playlist))
+    assert evaluate_playlist(playlist).overall_score == fast.overall_score
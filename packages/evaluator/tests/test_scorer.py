@@ -0,0 +1,41 @@
+from evaluator.models import EvaluationResult, PlaylistInput, Track
+from evaluator.scorer import evaluate_many, evaluate_playlist
+import pytest
+
+
+def _playlist():
+    return PlaylistInput(
+        prompt="Space cadets",
+        tracks=[Track(title="Space Oddity", artist="David Bowie")],
+    )
+
+
+def test_evaluate_playlist_returns_result_with_components():
+    # test that the default components produce a well-formed result
+    res = evaluate_playlist(_playlist())
+    assert isinstance(res, EvaluationResult)
+    assert res.prompt == "Space cadets"
+    assert [c.name for c in res.components] == ["Alignment"]
+    assert 0.0 <= res.overall_score <= 100.0
+    assert res.evaluated_tracks[0].title == "Space Oddity"
+
+
+def test_evaluate_playlist_weighted_average():
+    # test that weights shift the overall score toward heavier components
+    components = {"A": lambda p: 10.0, "B": lambda p: 0.0}
+    res = evaluate_playlist(_playlist(), components=components, weights={"A": 3.0})
+    assert res.overall_score == pytest.approx(75.0)
+
+
+def test_evaluate_playlist_without_components_scores_zero():
+    # test that an empty component set does not divide by zero
+    res = evaluate_playlist(_playlist(), components={})
+    assert res.overall_score == 0.0
+    assert res.components == []
+
+
+def test_evaluate_many_preserves_order():
+    # test that batch scoring returns one result per input in order
+    other = PlaylistInput(prompt="Other", tracks=[])
+    results = evaluate_many([_playlist(), other])
+    assert [r.prompt for r in results] == ["Space cadets", "Other"]
@@ -0,0 +1,297 @@
+"""
+Local Spotify Stand-in
+======================
+
+A small HTTP server implementing the slice of Spotify's API this project
+uses, over a local track catalog:
+
+* ``POST /api/token`` — client-credentials token endpoint
+* ``GET /v1/search`` — ``track:<title> artist:<artist>`` queries
+* ``GET /v1/tracks``, ``/v1/artists``, ``/v1/audio-features`` — multi-ID lookups
+
+Latency and HTTP 429s (with ``Retry-After``) can be injected, so caching,
+connection pooling and rate limiting can be load-tested without network
+access. Point the real clients at it through ``SPOTIFY_TOKEN_URL`` and
+``SPOTIFY_API_BASE_URL`` (or the ``token_url`` / ``base_url`` arguments)::
+
+    python -m api_clients.local_spotify --port 8765 --synthetic 5000 --latency-ms 20
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+from urllib.parse import parse_qs, urlparse
+
+from api_clients.spotify_client import MAX_IDS_PER_REQUEST
+
+_QUERY_RE = re.compile(r"track:(.*) artist:(.*)")
+
+
+def synthetic_catalog(n: int, n_artists: int = 97):
+    """
+    Builds `n` tracks over `n_artists` artists.
+
+    Returns:
+        tuple: (tracks, artists) lists in Spotify's object shapes.
+    """
+    artists = [{"id": f"a{j}", "name": f"Artist {j}", "genres": [f"genre-{j % 12}"]} for j in range(n_artists)]
+    tracks = [
+        {
+            "id": f"t{i}",
+            "name": f"Song {i}",
+            "artists": [{"id": f"a{i % n_artists}", "name": f"Artist {i % n_artists}"}],
+            "popularity": i % 100,
+            "duration_ms": 180_000 + i % 60_000,
+        }
+        for i in range(n)
+    ]
+    return tracks, artists
+
+
+def load_catalog(path: str) -> List[dict]:
+    """Reads tracks from a JSON array or a JSONL file of track objects."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class LocalSpotifyServer:
+    """
+    Spotify stand-in served from a background thread.
+
+    Use as a context manager, or call `start()` / `stop()`.
+    """
+
+    def __init__(
+            self,
+            tracks: Sequence[dict] = (),
+            artists: Sequence[dict] = (),
+            features: Optional[Sequence[dict]] = None,
+            latency: Union[float, Callable[[], float]] = 0.0,
+            rate_limit: float = 0.0,
+            burst: int = 10,
+            throttle_every: int = 0,
+            retry_after: float = 1.0,
+            token_lifetime: int = 3600,
+            host: str = "127.0.0.1",
+            port: int = 0,
+    ):
+        """
+        Args:
+            tracks: Catalog track objects (need 'id', 'name', 'artists').
+            artists: Artist objects served by `/artists`.
+            features: Audio-feature objects; None answers `/audio-features`
+                with 403, as Spotify does for apps without access.
+            latency: Seconds added to every response, or a callable
+                returning them (e.g. a sampled distribution).
+            rate_limit: Sustained API requests/second before 429s; 0 disables.
+            burst: Token-bucket capacity for `rate_limit`.
+            throttle_every: Also answer every Nth API request with 429.
+            retry_after: Retry-After seconds sent with injected 429s.
+            token_lifetime: `expires_in` of issued access tokens.
+            host: Interface to bind.
+            port: TCP port; 0 picks a free one.
+        """
+        self.tracks = {t["id"]: t for t in tracks}
+        self.artists = {a["id"]: a for a in artists}
+        self.features = None if features is None else {f["id"]: f for f in features}
+        self._by_name = {}
+        for t in self.tracks.values():
+            for a in t.get("artists", []):
+                self._by_name.setdefault((t["name"].casefold(), a["name"].casefold()), t)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.token_lifetime = token_lifetime
+        self._address = (host, port)
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._api_requests = 0
+        self.requests: List[str] = []
+        self.throttled = 0
+        self.tokens_issued = 0
+        self._server = None
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Web API root, the stand-in for https://api.spotify.com/v1."""
+        return f"{self.root_url}/v1"
+
+    @property
+    def token_url(self) -> str:
+        """Stand-in for https://accounts.spotify.com/api/token."""
+        return f"{self.root_url}/api/token"
+
+    def start(self) -> "LocalSpotifyServer":
+        self._server = ThreadingHTTPServer(self._address, self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+            name="local-spotify",
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "LocalSpotifyServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def count(self, resource: str) -> int:
+        """Number of requests received for `/v1/<resource>`."""
+        with self._lock:
+            return sum(1 for path in self.requests if path.startswith(f"/v1/{resource}"))
+
+    def _delay(self) -> None:
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+    def _should_throttle(self) -> bool:
+        with self._lock:
+            self._api_requests += 1
+            throttle = bool(self.throttle_every) and self._api_requests % self.throttle_every == 0
+            if self.rate_limit > 0 and not throttle:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    throttle = True
+                else:
+                    self._tokens -= 1
+            if throttle:
+                self.throttled += 1
+            return throttle
+
+    def _search(self, query: dict) -> dict:
+        m = _QUERY_RE.match(query.get("q", [""])[0])
+        items = []
+        if m:
+            track = self._by_name.get((m.group(1).casefold(), m.group(2).casefold()))
+            if track is not None:
+                items.append(dict(track, external_urls={"spotify": f"https://open.spotify.com/track/{track['id']}"}))
+        return {"tracks": {"items": items}}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: Iterable = ()) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = parse_qs(self.rfile.read(length).decode("utf-8"))
+                with server._lock:
+                    server.requests.append(url.path)
+                if url.path != "/api/token":
+                    return self._send(404, {"error": "not found"})
+                if not self.headers.get("Authorization", "").startswith("Basic "):
+                    return self._send(401, {"error": "invalid_client"})
+                if body.get("grant_type") != ["client_credentials"]:
+                    return self._send(400, {"error": "unsupported_grant_type"})
+                server._delay()
+                with server._lock:
+                    server.tokens_issued += 1
+                    token = f"local-{server.tokens_issued}-{random.getrandbits(32):08x}"
+                return self._send(200, {"access_token": token, "token_type": "Bearer", "expires_in": server.token_lifetime})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with server._lock:
+                    server.requests.append(url.path)
+                if not self.headers.get("Authorization", "").startswith("Bearer "):
+                    return self._send(401, {"error": {"status": 401, "message": "No token provided"}})
+                if server._should_throttle():
+                    return self._send(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                                      [("Retry-After", f"{server.retry_after:g}")])
+                server._delay()
+                query = parse_qs(url.query)
+                resource = url.path.rsplit("/", 1)[-1]
+                if resource == "search":
+                    return self._send(200, server._search(query))
+                if resource not in MAX_IDS_PER_REQUEST:
+                    return self._send(404, {"error": "not found"})
+                if resource == "audio-features" and server.features is None:
+                    return self._send(403, {"error": "forbidden"})
+                ids = query.get("ids", [""])[0].split(",")
+                if len(ids) > MAX_IDS_PER_REQUEST[resource]:
+                    return self._send(400, {"error": "too many ids"})
+                source = {"tracks": server.tracks, "artists": server.artists,
+                          "audio-features": server.features}[resource]
+                key = "audio_features" if resource == "audio-features" else resource
+                return self._send(200, {key: [source.get(i) for i in ids]})
+
+        return Handler
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve a local Spotify API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--catalog", help="JSON/JSONL file of Spotify track objects")
+    source.add_argument("--synthetic", type=int, default=1000, help="Generate N tracks (default 1000)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/sec before 429s")
+    parser.add_argument("--throttle-every", type=int, default=0, help="429 every Nth request")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    if args.catalog:
+        tracks, artists = load_catalog(args.catalog), ()
+    else:
+        tracks, artists = synthetic_catalog(args.synthetic)
+
+    server = LocalSpotifyServer(
+        tracks, artists, latency=args.latency_ms / 1000, rate_limit=args.rate_limit,
+        throttle_every=args.throttle_every, retry_after=args.retry_after,
+        host=args.host, port=args.port,
+    ).start()
+    print(f"Serving {len(server.tracks)} tracks")
+    print(f"  SPOTIFY_TOKEN_URL={server.token_url}")
+    print(f"  SPOTIFY_API_BASE_URL={server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
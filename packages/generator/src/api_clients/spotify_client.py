@@ -6,71 +6,203 @@ Very thin wrapper around Spotify’s *Search* endpoint, used throughout
 the benchmarking suite to verify that generated song titles actually
 exist on the platform.
 
+Track IDs returned by searches are remembered so their metadata can
+later be fetched in bulk through the multi-ID endpoints
+(`/tracks`, `/artists`, `/audio-features`).
+
 Only the functionality required for playlist-validation is implemented;
 for anything more sophisticated consider using `spotipy`.
 """
 
 
+import os
+
+import requests
+
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import DeadlineExceeded
 from utils.logger_config import logger
 from utils.helpers import logged_request
+
+API_BASE_URL = "https://api.spotify.com/v1"
+
+# Maximum IDs per request accepted by the multi-ID endpoints.
+MAX_IDS_PER_REQUEST = {
+    "tracks": 50,
+    "artists": 50,
+    "audio-features": 100,
+}
+
+
+def format_search_result(title, artist, match):
+    """
+    Builds the `track_exists` result for a search outcome.
+
+    Args:
+        title (str): The track title as requested.
+        artist (str): The artist name as requested.
+        match (dict or None): Track object returned by the search, if any.
+
+    Returns:
+        list: [found (bool), "title, artist, <urls or failure message>"].
+    """
+    if match:
+        return [True, f"{title}, {artist}, {match['external_urls']}"]
+    return [False, f"{title}, {artist}, Search failed"]
+
+
 class SpotifyClient:
     """
     Provides methods to interact with the Spotify Web API, 
     such as checking if a given track exists.
     """
 
-    def __init__(self, token):
+    def __init__(self, token, base_url=None, session=None, retry_policy=None):
         """
-        Initializes the SpotifyClient with a pre-fetched Spotify token.
+        Initializes the SpotifyClient with a Spotify token or a provider.
+
+        Args:
+            token (dict or TokenHandler): Token data containing
+                'access_token', or an object whose `get_token()` returns
+                it. With a provider the current token is fetched for every
+                request, so the client outlives any single token.
+            base_url (str, optional): Web API root, e.g. a local stand-in.
+                Defaults to $SPOTIFY_API_BASE_URL, then the public API.
+            session (requests.Session, optional): Transport for every
+                request (see `logged_request`).
+            retry_policy (RetryPolicy, optional): Overrides the default
+                retries of `logged_request`.
         """
         self.token = token
+        base_url = base_url or os.environ.get("SPOTIFY_API_BASE_URL") or API_BASE_URL
+        self.base_url = base_url.rstrip("/")
+        self.session = session
+        self.retry_policy = retry_policy
+        # (title, artist) as searched -> Spotify track ID of the first hit
+        self.track_ids = {}
 
-    def track_exists(self, title, artist):
+    def _current_token(self):
+        get_token = getattr(self.token, "get_token", None)
+        return get_token() if get_token else self.token
+
+    def _get(self, url, params):
+        token = self._current_token()
+        try:
+            return self._request(url, params, token)
+        except requests.HTTPError as e:
+            invalidate = getattr(self.token, "invalidate", None)
+            if invalidate is None or e.response is None or e.response.status_code != 401:
+                raise
+        # Revoked or expired early: retry once with a new token
+        logger.warning("Spotify rejected the access token; fetching a new one")
+        invalidate(token)
+        return self._request(url, params)
+
+    def _request(self, url, params, token=None):
+        return logged_request("GET", url, headers=self._headers(token), params=params,
+                              retry_policy=self.retry_policy, session=self.session)
+
+    def _headers(self, token=None):
+        token = token or self._current_token()
+        return {"Authorization": f"Bearer {token['access_token']}"}
+
+    def search_track(self, title, artist):
         """
-        Checks if a track with the given title and artist exists on Spotify.
+        Searches Spotify for a track and returns the best match.
+
+        The match's ID is remembered in `track_ids` under (title, artist).
 
         Args:
             title (str): The track title.
             artist (str): The artist name for the track.
 
         Returns:
-            two-element list: 
-                bool: True if a matching track is found on Spotify, otherwise False.
-                string: track and artist name followed by either 
-                        URL if search is successful or 
-                        failure message if the search is unsuccessful.
+            dict or None: The first matching track object, or None.
 
         Raises:
-            requests.HTTPError: If the Spotify API returns a non-200 status code.
+            requests.RequestException: If the search request fails.
         """
-        
         query = f"track:{title} artist:{artist}"
-        url = "https://api.spotify.com/v1/search"
-        headers = {
-            "Authorization": f"Bearer {self.token['access_token']}"
-        }
+        url = f"{self.base_url}/search"
         params = {
             "q": query,
             "type": "track",
             "limit": 1
         }
 
-        logger.info(f"Searching Spotify for: {title} by {artist}")
-        try:
-            response = logged_request("GET", url, headers=headers, params=params)
+        logger.info("Searching Spotify for: %s by %s", title, artist)
+        response = self._get(url, params)
+        tracks = response.json().get("tracks", {}).get("items", [])
+        if not tracks:
+            return None
+        if tracks[0].get("id"):
+            self.track_ids[(title, artist)] = tracks[0]["id"]
+        return tracks[0]
 
-            data = response.json()
+    def track_exists(self, title, artist):
+        """
+        Checks if a track with the given title and artist exists on Spotify.
 
-            tracks = data.get("tracks", {}).get("items", [])
+        Args:
+            title (str): The track title.
+            artist (str): The artist name for the track.
 
-            # If at least one item exists, print the items and return true
-            if tracks:
-                output_text = (f"{title}, {artist}, {tracks[0]['external_urls']}")
-                return [True, output_text]
-            else:
-                output_text = (f"{title}, {artist}, Search failed")
-                return [False, output_text]
-            
+        Returns:
+            two-element list: 
+                bool: True if a matching track is found on Spotify, otherwise False.
+                string: track and artist name followed by either 
+                        URL if search is successful or 
+                        failure message if the search is unsuccessful.
+        """
+        try:
+            match = self.search_track(title, artist)
+        except (CircuitOpenError, DeadlineExceeded):
+            # Not a missing track: the caller waits for Spotify to recover,
+            # or gives up on a row whose deadline has passed
+            raise
         except Exception as e:
-            logger.error(f"HTTP Error {e}, skipping this track")
+            logger.error("HTTP Error %s, skipping this track", e)
             return [False, f"HTTP Error while searching for {title}, {artist}."]
+        return format_search_result(title, artist, match)
+
+    def get_several(self, resource, ids):
+        """
+        Fetches objects for many IDs through a multi-ID endpoint,
+        issuing one request per batch of at most the endpoint's limit.
+
+        Args:
+            resource (str): One of 'tracks', 'artists', 'audio-features'.
+            ids (iterable): Spotify IDs; duplicates and falsy values are dropped.
+
+        Returns:
+            dict: ID -> object for every ID Spotify returned data for.
+
+        Raises:
+            requests.HTTPError: If a batch request fails after retries.
+        """
+        batch_size = MAX_IDS_PER_REQUEST[resource]
+        # Response key matches the path except for audio features
+        key = "audio_features" if resource == "audio-features" else resource
+        unique_ids = list(dict.fromkeys(i for i in ids if i))
+        results = {}
+        for start in range(0, len(unique_ids), batch_size):
+            batch = unique_ids[start:start + batch_size]
+            response = self._get(f"{self.base_url}/{resource}", {"ids": ",".join(batch)})
+            for item in response.json().get(key) or []:
+                if item and item.get("id"):
+                    results[item["id"]] = item
+        logger.info("Fetched %s/%s %s in %s request(s)", len(results), len(unique_ids),
+                    resource, -(-len(unique_ids) // batch_size))
+        return results
+
+    def get_tracks(self, ids):
+        """Bulk-fetches track objects (50 IDs per request)."""
+        return self.get_several("tracks", ids)
+
+    def get_artists(self, ids):
+        """Bulk-fetches artist objects, which carry genres (50 IDs per request)."""
+        return self.get_several("artists", ids)
+
+    def get_audio_features(self, ids):
+        """Bulk-fetches audio features (100 IDs per request)."""
+        return self.get_several("audio-features", ids)
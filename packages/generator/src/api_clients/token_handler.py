@@ -5,26 +5,46 @@ Spotify Token Handler
 Utility class that obtains, persists, and refreshes Spotify Web API
 access tokens via the *Client Credentials* flow. A valid token is cached
 locally in `token.json` (alongside an `expires_at` timestamp) to minimize
-unnecessary network calls.
+unnecessary network calls, and in memory so repeated lookups are free.
+
+A `TokenHandler` can be handed to `SpotifyClient` in place of a token
+dict; the client then asks it for the current token on every request.
+Within `refresh_margin` seconds of expiry the cached token is still
+returned while a replacement is fetched on a background thread, so long
+sweeps never wait on (or fail at) token expiry. Refreshes are
+single-flight: concurrent callers, whether threads or asyncio tasks
+(via `aget_token`), share one request to the token endpoint.
 
 Environment variables required
 ------------------------------
 SPOTIFY_CLIENT_ID      — Spotify application client-ID  
 SPOTIFY_CLIENT_SECRET  — Spotify application client-secret
+SPOTIFY_TOKEN_URL      — optional token endpoint override (e.g. a local stand-in)
+
+They are read when a handler is created; entry points load `.env` first.
 
-All methods are synchronous and depend only on the `requests` package.
+Depends only on the `requests` package.
 """
 
 
+import asyncio
 import requests
 import base64
 import os
 import json
+import threading
 import time
-from dotenv import load_dotenv
 from pathlib import Path
 
-load_dotenv()
+from utils.logger_config import logger
+
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+# Tokens this close to expiry are treated as expired
+EXPIRY_BUFFER = 60
+
+# Seconds before retrying a failed background refresh
+REFRESH_RETRY_INTERVAL = 30
 
 class TokenHandler:
     """
@@ -32,15 +52,38 @@ class TokenHandler:
     via the client credentials flow, and ensuring it's valid before use.
     """
     
-    def __init__(self):
+    def __init__(self, token_url=None, refresh_margin=300, token_file=None):
         """
         Initializes the TokenHandler by reading Spotify client credentials 
         from environment variables and setting up file paths for token storage.
+
+        Args:
+            token_url (str, optional): Token endpoint. Defaults to
+                $SPOTIFY_TOKEN_URL, then Spotify's accounts service.
+            refresh_margin (float): Seconds before expiry at which a
+                replacement token is fetched in the background.
+            token_file (str, optional): Where the token is persisted.
+                Defaults to `token.json` next to the package sources.
         """
         self.client_id = os.environ.get("SPOTIFY_CLIENT_ID")
         self.client_secret = os.environ.get("SPOTIFY_CLIENT_SECRET")
-        self.token_file = str(Path(__file__).resolve().parent.parent / "token.json")
+        self.token_url = token_url or os.environ.get("SPOTIFY_TOKEN_URL") or TOKEN_URL
+        self.token_file = str(token_file or Path(__file__).resolve().parent.parent / "token.json")
         self.token = {}
+        self.refresh_margin = refresh_margin
+        # Held for the duration of any fetch; makes refreshes single-flight
+        self._lock = threading.Lock()
+        self._retry_at = 0.0
+
+    def __getstate__(self):
+        # Sweep workers receive a copy; locks do not pickle
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
 
     def get_new_token(self):
@@ -58,7 +101,7 @@ class TokenHandler:
         auth_bytes = auth_string.encode("utf-8")
         auth_base64 = base64.b64encode(auth_bytes).decode("utf-8")
 
-        url = "https://accounts.spotify.com/api/token"
+        url = self.token_url
         headers = {
             "Authorization": f"Basic {auth_base64}",
             "Content-Type": "application/x-www-form-urlencoded"
@@ -76,7 +119,7 @@ class TokenHandler:
 
     def save_token(self, token, time):
         """
-        Saves the token data to a local JSON file, 
+        Saves the token data to `token_file`, 
         adding an 'expires_at' timestamp.
 
         Args:
@@ -86,13 +129,16 @@ class TokenHandler:
         token_time = token["expires_in"] + time
         token["expires_at"] = token_time
 
-        with open("token.json", "w") as json_file:
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp_file = f"{self.token_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as json_file:
             json.dump(token, json_file, indent=4, ensure_ascii=True)
+        os.replace(tmp_file, self.token_file)
 
     def check_token(self, token):
         """
         Checks if the given token is still valid.
-        A 60-second buffer is applied so that near-expiry tokens are treated as invalid.
+        A 60-second buffer (`EXPIRY_BUFFER`) is applied so that near-expiry tokens are treated as invalid.
 
         Args:
             token (dict): The token data from file.
@@ -100,7 +146,7 @@ class TokenHandler:
         Returns:
             bool: True if the token is not expired, otherwise False.
         """
-        current_time = time.time() - 60
+        current_time = time.time() - EXPIRY_BUFFER
 
         if token["expires_at"] > current_time:
             return True
@@ -109,22 +155,100 @@ class TokenHandler:
     
     def load_token(self):
         """
-        Loads a valid token from the local file if it exists and is still valid. 
-        Otherwise, request a new token and saves it.
+        Returns a valid token: the in-memory one, else the one in the
+        local file if it is still valid, else a newly requested one
+        (which is saved).
         
         Returns:
             dict: The valid token data (includes 'access_token).
         """
-        if os.path.isfile(self.token_file):
+        return self.get_token()
+
+    def get_token(self):
+        """
+        Returns the current token, fetching one if none is valid.
+
+        Only blocks when there is no usable token; a token inside
+        `refresh_margin` is returned as-is while a background refresh runs.
+        Safe to call from many threads at once.
+
+        Returns:
+            dict: The valid token data (includes 'access_token').
+
+        Raises:
+            requests.HTTPError: If a blocking fetch fails.
+        """
+        token = self.token
+        if token and self.check_token(token):
+            if token["expires_at"] - self.refresh_margin <= time.time():
+                self._refresh_in_background()
+            return token
+
+        with self._lock:
+            # Another caller may have refreshed while we waited
+            if not (self.token and self.check_token(self.token)):
+                self.token = self._read_token_file() or self._fetch()
+            return self.token
+
+    async def aget_token(self):
+        """
+        `get_token` for coroutines: never blocks the event loop, and
+        concurrent tasks share a single fetch.
+        """
+        token = self.token
+        if token and self.check_token(token):
+            return self.get_token()
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self, token=None):
+        """
+        Drops the cached token, e.g. after Spotify rejected it with 401,
+        so the next `get_token` fetches a new one.
 
-            with open(self.token_file, 'r') as file:
+        Args:
+            token (dict, optional): Only drop the cache if it still holds
+                this token (another caller may already have replaced it).
+        """
+        with self._lock:
+            if token is None or self.token is token:
+                self.token = {}
+                try:
+                    os.remove(self.token_file)
+                except FileNotFoundError:
+                    pass
+
+    def _read_token_file(self):
+        if not os.path.isfile(self.token_file):
+            return None
+        try:
+            with open(self.token_file, "r") as file:
                 token = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return token if "expires_at" in token and self.check_token(token) else None
 
-            if self.check_token(token):
-                return token
-            
+    def _fetch(self):
+        # Caller holds self._lock
         current_time = time.time()
         token = self.get_new_token()
         self.save_token(token, current_time)
-
-        return token
\ No newline at end of file
+        return token
+
+    def _refresh_in_background(self):
+        if time.time() < self._retry_at or not self._lock.acquire(blocking=False):
+            # Recently failed, or a refresh is already in flight
+            return
+
+        def refresh():
+            try:
+                self.token = self._fetch()
+                logger.info("Refreshed Spotify token ahead of expiry")
+            except Exception as e:
+                # Network, a malformed token response or an unwritable token
+                # file: back off either way rather than retrying per call
+                self._retry_at = time.time() + REFRESH_RETRY_INTERVAL
+                logger.warning("Background Spotify token refresh failed: %s", e)
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=refresh, name="spotify-token-refresh", daemon=True).start()
@@ -0,0 +1,102 @@
+"""
+Track Metadata Enrichment
+=========================
+
+Turns the track IDs captured by :class:`SpotifyClient` searches into
+stored metadata (genres, popularity, audio features) using Spotify's
+multi-ID endpoints, so enrichment costs one request per 50 tracks
+rather than one per track. Results persist in a
+:class:`utils.track_store.TrackStore` that the evaluator reads from.
+"""
+
+import requests
+
+from utils.logger_config import logger
+from utils.track_store import FEATURE_COLUMNS
+
+
+class TrackEnricher:
+    """
+    Fetches and stores metadata for tracks not yet in the store.
+    """
+
+    def __init__(self, spotify_client, store):
+        """
+        Args:
+            spotify_client (SpotifyClient): Client used for bulk lookups.
+            store (TrackStore): Destination for enriched metadata.
+        """
+        self.spotify_client = spotify_client
+        self.store = store
+
+    def enrich(self, track_ids):
+        """
+        Fetches and stores metadata for every ID missing from the store.
+
+        Audio features are best-effort: the endpoint is unavailable to
+        some Spotify apps, in which case tracks are stored without them.
+
+        Args:
+            track_ids (iterable): Spotify track IDs.
+
+        Returns:
+            int: Number of tracks newly stored.
+        """
+        ids = list(dict.fromkeys(i for i in track_ids if i))
+        known = self.store.known_track_ids(ids)
+        missing = [i for i in ids if i not in known]
+        if not missing:
+            return 0
+
+        tracks = self.spotify_client.get_tracks(missing)
+
+        artist_ids = {a["id"] for t in tracks.values() for a in t.get("artists", []) if a.get("id")}
+        genres_by_artist = self.store.artist_genres(artist_ids)
+        new_artist_ids = artist_ids - genres_by_artist.keys()
+        if new_artist_ids:
+            artists = self.spotify_client.get_artists(new_artist_ids)
+            self.store.upsert_artists(artists.values())
+            genres_by_artist.update((a_id, a.get("genres") or []) for a_id, a in artists.items())
+
+        try:
+            features = self.spotify_client.get_audio_features(tracks.keys())
+        except requests.exceptions.RequestException as e:
+            logger.warning("Audio features unavailable, storing tracks without them: %s", e)
+            features = {}
+
+        rows = []
+        for track_id, track in tracks.items():
+            track_artists = track.get("artists", [])
+            genres = []
+            for a in track_artists:
+                for g in genres_by_artist.get(a.get("id"), []):
+                    if g not in genres:
+                        genres.append(g)
+            row = {
+                "id": track_id,
+                "name": track.get("name", ""),
+                "artists": [a.get("name") for a in track_artists],
+                "artist_ids": [a.get("id") for a in track_artists],
+                "popularity": track.get("popularity"),
+                "duration_ms": track.get("duration_ms"),
+                "genres": genres,
+            }
+            feats = features.get(track_id) or {}
+            row.update((c, feats.get(c)) for c in FEATURE_COLUMNS)
+            rows.append(row)
+
+        self.store.upsert_tracks(rows)
+        logger.info("Enriched %s new tracks (%s already stored)", len(rows), len(known))
+        return len(rows)
+
+    def enrich_from_client(self):
+        """
+        Records the client's (title, artist) -> ID lookups and enriches
+        every captured track.
+
+        Returns:
+            int: Number of tracks newly stored.
+        """
+        captured = dict(self.spotify_client.track_ids)
+        self.store.add_lookups(captured)
+        return self.enrich(captured.values())
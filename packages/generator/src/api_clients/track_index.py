@@ -0,0 +1,249 @@
+"""
+Normalized Track Lookup Index
+=============================
+
+Deduplicating layer in front of :class:`SpotifyClient`. Models spell the
+same song many ways — curly vs straight quotes, em dashes, "(Remastered)"
+or "feat." suffixes, accents — and each spelling used to cost its own
+Spotify search. Titles and artists are reduced to normalized, token-sorted
+keys; a lookup whose key (or a near-identical title by the same artist)
+was already searched is answered from memory.
+
+:class:`TrackLookupIndex` exposes the same `track_exists` interface as the
+client, so benchmarks can use either. Lookups run on worker threads (see
+`OpenAIModelAsyncBenchmark`), so concurrent misses for the same key are
+coalesced: one thread searches, the others wait for its result.
+"""
+
+import difflib
+import re
+import threading
+import unicodedata
+from concurrent.futures import Future
+
+from api_clients.spotify_client import format_search_result
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import DeadlineExceeded
+from utils.logger_config import logger
+from utils.metrics import TRACK_LOOKUPS
+
+_CHAR_MAP = str.maketrans({
+    "‘": "'", "’": "'", "‛": "'", "′": "'", "´": "'", "`": "'",
+    "“": '"', "”": '"', "„": '"', "″": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "―": "-", "−": "-",
+    "&": " and ",
+})
+
+_VERSION_WORDS = (
+    r"remaster(?:ed)?|live|mono|stereo|version|edit|mix|remix|acoustic|demo|"
+    r"single|bonus|deluxe|explicit|clean|instrumental|anniversary|edition"
+)
+# "(Remastered 2011)", "[Live]", "(feat. X)"
+_BRACKET_SUFFIX_RE = re.compile(
+    rf"\s*[\(\[][^\)\]]*\b(?:{_VERSION_WORDS}|feat\.?|ft\.?|featuring)\b[^\)\]]*[\)\]]",
+    re.IGNORECASE,
+)
+# "Song - Remastered 2011", "Song - Radio Edit"
+_DASH_SUFFIX_RE = re.compile(rf"\s+-\s+[^-]*\b(?:{_VERSION_WORDS})\b.*$", re.IGNORECASE)
+# "Artist feat. Other"
+_FEATURING_RE = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s+.*$", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"[^0-9a-z]+")
+
+# Title similarity (0..1) above which two keys by the same artist are one song
+FUZZY_THRESHOLD = 0.92
+# Numbers and roman numerals tell otherwise similar titles apart
+# ("Symphony No. 5"/"No. 6", "Pt. 1"/"Pt. II"); they must match exactly
+_NUMBER_TOKEN_RE = re.compile(r"^(?:\d+|(?=[ivxlcdm]+$)m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3}))$")
+
+
+def fold_text(text):
+    """
+    Unicode-folds and simplifies text: unified quotes and dashes, accents
+    removed, case-folded, apostrophes dropped, other punctuation to spaces.
+    """
+    text = str(text).translate(_CHAR_MAP)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.casefold().replace("'", "")
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def title_key(title):
+    """Token-sorted key for a title with version/featuring suffixes stripped."""
+    text = str(title).translate(_CHAR_MAP)
+    text = _BRACKET_SUFFIX_RE.sub("", text)
+    text = _DASH_SUFFIX_RE.sub("", text)
+    folded = fold_text(text) or fold_text(title)
+    return " ".join(sorted(folded.split()))
+
+
+def artist_key(artist):
+    """Token-sorted key for the primary artist, ignoring a leading 'The'."""
+    text = _FEATURING_RE.sub("", str(artist).translate(_CHAR_MAP))
+    tokens = fold_text(text).split()
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    return " ".join(sorted(tokens))
+
+
+def number_tokens(key):
+    """The numeric and roman-numeral tokens of a normalized key."""
+    return frozenset(t for t in key.split() if _NUMBER_TOKEN_RE.match(t))
+
+
+def track_key(title, artist):
+    """Normalized (title_key, artist_key) pair used to deduplicate lookups."""
+    return title_key(title), artist_key(artist)
+
+
+class TrackLookupIndex:
+    """
+    Caches Spotify search outcomes under normalized track keys.
+
+    Successful and empty searches are cached; failed requests are not,
+    so a transient error doesn't mark a song as missing for the whole run.
+    Threads missing on the same key while a search is in flight share that
+    search (single-flight), including its failure.
+    """
+
+    def __init__(self, spotify_client, fuzzy_threshold=FUZZY_THRESHOLD):
+        """
+        Args:
+            spotify_client (SpotifyClient): Client used on cache misses.
+            fuzzy_threshold (float): Minimum title similarity for a fuzzy
+                hit; set above 1.0 to disable fuzzy matching.
+        """
+        self.client = spotify_client
+        self.fuzzy_threshold = fuzzy_threshold
+        # artist_key -> {title_key: track object or None}
+        self._entries = {}
+        # (title_key, artist_key) -> Future for searches in flight
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(bucket) for bucket in self._entries.values())
+
+    def _find_locked(self, t_key, a_key):
+        """Returns (found, match, fuzzy) for a key pair. Caller holds the lock."""
+        bucket = self._entries.get(a_key)
+        if not bucket:
+            return False, None, False
+        if t_key in bucket:
+            return True, bucket[t_key], False
+        if self.fuzzy_threshold <= 1.0:
+            numbers = number_tokens(t_key)
+            for known, match in bucket.items():
+                if number_tokens(known) != numbers:
+                    continue
+                if difflib.SequenceMatcher(None, t_key, known).ratio() >= self.fuzzy_threshold:
+                    return True, match, True
+        return False, None, False
+
+    def lookup(self, title, artist):
+        """
+        Returns the Spotify match for a track, searching only on a cache miss.
+
+        Args:
+            title (str): The track title.
+            artist (str): The artist name for the track.
+
+        Returns:
+            dict or None: Matching track object, or None if Spotify has none.
+
+        Raises:
+            requests.RequestException: If a cache-miss search fails.
+        """
+        t_key, a_key = track_key(title, artist)
+        leader = False
+        with self._lock:
+            found, match, fuzzy = self._find_locked(t_key, a_key)
+            if found:
+                if fuzzy:
+                    self.fuzzy_hits += 1
+                    TRACK_LOOKUPS.inc(result="fuzzy")
+                else:
+                    self.exact_hits += 1
+                    TRACK_LOOKUPS.inc(result="exact")
+            else:
+                pending = self._inflight.get((t_key, a_key))
+                if pending is None:
+                    pending = Future()
+                    self._inflight[(t_key, a_key)] = pending
+                    leader = True
+                else:
+                    self.coalesced += 1
+                    TRACK_LOOKUPS.inc(result="coalesced")
+
+        if not found and not leader:
+            match = pending.result()
+            found = True
+        if found:
+            if match and match.get("id"):
+                # Record this spelling too so it reaches the track store
+                self.client.track_ids[(title, artist)] = match["id"]
+            return match
+
+        try:
+            match = self.client.search_track(title, artist)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[(t_key, a_key)]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            self.misses += 1
+            TRACK_LOOKUPS.inc(result="miss")
+            self._entries.setdefault(a_key, {})[t_key] = match
+            del self._inflight[(t_key, a_key)]
+        pending.set_result(match)
+        return match
+
+    def track_exists(self, title, artist):
+        """
+        Same contract as :meth:`SpotifyClient.track_exists`, served from
+        the index when an equivalent track was already looked up.
+        """
+        try:
+            match = self.lookup(title, artist)
+        except (CircuitOpenError, DeadlineExceeded):
+            # Not a missing track: the caller waits for Spotify to recover,
+            # or gives up on a row whose deadline has passed
+            raise
+        except Exception as e:
+            logger.error("HTTP Error %s, skipping this track", e)
+            return [False, f"HTTP Error while searching for {title}, {artist}."]
+        return format_search_result(title, artist, match)
+
+    @property
+    def lookups(self):
+        return self.exact_hits + self.fuzzy_hits + self.coalesced + self.misses
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups answered without a Spotify request of their own."""
+        total = self.lookups
+        return (total - self.misses) / total if total else 0.0
+
+    def stats(self):
+        return {
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "coalesced": self.coalesced,
+            "requests": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        return (
+            f"Track index: {s['lookups']} lookups, {s['requests']} Spotify requests, "
+            f"{s['exact_hits']} exact + {s['fuzzy_hits']} fuzzy hits, "
+            f"{s['coalesced']} coalesced (hit rate {s['hit_rate']:.1%})"
+        )
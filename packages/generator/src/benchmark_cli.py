@@ -0,0 +1,151 @@
+"""
+PlaylistGenAI — Benchmark CLI
+=============================
+
+One command line for benchmark sweeps on either backend. What to run —
+backend, prompt file and shard, the model x effort x verbosity matrix,
+concurrency and rate limits, the track-lookup cache and the output
+location — comes from a sweep config file and/or flags (see
+:mod:`benchmarking.sweep_config`)::
+
+    playlist-bench --prompts shuffled_prompts.txt --limit 50 \\
+        --models gpt-5-nano gpt-5-mini --effort minimal low --concurrency 16
+    playlist-bench --config sweeps/nightly.toml --shard 3/8 --print-config
+
+`playlist-openai-bench` and `playlist-ollama-bench` are the same CLI
+with the backend preset. Each run gets its own directory, and the
+resolved config is saved there as ``config.json`` so a sweep can be
+repeated with ``--config <run dir>/config.json``. Every run writes
+metrics snapshots there (and a trace with ``PLAYLIST_TRACE=1``); set
+``PLAYLIST_METRICS_PORT`` to watch them live. Finished runs are
+recorded in the run database (see ``playlist-runs``).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from benchmarking.sweep_config import add_config_args, config_from_args
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+OUTPUT_ROOT = REPO_ROOT / "output"
+
+
+def build_parser(backend=None):
+    name = {"openai": "OpenAI async", "ollama": "Ollama"}.get(backend, "LLM")
+    parser = argparse.ArgumentParser(description=f"Run the {name} playlist benchmark.")
+    add_config_args(parser, backend=backend)
+    return parser
+
+
+def prepare_run_dir(config):
+    """
+    Creates the run directory, fills in the default store paths on
+    `config` and saves the resolved config there.
+
+    Returns:
+        Path: The run directory.
+    """
+    if config.output_dir:
+        run_dir = Path(config.output_dir)
+    else:
+        run_dir = OUTPUT_ROOT / datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    # output_dir is saved only if it was set, so repeating a sweep from its
+    # config.json gets a new timestamped directory instead of this one
+    if config.track_store is None:
+        config.track_store = str(OUTPUT_ROOT / "track_store.sqlite")
+    if config.run_store is None:
+        config.run_store = str(OUTPUT_ROOT / "runs.sqlite")
+    with open(run_dir / "config.json", "w", encoding="utf-8") as f:
+        json.dump(config.to_dict(), f, indent=2, ensure_ascii=False)
+    return run_dir
+
+
+@contextmanager
+def run_telemetry(run_dir):
+    """
+    Metrics and tracing around a run, for either backend.
+
+    Serves live metrics on $PLAYLIST_METRICS_PORT and records spans if
+    $PLAYLIST_TRACE is set. On exit, even if the run failed, writes the
+    metrics snapshots (``metrics.prom``/``metrics.json``) and the trace
+    (``trace.json``, for ui.perfetto.dev) to `run_dir` and stops the
+    server.
+    """
+    from utils.metrics import start_metrics_server, write_snapshot
+    from utils.tracing import TRACER
+
+    run_dir = Path(run_dir)
+    metrics_server = None
+    metrics_port = os.getenv("PLAYLIST_METRICS_PORT")
+    if metrics_port:
+        metrics_server = start_metrics_server(int(metrics_port))
+        print(f"Serving metrics on http://127.0.0.1:{metrics_server.server_address[1]}/metrics")
+    if os.getenv("PLAYLIST_TRACE"):
+        TRACER.enable()
+    try:
+        yield
+    finally:
+        # Also on failure: the metrics and trace are what explain it
+        write_snapshot(str(run_dir / "metrics.prom"))
+        write_snapshot(str(run_dir / "metrics.json"))
+        if TRACER.enabled:
+            TRACER.export_chrome_trace(str(run_dir / "trace.json"))
+        if metrics_server is not None:
+            metrics_server.shutdown()
+            metrics_server.server_close()
+
+
+def run(config):
+    """Runs the sweep described by `config` on its backend."""
+    run_dir = prepare_run_dir(config)
+    started_at = time.time()
+    with run_telemetry(run_dir):
+        if config.backend == "openai":
+            from openai_api_async_main import main_async
+
+            asyncio.run(main_async(config, run_dir))
+        else:
+            from benchmark_main import run as run_ollama
+
+            run_ollama(config, run_dir)
+    record_run(config, run_dir, started_at)
+    return run_dir
+
+
+def record_run(config, run_dir, started_at=None):
+    """Loads the run's results CSV into the run database, if enabled."""
+    csv_path = Path(run_dir) / config.csv_name()
+    if not config.run_store or not csv_path.exists():
+        return None
+    from utils.run_store import RunStore
+
+    with RunStore(config.run_store) as store:
+        run_id = store.import_csv(csv_path, backend=config.backend, started_at=started_at,
+                                  config=config.to_dict())
+    print(f"Recorded run {run_id} in {config.run_store}")
+    return run_id
+
+
+def main(argv=None, backend=None):
+    parser = build_parser(backend)
+    args = parser.parse_args(argv)
+    try:
+        config = config_from_args(args)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.print_config:
+        print(json.dumps(config.to_dict(), indent=2, ensure_ascii=False))
+        return 0
+    run(config)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
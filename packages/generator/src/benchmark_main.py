@@ -14,76 +14,67 @@ Key collaborators
 -----------------
 • **TokenHandler** – acquires/caches Spotify API tokens  
 • **SpotifyClient** – validates that each suggested track exists on Spotify  
+• **TrackLookupIndex** – collapses near-duplicate track look-ups  
 • **ModelBenchmark** – orchestrates prompts, collects metrics,  
   and writes *ollama_benchmark_results.csv*
 
 Run this file directly to regenerate the CSV and console-print progress.
+Models, prompts, cache mode and output location come from the benchmark
+CLI (:mod:`benchmark_cli`) with the backend preset to Ollama.
 """
 
+import os
 
 
-from benchmarking.model_benchmark import ModelBenchmark
-from api_clients.token_handler import TokenHandler
-from api_clients.spotify_client import SpotifyClient
-
-def main():
-    """Run the full Ollama model benchmark matrix.
+def run(config, run_dir):
+    """Run the Ollama model benchmark matrix.
 
     Workflow
     --------
-    1. Define `models_to_test` and `prompts_to_test`.
+    1. Take models and prompts from the :class:`SweepConfig`.
     2. Fetch or refresh a Spotify token with :class:`TokenHandler`.
-    3. Build a :class:`SpotifyClient` for per-track validation.
+    3. Build a :class:`SpotifyClient` for per-track validation, behind
+       the configured track-lookup cache.
     4. Instantiate :class:`ModelBenchmark` and invoke
        :py:meth:`ModelBenchmark.run_benchmarks`.
     5. Persist detailed rows **plus** model/prompt summaries to
-       *ollama_benchmark_results.csv*.
+       *ollama_benchmark_results.csv* in `run_dir`.
 
     All heavy lifting happens inside :class:`ModelBenchmark`; this
     function simply wires the components together.
     """
-    
-    # list of models to test
-    models_to_test = [
-        'gemma2:2b',
-        # 'llama3.2:latest',
-        # 'gemma3:latest',
-        # 'llama3.2:3b-instruct-q8_0',
-        # 'mistral:latest',
-        # 'gemma3:4b-it-q8_0',
-    ]  
-
-    # list of prompts to test
-    prompts_to_test = [
-        "Playlist for aliens trying to blend in at a human barbecue",
-        # "The Joker’s grocery shopping playlist",
-        # "Songs your microwave would choose if it gained sentience",
-        # "Music for awkward elevator rides with strangers",
-        # "Songs to pretend you're the main character in a rom-com",
-        # "Playlist for aggressively matching Tupperware lids",
-        # "Playlist for a wizard accidentally trapped in the modern world",
-        # "Songs you'd hear at a boring office birthday party",
-        # "Songs for cats secretly planning to overthrow humanity",
-        # "Playlist for Sherlock Holmes solving the case of missing socks",
-        # "The robot uprising’s battle playlist (but it’s all disco)",
-        # "Music for dramatically flipping through magazines in waiting rooms",
-        # "Playlist for aliens trying human pizza for the first time",
-        # "What music plays in Shrek’s mind while he's meditating",
-        # "Songs to listen to while seductively making a sandwich"
-    ]
-
-    csv_file_path = "ollama_benchmark_results.csv"
+    # Imported here so importing this module (e.g. from tests or tooling)
+    # does not pull in requests and the benchmark stack
+    from dotenv import load_dotenv
+    from benchmarking.model_benchmark import ModelBenchmark
+    from benchmarking.sweep_config import track_lookup
+    from api_clients.token_handler import TokenHandler
+    from api_clients.spotify_client import SpotifyClient
+
+    load_dotenv()
+
+    csv_file_path = os.path.join(str(run_dir), config.csv_name())
 
     token_handler = TokenHandler()
 
-    token = token_handler.load_token()
+    token_handler.load_token()
 
-    spotify_client = SpotifyClient(token)
+    spotify_client = track_lookup(SpotifyClient(token_handler), config.cache)
 
-    benchmarker = ModelBenchmark(models=models_to_test,
-                               prompts=prompts_to_test,
-                               output_csv=csv_file_path, spotify_client=spotify_client)
+    benchmarker = ModelBenchmark(models=config.models,
+                               prompts=config.load_prompts(),
+                               output_csv=csv_file_path, spotify_client=spotify_client,
+                               stream=config.stream)
     benchmarker.run_benchmarks()
-        
+    if hasattr(spotify_client, "format_stats"):
+        print(spotify_client.format_stats())
+
+
+def main(argv=None):
+    from benchmark_cli import main as cli_main
+
+    return cli_main(argv, backend="ollama")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -9,9 +9,15 @@ import csv
 import json
 import threading
 from pathlib import Path
-from utils.helpers import extract_array, has_keys
+from utils.helpers import has_keys
+from utils.json_scan import scan_array
+from utils.tracing import span
 
 class BaseBenchmark:
+    # Longest a row pauses for an open circuit (backend outage) before it
+    # is recorded as an error row to be re-run
+    max_outage_wait = 900.0
+
     def __init__(self, prompts, models, output_csv, spotify_client):
         """
         Initializes the BaseBenchmark with prompts, models, and I/O configuration.
@@ -88,22 +94,27 @@ class BaseBenchmark:
         """
         Attempts to load and repair a playlist from a JSON string.
 
+        Output that is not valid JSON as a whole is scanned for the first
+        array of objects: code fences, surrounding prose, trailing commas
+        and a truncated tail are tolerated (see `utils.json_scan`).
+
         Args:
             input_text (str): The model's raw output string.
 
         Returns:
             object: Parsed playlist object (list or error string).
         """
+        if not isinstance(input_text, str):
+            # e.g. OllamaManager's {"error": ...} on a failed request
+            return f"JSON ERROR \n {input_text}"
         try:
-            playlist = json.loads(input_text)
-
+            return json.loads(input_text)
         except json.JSONDecodeError:
-            fixed_text = extract_array(input_text[1:])
-            try:
-                playlist = json.loads(fixed_text)
-            except json.JSONDecodeError:
-                return f"JSON ERROR \n {input_text}"
+            pass
 
+        playlist = scan_array(input_text, objects_only=True)
+        if playlist is None:
+            return f"JSON ERROR \n {input_text}"
         return playlist
 
     def validate_tracks(self, playlist):
@@ -116,21 +127,31 @@ class BaseBenchmark:
         Returns:
             tuple: (int valid, int total, str output_text)
         """
-        valid, total = 0, 0
-        output_text = ""
-
         if not isinstance(playlist, list):
-            return (valid, total, playlist)
-
-        for track in playlist:
-            if has_keys(track, "title", "artist"):
-                total += 1
-                results = self.spotify_client.track_exists(track["title"], track["artist"])
-                if results[0] == True:
-                    valid += 1
-                output_text = output_text + results[1] + '\n'
-        
-        return(valid, total, output_text)
-
-        
-        
+            return (0, 0, playlist)
+
+        return self.tally_checks([self.check_track(track) for track in playlist
+                                  if has_keys(track, "title", "artist")])
+
+    def check_track(self, track):
+        """
+        Checks one track (a dict with 'title' and 'artist') on Spotify.
+
+        Returns:
+            tuple: (bool found, str result line)
+        """
+        with span("spotify.lookup", title=track["title"], artist=track["artist"]) as s:
+            results = self.spotify_client.track_exists(track["title"], track["artist"])
+            s.set(found=bool(results[0]))
+        return results[0] == True, results[1]
+
+    @staticmethod
+    def tally_checks(checks):
+        """
+        Combines `check_track` results, in playlist order.
+
+        Returns:
+            tuple: (int valid, int total, str output_text), as `validate_tracks`.
+        """
+        valid = sum(1 for found, _ in checks if found)
+        return (valid, len(checks), "".join(line + "\n" for _, line in checks))
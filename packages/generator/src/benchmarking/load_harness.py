@@ -0,0 +1,609 @@
+"""
+Offline load harness for the benchmark runners.
+
+Drives :class:`OpenAIModelAsyncBenchmark` and :class:`ModelBenchmark`
+against simulated OpenAI, Ollama and Spotify backends, so the runner's
+own throughput and overhead can be measured without API quota or
+network access. Each backend has a configurable latency distribution,
+error rate and token-bucket rate limit; the simulated LLMs return
+deterministic playlists drawn from a synthetic catalog.
+
+Only the transport is simulated: retries, JSON conversion, validation,
+the track index and the CSV sink all run the production code paths.
+
+Run from the generator ``src`` directory::
+
+    python -m benchmarking.load_harness --backend openai --rows 500 --concurrency 25
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import requests
+
+from api_clients.spotify_client import SpotifyClient
+from api_clients.track_index import TrackLookupIndex
+from benchmarking.model_benchmark import ModelBenchmark
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+from playlist_generation.llm_manager import OllamaManager
+from playlist_generation.openai_async_manager import OpenAIAsyncManager
+from utils.retry_policy import RetryPolicy
+
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    Latency distribution in seconds.
+
+    `kind` is one of 'fixed' (always `median`), 'uniform' (median ±
+    spread*median), 'exponential' (mean `median`) or 'lognormal'
+    (median `median`, sigma `spread`).
+    """
+    median: float = 0.01
+    kind: str = "lognormal"
+    spread: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed" or self.median <= 0:
+            return max(0.0, self.median)
+        if self.kind == "uniform":
+            half = self.median * self.spread
+            return max(0.0, rng.uniform(self.median - half, self.median + half))
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.median)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.median), self.spread)
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+
+@dataclass(frozen=True)
+class BackendProfile:
+    """
+    Behaviour of one simulated backend.
+
+    Attributes:
+        latency: Per-call latency distribution.
+        error_rate: Fraction of admitted calls failing with a 5xx.
+        rate_limit: Sustained requests/second before 429s; 0 disables.
+        burst: Token-bucket capacity for the rate limit.
+    """
+    latency: Latency = field(default_factory=Latency)
+    error_rate: float = 0.0
+    rate_limit: float = 0.0
+    burst: int = 10
+
+
+class SimulatedBackend:
+    """Decides latency and outcome for each call against a profile. Thread-safe."""
+
+    def __init__(self, name: str, profile: BackendProfile, seed: int = 0):
+        self.name = name
+        self.profile = profile
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(profile.burst)
+        self._refilled = time.monotonic()
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def decide(self):
+        """
+        Returns:
+            tuple: (delay seconds, outcome 'ok'|'error'|'throttled',
+            retry-after seconds or None)
+        """
+        p = self.profile
+        with self._lock:
+            self.calls += 1
+            delay = p.latency.sample(self._rng)
+            if p.rate_limit > 0:
+                now = time.monotonic()
+                self._tokens = min(p.burst, self._tokens + (now - self._refilled) * p.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    self.throttled += 1
+                    # Rejections are cheap for the server
+                    return min(delay, 0.001), "throttled", (1 - self._tokens) / p.rate_limit
+                self._tokens -= 1
+            if p.error_rate and self._rng.random() < p.error_rate:
+                self.errors += 1
+                return delay, "error", None
+            return delay, "ok", None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors, "throttled": self.throttled}
+
+
+class PlaylistSynth:
+    """
+    Deterministic playlists over a synthetic catalog.
+
+    Each prompt maps to the same tracks on every run, drawn from
+    `catalog_size` tracks so repeated lookups exercise the track index.
+    A stable `found_rate` fraction of tracks exists "on Spotify".
+    """
+
+    def __init__(self, catalog_size: int = 2000, tracks_per_playlist: int = 25,
+                 found_rate: float = 0.8, seed: int = 0):
+        self.catalog_size = catalog_size
+        self.tracks_per_playlist = tracks_per_playlist
+        self.found_rate = found_rate
+        self.seed = seed
+
+    def tracks(self, prompt: str) -> List[dict]:
+        rng = random.Random(zlib.crc32(f"{self.seed}:{prompt}".encode("utf-8")))
+        k = min(self.tracks_per_playlist, self.catalog_size)
+        return [
+            {"title": f"Simulated Song {i}", "artist": f"Simulated Artist {i % 97}"}
+            for i in rng.sample(range(self.catalog_size), k)
+        ]
+
+    def freeform(self, prompt: str) -> str:
+        return "\n".join(f"{t['title']} — {t['artist']}" for t in self.tracks(prompt))
+
+    @staticmethod
+    def to_json(freeform_text: str) -> str:
+        playlist = []
+        for line in freeform_text.splitlines():
+            title, sep, artist = line.partition(" — ")
+            if sep:
+                playlist.append({"title": title.strip(), "artist": artist.strip()})
+        return json.dumps(playlist)
+
+    def search(self, title: str, artist: str) -> Optional[dict]:
+        h = zlib.crc32(f"{title}|{artist}".encode("utf-8"))
+        if h % 1000 >= self.found_rate * 1000:
+            return None
+        track_id = f"sim{h:08x}"
+        return {"id": track_id, "name": title,
+                "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"}}
+
+
+def _chunks(text: str, size: int = 16) -> List[str]:
+    """`text` in token-sized pieces, as a streamed response delivers it."""
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class SimulatedAPIError(Exception):
+    """Error shaped like the OpenAI SDK's APIStatusError."""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status
+        headers = {"Retry-After": f"{retry_after:.3f}"} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+class SimulatedOpenAIClient:
+    """AsyncOpenAI stand-in serving `responses.create` from a simulated backend."""
+
+    def __init__(self, backend: SimulatedBackend, synth: PlaylistSynth):
+        self.backend = backend
+        self.synth = synth
+        self.responses = SimpleNamespace(create=self._create)
+        # Batch API: batches complete on the poll after they are created
+        self.files = SimpleNamespace(create=self._file_create, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._batch_create, retrieve=self._batch_retrieve)
+        self._files: Dict[str, str] = {}
+        self._batches: Dict[str, SimpleNamespace] = {}
+
+    def _complete(self, input: str, instructions: str):
+        if "JSON" in instructions:
+            text = self.synth.to_json(input)
+        else:
+            text = self.synth.freeform(input)
+        usage = SimpleNamespace(input_tokens=len(input) // 4, output_tokens=len(text) // 4)
+        usage.total_tokens = usage.input_tokens + usage.output_tokens
+        return text, usage
+
+    async def _create(self, *, input: str, instructions: str = "", stream: bool = False, **_):
+        delay, outcome, retry_after = self.backend.decide()
+        if not stream:
+            await asyncio.sleep(delay)
+        if outcome == "throttled":
+            raise SimulatedAPIError(429, "Rate limit exceeded", retry_after)
+        if outcome == "error":
+            raise SimulatedAPIError(500, "Server error")
+        text, usage = self._complete(input, instructions)
+        if stream:
+            return self._stream(text, usage, delay)
+        return SimpleNamespace(output_text=text, usage=usage)
+
+    @staticmethod
+    async def _stream(text: str, usage, delay: float):
+        """Response events with the text spread evenly over `delay`."""
+        chunks = _chunks(text)
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            yield SimpleNamespace(type="response.output_text.delta", delta=chunk)
+        yield SimpleNamespace(type="response.completed",
+                              response=SimpleNamespace(output_text=text, usage=usage))
+
+    async def _file_create(self, *, file, purpose: str):
+        file_id = f"file-{len(self._files)}"
+        data = file.read()
+        self._files[file_id] = data.decode("utf-8") if isinstance(data, bytes) else data
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    async def _file_content(self, file_id: str):
+        return SimpleNamespace(text=self._files[file_id])
+
+    async def _batch_create(self, *, input_file_id: str, endpoint: str, completion_window: str):
+        batch = SimpleNamespace(id=f"batch-{len(self._batches)}", status="in_progress",
+                                input_file_id=input_file_id, output_file_id=None,
+                                error_file_id=None, request_counts=None)
+        self._batches[batch.id] = batch
+        return batch
+
+    async def _batch_retrieve(self, batch_id: str):
+        batch = self._batches[batch_id]
+        if batch.status == "in_progress":
+            self._run_batch(batch)
+        return batch
+
+    def _run_batch(self, batch):
+        """Answers every request of a batch, writing output and error files."""
+        output, errors = [], []
+        for line in self._files[batch.input_file_id].splitlines():
+            request = json.loads(line)
+            _, outcome, _ = self.backend.decide()
+            if outcome == "ok":
+                body = request["body"]
+                text, usage = self._complete(body["input"], body.get("instructions", ""))
+                output.append({"custom_id": request["custom_id"], "error": None, "response": {
+                    "status_code": 200,
+                    "body": {
+                        "output": [{"type": "message",
+                                    "content": [{"type": "output_text", "text": text}]}],
+                        "usage": vars(usage),
+                    },
+                }})
+            else:
+                errors.append({"custom_id": request["custom_id"], "error": None, "response": {
+                    "status_code": 500, "body": {"error": {"message": "Server error"}},
+                }})
+        for records, attr in ((output, "output_file_id"), (errors, "error_file_id")):
+            if records:
+                file_id = f"file-{len(self._files)}"
+                self._files[file_id] = "".join(json.dumps(r) + "\n" for r in records)
+                setattr(batch, attr, file_id)
+        batch.status = "completed"
+        batch.request_counts = SimpleNamespace(total=len(output) + len(errors),
+                                               completed=len(output), failed=len(errors))
+
+
+class SimulatedOllamaManager(OllamaManager):
+    """OllamaManager whose server is simulated; no process is started."""
+
+    def __init__(self, backend: SimulatedBackend, synth: PlaylistSynth):
+        super().__init__()
+        self.backend = backend
+        self.synth = synth
+
+    def is_ollama_running(self, model):
+        return True
+
+    def start_ollama_server(self, model):
+        pass
+
+    def kill_ollama_servers(self):
+        pass
+
+    def get_response(self, model, prompt, on_delta=None):
+        delay, outcome, _ = self.backend.decide()
+        text = self.synth.to_json(self.synth.freeform(prompt))
+        if on_delta is None or outcome != "ok":
+            time.sleep(delay)
+        else:
+            chunks = _chunks(text)
+            for chunk in chunks:
+                time.sleep(delay / len(chunks))
+                on_delta(chunk)
+        if outcome != "ok":
+            # Same contract as OllamaManager on a failed request
+            return {"error": "The request timed out after 3 mins"}
+        return text
+
+
+class SimulatedSpotifySession:
+    """
+    `requests.Session` stand-in answering Spotify searches from a
+    simulated backend, so `logged_request` runs unchanged above it.
+    """
+
+    def __init__(self, backend: SimulatedBackend, synth: PlaylistSynth):
+        self.backend = backend
+        self.synth = synth
+
+    def request(self, method: str, url: str, params: Optional[dict] = None, **_) -> requests.Response:
+        delay, outcome, retry_after = self.backend.decide()
+        time.sleep(delay)
+        response = requests.Response()
+        response.url = url
+        if outcome == "ok":
+            title, _, artist = (params or {}).get("q", "").removeprefix("track:").partition(" artist:")
+            match = self.synth.search(title, artist)
+            response.status_code, response.reason = 200, "OK"
+            response._content = json.dumps({"tracks": {"items": [match] if match else []}}).encode()
+            response.headers["Content-Type"] = "application/json"
+        else:
+            response.status_code = 429 if outcome == "throttled" else 500
+            response.reason = "Too Many Requests" if outcome == "throttled" else "Server Error"
+            response._content = b""
+            if retry_after is not None:
+                response.headers["Retry-After"] = str(retry_after)
+        return response
+
+
+class SimulatedSpotifyClient(SpotifyClient):
+    """SpotifyClient whose requests go to a simulated backend."""
+
+    def __init__(self, backend: SimulatedBackend, synth: PlaylistSynth,
+                 retries: int = 4, backoff_base: float = 0.01):
+        super().__init__(
+            {"access_token": "simulated"}, base_url="https://spotify.simulated/v1",
+            session=SimulatedSpotifySession(backend, synth),
+            retry_policy=RetryPolicy("http", max_attempts=retries + 1, backoff_base=backoff_base,
+                                     jitter=backoff_base),
+        )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class LoadReport:
+    """Throughput and overhead of one harness run."""
+    runner: str
+    rows: int
+    failed_rows: int
+    wall_seconds: float
+    cpu_seconds: float
+    row_latencies: List[float] = field(repr=False, default_factory=list)
+    backends: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.row_latencies, 50)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.row_latencies, 99)
+
+    @property
+    def cpu_per_row(self) -> float:
+        return self.cpu_seconds / self.rows if self.rows else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "runner": self.runner,
+            "rows": self.rows,
+            "failed_rows": self.failed_rows,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "rows_per_sec": round(self.rows_per_sec, 2),
+            "p50_seconds": round(self.p50, 4),
+            "p99_seconds": round(self.p99, 4),
+            "cpu_ms_per_row": round(self.cpu_per_row * 1000, 3),
+            "backends": self.backends,
+        }
+
+    def format(self) -> str:
+        backends = ", ".join(
+            f"{name} {s['calls']} calls/{s['errors']} errors/{s['throttled']} throttled"
+            for name, s in self.backends.items()
+        )
+        return (
+            f"{self.runner}: {self.rows} rows ({self.failed_rows} failed) in {self.wall_seconds:.2f}s "
+            f"= {self.rows_per_sec:.1f} rows/s; row latency p50 {self.p50 * 1000:.1f}ms "
+            f"p99 {self.p99 * 1000:.1f}ms; CPU {self.cpu_per_row * 1000:.2f}ms/row; {backends}"
+        )
+
+
+def _failed(row: dict) -> bool:
+    return not row.get("tracks_parsed")
+
+
+def run_openai_load(rows: int = 200, concurrency: int = 20,
+                    openai: BackendProfile = BackendProfile(Latency(0.05)),
+                    spotify: BackendProfile = BackendProfile(Latency(0.005)),
+                    synth: Optional[PlaylistSynth] = None, seed: int = 0,
+                    backoff_base: float = 0.05, output_csv: Optional[str] = None,
+                    stream: bool = False) -> LoadReport:
+    """
+    Runs `rows` rows through OpenAIModelAsyncBenchmark on simulated backends.
+
+    Args:
+        rows: Number of benchmark rows (one prompt each).
+        concurrency: Passed to `OpenAIModelAsyncBenchmark.run`.
+        openai: Simulated OpenAI Responses API behaviour.
+        spotify: Simulated Spotify search behaviour.
+        synth: Playlist/catalog generator; seeded from `seed` by default.
+        seed: Seed for latency and error sampling.
+        backoff_base: OpenAIAsyncManager retry backoff base.
+        output_csv: Optional CSV path; None skips the file sink.
+        stream: Run the benchmark in streaming mode; the simulated
+            response is then delivered in pieces over its latency.
+
+    Returns:
+        LoadReport: Row latency is measured per row from slot acquisition
+        to completion, excluding time queued for a concurrency slot.
+    """
+    synth = synth or PlaylistSynth(seed=seed)
+    llm = SimulatedBackend("openai", openai, seed)
+    search = SimulatedBackend("spotify", spotify, seed + 1)
+    manager = OpenAIAsyncManager(
+        api_key="simulated", model="sim-model", backoff_base=backoff_base,
+        client=SimulatedOpenAIClient(llm, synth),
+    )
+    bench = OpenAIModelAsyncBenchmark(
+        prompts=[f"Simulated prompt {i}" for i in range(rows)],
+        models=["sim-model"],
+        manager=manager,
+        output_csv=output_csv,
+        spotify_client=TrackLookupIndex(SimulatedSpotifyClient(search, synth)),
+        stream=stream,
+    )
+
+    latencies: List[float] = []
+    run_single = bench._run_single
+
+    async def timed_run_single(*args):
+        start = time.perf_counter()
+        try:
+            return await run_single(*args)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    bench._run_single = timed_run_single
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    asyncio.run(bench.run(concurrency=concurrency))
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    return LoadReport(
+        runner="OpenAIModelAsyncBenchmark",
+        rows=len(bench.results),
+        failed_rows=sum(1 for r in bench.results if _failed(r)),
+        wall_seconds=wall,
+        cpu_seconds=cpu,
+        row_latencies=latencies,
+        backends={"openai": llm.stats(), "spotify": search.stats()},
+    )
+
+
+def run_ollama_load(rows: int = 50,
+                    ollama: BackendProfile = BackendProfile(Latency(0.02)),
+                    spotify: BackendProfile = BackendProfile(Latency(0.005)),
+                    synth: Optional[PlaylistSynth] = None, seed: int = 0,
+                    output_csv: Optional[str] = None, stream: bool = False) -> LoadReport:
+    """
+    Runs `rows` rows through the sequential ModelBenchmark on simulated
+    backends. Arguments match :func:`run_openai_load`.
+
+    Returns:
+        LoadReport: Rows run back to back, so row latency is the interval
+        between consecutive results.
+    """
+    synth = synth or PlaylistSynth(seed=seed)
+    llm = SimulatedBackend("ollama", ollama, seed)
+    search = SimulatedBackend("spotify", spotify, seed + 1)
+    bench = ModelBenchmark(
+        models=["sim-ollama"],
+        prompts=[f"Simulated prompt {i}" for i in range(rows)],
+        output_csv=output_csv,
+        spotify_client=TrackLookupIndex(SimulatedSpotifyClient(search, synth)),
+        llm_manager=SimulatedOllamaManager(llm, synth),
+        stream=stream,
+    )
+
+    latencies: List[float] = []
+    record_result = bench.record_result
+    last = [0.0]
+
+    def timed_record_result(row):
+        now = time.perf_counter()
+        latencies.append(now - last[0])
+        last[0] = now
+        record_result(row)
+
+    bench.record_result = timed_record_result
+
+    # ModelBenchmark prints every response; keep the cost, drop the noise
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        cpu_start = time.process_time()
+        wall_start = last[0] = time.perf_counter()
+        bench.run_benchmarks()
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    return LoadReport(
+        runner="ModelBenchmark",
+        rows=len(bench.results),
+        failed_rows=sum(1 for r in bench.results if _failed(r)),
+        wall_seconds=wall,
+        cpu_seconds=cpu,
+        row_latencies=latencies,
+        backends={"ollama": llm.stats(), "spotify": search.stats()},
+    )
+
+
+def simulated_manager_factory(limiter=None, profile: BackendProfile = BackendProfile(Latency(0.05)),
+                              seed: int = 0, backoff_base: float = 0.05):
+    """Sweep-executor manager factory backed by a simulated OpenAI backend."""
+    backend = SimulatedBackend("openai", profile, seed + os.getpid())
+    return OpenAIAsyncManager(
+        api_key="simulated", model="sim-model", backoff_base=backoff_base,
+        client=SimulatedOpenAIClient(backend, PlaylistSynth(seed=seed)), limiter=limiter,
+    )
+
+
+def simulated_spotify_factory(profile: BackendProfile = BackendProfile(Latency(0.005)), seed: int = 0):
+    """Sweep-executor Spotify factory backed by a simulated search backend."""
+    backend = SimulatedBackend("spotify", profile, seed + os.getpid())
+    return TrackLookupIndex(SimulatedSpotifyClient(backend, PlaylistSynth(seed=seed)))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load-test the benchmark runners against simulated backends.")
+    parser.add_argument("--backend", choices=("openai", "ollama"), default="openai")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20, help="OpenAI runner only")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Median LLM latency")
+    parser.add_argument("--spotify-latency-ms", type=float, default=5.0, help="Median search latency")
+    parser.add_argument("--latency-kind", choices=("fixed", "uniform", "exponential", "lognormal"),
+                        default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="LLM 5xx rate")
+    parser.add_argument("--llm-rate-limit", type=float, default=0.0, help="LLM requests/sec; 0 = unlimited")
+    parser.add_argument("--spotify-rate-limit", type=float, default=0.0, help="Searches/sec; 0 = unlimited")
+    parser.add_argument("--stream", action="store_true", help="Overlap validation with streamed generation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the benchmark CSV here")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    llm = BackendProfile(
+        Latency(args.llm_latency_ms / 1000, args.latency_kind),
+        error_rate=args.error_rate,
+        rate_limit=args.llm_rate_limit,
+    )
+    spotify = BackendProfile(
+        Latency(args.spotify_latency_ms / 1000, args.latency_kind),
+        rate_limit=args.spotify_rate_limit,
+    )
+    if args.backend == "openai":
+        report = run_openai_load(args.rows, args.concurrency, llm, spotify, seed=args.seed,
+                                 output_csv=args.output, stream=args.stream)
+    else:
+        report = run_ollama_load(args.rows, llm, spotify, seed=args.seed, output_csv=args.output,
+                                 stream=args.stream)
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
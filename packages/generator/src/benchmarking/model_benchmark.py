@@ -10,17 +10,22 @@ import time
 import csv
 import re
 import json
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from playlist_generation.llm_manager import OllamaManager
 from utils.helpers import has_keys, extract_array
 from collections import defaultdict
 from benchmarking.base_benchmark import BaseBenchmark
+from utils.circuit_breaker import CircuitOpenError, call_when_closed
+from utils.json_scan import ArrayScanner
 
 class ModelBenchmark(BaseBenchmark):
     """
     Runs a series of benchmarks by prompting various Ollama models 
     and measuring performance (speed, track validity, etc.).
     """
-    def __init__(self, models, prompts, output_csv, spotify_client):
+    def __init__(self, models, prompts, output_csv, spotify_client, llm_manager=None, stream=False):
         """
         Initializes the ModelBenchmark with models, prompts, output CSV, and Spotify client.
 
@@ -29,12 +34,18 @@ class ModelBenchmark(BaseBenchmark):
             prompts (list): List of prompt strings.
             output_csv (str): Path to the output CSV.
             spotify_client (SpotifyClient): For validating tracks.
+            llm_manager (OllamaManager, optional): Manager to prompt; defaults
+                to one talking to the local Ollama server.
+            stream (bool): Stream responses and check each track on Spotify
+                as soon as its object is complete, overlapping validation
+                with generation.
         """
         super().__init__(prompts, models, output_csv, spotify_client)
 
         self.results = []
-        self.llm_manager = OllamaManager()
+        self.llm_manager = llm_manager or OllamaManager()
         self.spotify_client = spotify_client
+        self.stream = stream
         self.row_fieldnames = [
             "model",
             "prompt",
@@ -75,17 +86,25 @@ class ModelBenchmark(BaseBenchmark):
         start_time = time.time()
         
         try:
-            response = self.llm_manager.get_response(model, prompt)
-            print(response)
-            end_time = time.time()
-            runtime = end_time - start_time
-            
-            # Log/print
-            print(f"Time taken: {runtime:.2f} seconds")
-            
-            playlist = self.validate_json(response)
-
-            valid_tracks, total_tracks, check_results = self.validate_tracks(playlist)
+            if self.stream:
+                response, runtime, (valid_tracks, total_tracks, check_results) = \
+                    self._run_streaming(model, prompt)
+                print(response)
+                print(f"Time taken: {runtime:.2f} seconds")
+            else:
+                response = call_when_closed(lambda: self.llm_manager.get_response(model, prompt),
+                                            self.max_outage_wait)
+                print(response)
+                end_time = time.time()
+                runtime = end_time - start_time
+
+                # Log/print
+                print(f"Time taken: {runtime:.2f} seconds")
+
+                playlist = self.validate_json(response)
+
+                valid_tracks, total_tracks, check_results = call_when_closed(
+                    lambda: self.validate_tracks(playlist), self.max_outage_wait)
             
             # print(f"Model output:\n{json_output}\n")
             print(f"Tracks parsed: {total_tracks}, tracks found on Spotify: {valid_tracks}")
@@ -102,6 +121,19 @@ class ModelBenchmark(BaseBenchmark):
             }
 
             self.record_result(result)
+
+        except CircuitOpenError as e:
+            # Backend stayed down past max_outage_wait; keep going so the
+            # row can be re-run later
+            print(f"Skipping model '{model}': {e}")
+            self.record_result({
+                "model": model,
+                "prompt": prompt,
+                "runtime_sec": time.time() - start_time,
+                "output": f"ERROR: {e}",
+                "tracks_parsed": 0,
+                "tracks_found": 0,
+            })
         
         except subprocess.CalledProcessError as e:
             # If there's an error running the command, store that info too
@@ -122,6 +154,44 @@ class ModelBenchmark(BaseBenchmark):
 
             self.record_result(result)
 
+    def _run_streaming(self, model, prompt):
+        """
+        Streams the response and checks each track on Spotify, in order on
+        one background thread, as soon as its object is complete.
+
+        Returns:
+            tuple: (response, generation seconds, validate_tracks-style checks)
+        """
+        scanner = ArrayScanner(objects_only=True)
+        futures = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="track-check") as checker:
+            def submit(tracks):
+                for track in tracks:
+                    if has_keys(track, "title", "artist"):
+                        # Carry the caller's deadline and trace context to the thread
+                        futures.append(checker.submit(
+                            contextvars.copy_context().run, call_when_closed,
+                            functools.partial(self.check_track, track), self.max_outage_wait))
+
+            start_time = time.time()
+            response = call_when_closed(
+                lambda: self.llm_manager.get_response(model, prompt, on_delta=lambda d: submit(scanner.feed(d))),
+                self.max_outage_wait)
+            runtime = time.time() - start_time
+
+            dispatched = len(scanner.items)
+            playlist = scanner.close()
+            if playlist is None or not isinstance(response, str):
+                # Failed request, or no array in the output: handle as unstreamed
+                for future in futures:
+                    future.cancel()
+                playlist = self.validate_json(response)
+                return response, runtime, call_when_closed(
+                    lambda: self.validate_tracks(playlist), self.max_outage_wait)
+            submit(playlist[dispatched:])
+            checks = [future.result() for future in futures]
+        return response, runtime, self.tally_checks(checks)
+
     def is_valid_json_playlist(self, output):
         """
         Checks if the output string is valid JSON representing a playlist.
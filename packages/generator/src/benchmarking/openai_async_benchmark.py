@@ -9,90 +9,315 @@ import json
 import time
 import asyncio
 import itertools
-from typing import List
-from tqdm import tqdm
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 
 from benchmarking.base_benchmark import BaseBenchmark
+from utils.circuit_breaker import acall_when_closed
+from utils.deadline import deadline, with_deadline
+from utils.tracing import TRACER, span
+from utils.track_lines import TrackLineParser
 
 
 class OpenAIModelAsyncBenchmark(BaseBenchmark):
-    def __init__(self, prompts: List[str], models: List[str], manager, output_csv: str, spotify_client, effort=None, verb=None):
+    FIELDNAMES = (
+        "prompt",
+        "model",
+        "effort",
+        "verbosity",
+        "raw_text",
+        "json",
+        "check_results",
+        "runtime",
+        "tracks_parsed",
+        "tracks_found",
+        "input_tokens",
+        "output_tokens",
+        "total_tokens",
+        "hedge_input_tokens",
+        "stage_timings",
+    )
+
+    def __init__(self, prompts: List[str], models: List[str], manager, output_csv: str, spotify_client, effort=None, verb=None,
+                 row_timeout: Optional[float] = None, stage_timeouts: Optional[Dict[str, float]] = None,
+                 stream: bool = False):
+        """
+        Args:
+            row_timeout: Seconds a row may take in total (None: unbounded).
+            stage_timeouts: Per-stage limits in seconds, keyed by
+                'generate', 'json_conversion' and 'validate'.
+            stream: Stream generation and check each "Title — Artist"
+                line on Spotify as soon as it is complete, so validation
+                overlaps generation. Tracks are parsed from the text, so
+                there is no json_conversion call, and the 'validate' stage
+                only covers the checks left when generation ends.
+        """
         super().__init__(prompts, models, output_csv, spotify_client)
         self.manager = manager
         self.effort = effort or ["minimal"]
         self.verb = verb or ["low"]
+        self.row_timeout = row_timeout
+        self.stage_timeouts = dict(stage_timeouts or {})
+        self.stream = stream
+
+        self.fieldnames = list(self.FIELDNAMES)
+
+    async def _stage(self, name: str, make, timings: Dict[str, float], wait_outages: bool = True):
+        """
+        Awaits `make()` under the stage's timeout and the row's deadline,
+        pausing through backend outages unless `wait_outages` is off (for
+        work that cannot be restarted). The stage's duration is recorded
+        in `timings` even if it fails or times out.
+        """
+        start = time.monotonic()
+        try:
+            with deadline(self.stage_timeouts.get(name)):
+                if not wait_outages:
+                    return await with_deadline(make(), name)
+                return await with_deadline(acall_when_closed(make, self.max_outage_wait), name)
+        finally:
+            timings[name] = round(time.monotonic() - start, 2)
 
-        self.fieldnames = [
-            "prompt",
-            "model",
-            "effort",
-            "verbosity",
-            "raw_text",
-            "json",
-            "check_results",
-            "runtime",
-            "tracks_parsed",
-            "tracks_found",
-            "input_tokens",
-            "output_tokens",
-            "total_tokens",
-        ]
-
-    async def _run_single(self, prompt: str, model: str, effort: str, verb: str, sem: asyncio.Semaphore):
+    async def _run_single(self, prompt: str, model: str, effort: str, verb: str):
         row = {"prompt": prompt}
-        async with sem:
-            try:
-                start_time = time.time()
-                freeform_response, usage = await self.manager.get_response(prompt, model, effort, verb)
-                runtime = time.time() - start_time
-
-                json_response = await self.manager.convert_to_json(freeform_response)
-                playlist = self.validate_json(json_response)
-
-                # Offload blocking Spotify checks to a thread to avoid blocking the event loop
-                valid, total, output_text = await asyncio.to_thread(self.validate_tracks, playlist)
-
-                row["model"] = model
-                row["effort"] = effort
-                row["verbosity"] = verb
-                row["raw_text"] = freeform_response
-                row["json"] = json.dumps(playlist, indent=2, ensure_ascii=False)
-                row["check_results"] = output_text
-                row["runtime"] = f"{runtime:.2f}"
-                row["tracks_parsed"] = total
-                row["tracks_found"] = valid
-
-                # Usage object may vary; attempt attribute access with fallback
-                try:
-                    row["input_tokens"] = getattr(usage, "input_tokens", None)
-                    row["output_tokens"] = getattr(usage, "output_tokens", None)
-                    row["total_tokens"] = getattr(usage, "total_tokens", None)
-                except Exception:
-                    row["input_tokens"] = row["output_tokens"] = row["total_tokens"] = None
+        timings = {}
+        try:
+            # The deadline reaches every retry and HTTP call below (ContextVar)
+            with deadline(self.row_timeout):
+                if self.stream:
+                    freeform_response, usage, runtime, playlist, checks = await self._run_streaming(
+                        prompt, model, effort, verb, timings)
+                else:
+                    freeform_response, usage, runtime, playlist, checks = await self._run_stages(
+                        prompt, model, effort, verb, timings)
 
-            except Exception as e:
-                row["model"] = f"ERROR: {str(e)}"
+            self._fill_row(row, model, effort, verb, freeform_response, usage, playlist,
+                           checks, f"{runtime:.2f}")
+
+        except Exception as e:
+            row["model"] = f"ERROR: {str(e)}"
+
+        # Partial for failed and timed-out rows: stages reached and how long each took
+        row["stage_timings"] = json.dumps(timings)
+        return row
+
+    async def _run_stages(self, prompt, model, effort, verb, timings):
+        """Generate, convert to JSON, then validate, one after the other."""
+        start_time = time.time()
+        with span("generate"):
+            freeform_response, usage = await self._stage(
+                "generate", lambda: self.manager.get_response(prompt, model, effort, verb), timings)
+        runtime = time.time() - start_time
+
+        with span("json_conversion"):
+            json_response = await self._stage(
+                "json_conversion", lambda: self.manager.convert_to_json(freeform_response), timings)
+        playlist = self.validate_json(json_response)
+
+        # Offload blocking Spotify checks to a thread to avoid blocking the event loop
+        with span("validate") as s:
+            valid, total, output_text = await self._stage(
+                "validate", lambda: asyncio.to_thread(self.validate_tracks, playlist), timings)
+            s.set(tracks_parsed=total, tracks_found=valid)
+        return freeform_response, usage, runtime, playlist, (valid, total, output_text)
+
+    async def _run_streaming(self, prompt, model, effort, verb, timings):
+        """
+        Streams generation, checking each track on Spotify as its line
+        completes. One checker per row works through the tracks in order
+        while the model writes the rest, so a row takes about
+        max(generation, validation) rather than their sum.
+        """
+        parser = TrackLineParser()
+        pending = asyncio.Queue()
+
+        def on_delta(delta):
+            for track in parser.feed(delta):
+                pending.put_nowait(track)
+
+        async def check_all():
+            checks = []
+            while (track := await pending.get()) is not None:
+                checks.append(await acall_when_closed(
+                    lambda: asyncio.to_thread(self.check_track, track), self.max_outage_wait))
+            return checks
+
+        checker = asyncio.create_task(check_all())
+        try:
+            start_time = time.time()
+            with span("generate"):
+                freeform_response, usage = await self._stage(
+                    "generate",
+                    lambda: self.manager.get_response(prompt, model, effort, verb, on_delta=on_delta),
+                    timings)
+            runtime = time.time() - start_time
+
+            dispatched = len(parser.items)
+            for track in parser.close()[dispatched:]:
+                pending.put_nowait(track)
+            pending.put_nowait(None)
+            with span("validate") as s:
+                # The checker cannot be restarted, so outages are waited out per track inside it
+                checks = self.tally_checks(
+                    await self._stage("validate", lambda: checker, timings, wait_outages=False))
+                s.set(tracks_parsed=checks[1], tracks_found=checks[0])
+        finally:
+            if not checker.done():
+                checker.cancel()
+                await asyncio.gather(checker, return_exceptions=True)
+        return freeform_response, usage, runtime, parser.items, checks
 
+    @staticmethod
+    def _fill_row(row, model, effort, verb, freeform_response, usage, playlist, checks, runtime):
+        """Populates a successful result row."""
+        valid, total, output_text = checks
+        row["model"] = model
+        row["effort"] = effort
+        row["verbosity"] = verb
+        row["raw_text"] = freeform_response
+        row["json"] = json.dumps(playlist, indent=2, ensure_ascii=False)
+        row["check_results"] = output_text
+        row["runtime"] = runtime
+        row["tracks_parsed"] = total
+        row["tracks_found"] = valid
+
+        # Usage object may vary; attempt attribute access with fallback
+        try:
+            row["input_tokens"] = getattr(usage, "input_tokens", None)
+            row["output_tokens"] = getattr(usage, "output_tokens", None)
+            row["total_tokens"] = getattr(usage, "total_tokens", None)
+            # Input tokens of a hedge duplicate; already included in total_tokens
+            row["hedge_input_tokens"] = getattr(usage, "hedge_input_tokens", None)
+        except Exception:
+            row["input_tokens"] = row["output_tokens"] = row["total_tokens"] = None
+
+    async def _run_traced(self, prompt: str, model: str, effort: str, verb: str):
+        """Runs and records one row inside its own root span."""
+        label = f"{model}/{effort}/{verb}: {prompt[:40]}"
+        with TRACER.span("row", root=True, label=label, prompt=prompt, model=model,
+                         effort=effort, verbosity=verb) as s:
+            row = await self._run_single(prompt, model, effort, verb)
+            s.set(status="error" if str(row.get("model", "")).startswith("ERROR") else "ok")
+            with span("sink.write"):
+                self.record_result(row)
         return row
 
-    async def run(self, concurrency: int = 5):
+    def iter_combos(self) -> Iterator[tuple]:
+        """Lazily yields every (prompt, model, effort, verbosity) combination."""
+        return itertools.product(self.prompts, self.models, self.effort, self.verb)
+
+    def combos(self):
+        """All (prompt, model, effort, verbosity) combinations of this benchmark."""
+        return list(self.iter_combos())
+
+    async def run(self, concurrency: int = 5, combos=None, progress: bool = True):
         """
         Executes the async benchmark with limited concurrency and writes CSV.
 
+        A fixed pool of `concurrency` worker tasks pulls combinations from
+        a shared iterator, so only the rows in flight exist at any time
+        and memory stays flat however large the sweep is.
+
         Args:
             concurrency (int): Maximum number of concurrent OpenAI requests.
+            combos (iterable, optional): (prompt, model, effort, verbosity)
+                tuples to run instead of the full matrix, e.g. one
+                worker's share of a sweep. May be a generator.
+            progress (bool): Show a tqdm progress bar.
+        """
+        if combos is None:
+            source = self.iter_combos()
+            total = len(self.prompts) * len(self.models) * len(self.effort) * len(self.verb)
+        else:
+            source = iter(combos)
+            total = len(combos) if hasattr(combos, "__len__") else None
+
+        self.reset_results()
+        self.initialize_csv(self.fieldnames)
+        from tqdm import tqdm
+        with tqdm(total=total, desc="OpenAI async benchmarks", unit="run", dynamic_ncols=True,
+                  disable=not progress) as pbar:
+
+            async def worker():
+                # Workers share one event loop, so next() on the shared iterator needs no lock
+                for prompt, model, effort, verb in source:
+                    # Rows are written by _run_traced so the write lands in the row's span
+                    await self._run_traced(prompt, model, effort, verb)
+                    pbar.update(1)
+
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    async def run_batch(self, request_dir: str, poll_interval: float = 30.0,
+                        validate_concurrency: int = 8, combos=None, progress: bool = True):
         """
-        combos = list(itertools.product(self.prompts, self.models, self.effort, self.verb))
-        total = len(combos)
-        sem = asyncio.Semaphore(concurrency)
+        Runs the benchmark through the OpenAI Batch API and writes CSV.
 
-        # Prepare tasks
-        tasks = [self._run_single(prompt, model, effort, verb, sem) for (prompt, model, effort, verb) in combos]
+        Generation and JSON conversion are each submitted as a batch
+        (request files are kept in `request_dir`). As conversion results
+        are downloaded they flow into the usual Spotify validation and
+        CSV sink. Batch rows have no per-request latency, so `runtime`
+        is left empty.
 
+        Args:
+            request_dir (str): Directory for the batch request files.
+            poll_interval (float): Seconds between batch status checks.
+            validate_concurrency (int): Rows validated against Spotify at once.
+            combos (list, optional): Subset of combinations to run.
+            progress (bool): Show a tqdm progress bar.
+        """
+        combos = self.combos() if combos is None else list(combos)
+        request_dir = Path(request_dir)
+        request_dir.mkdir(parents=True, exist_ok=True)
         self.reset_results()
         self.initialize_csv(self.fieldnames)
-        with tqdm(total=total, desc="OpenAI async benchmarks", unit="run", dynamic_ncols=True) as pbar:
-            for coro in asyncio.as_completed(tasks):
-                row = await coro
-                self.record_result(row)
-                pbar.update(1)
+
+        def error_row(i, message):
+            self.record_result({"prompt": combos[i][0], "model": f"ERROR: {message}"})
+
+        generated = {}
+        gen_bodies = {
+            f"gen-{i}": self.manager.generate_request(prompt, model, effort, verb)
+            for i, (prompt, model, effort, verb) in enumerate(combos)
+        }
+        async for res in self.manager.run_batch(gen_bodies, str(request_dir / "batch_generate.jsonl"),
+                                                poll_interval=poll_interval):
+            i = int(res.custom_id.split("-", 1)[1])
+            if res.error:
+                error_row(i, res.error)
+            else:
+                generated[i] = (res.text, res.usage)
+
+        sem = asyncio.Semaphore(validate_concurrency)
+
+        async def finish(i, json_text):
+            prompt, model, effort, verb = combos[i]
+            freeform, usage = generated[i]
+            row = {"prompt": prompt}
+            try:
+                playlist = self.validate_json(json_text)
+                async with sem:
+                    checks = await acall_when_closed(
+                        lambda: asyncio.to_thread(self.validate_tracks, playlist), self.max_outage_wait)
+                self._fill_row(row, model, effort, verb, freeform, usage, playlist, checks, "")
+            except Exception as e:
+                row["model"] = f"ERROR: {str(e)}"
+            self.record_result(row)
+
+        json_bodies = {f"json-{i}": self.manager.json_conversion_request(text)
+                       for i, (text, _) in generated.items()}
+        tasks = []
+        from tqdm import tqdm
+        with tqdm(total=len(combos), desc="OpenAI batch results", unit="run", dynamic_ncols=True,
+                  disable=not progress) as pbar:
+            pbar.update(len(combos) - len(generated))
+            async for res in self.manager.run_batch(json_bodies, str(request_dir / "batch_json.jsonl"),
+                                                    poll_interval=poll_interval):
+                i = int(res.custom_id.split("-", 1)[1])
+                if res.error:
+                    error_row(i, res.error)
+                    pbar.update(1)
+                    continue
+                task = asyncio.create_task(finish(i, res.text))
+                task.add_done_callback(lambda _: pbar.update(1))
+                tasks.append(task)
+            await asyncio.gather(*tasks)
@@ -0,0 +1,187 @@
+"""
+Playlist-parsing benchmark.
+
+Compares the JSON repair in :meth:`BaseBenchmark.validate_json` (backed
+by :mod:`utils.json_scan`) with the previous approach — ``json.loads``,
+then a retry on ``extract_array(text[1:])`` where ``extract_array`` cut
+at the first ``]`` — over captured model outputs. Reports, per parser,
+how many outputs yield a playlist, how many title/artist tracks were
+recovered and the mean time per parse::
+
+    python -m benchmarking.parse_benchmark output/*/ollama_benchmark_results.csv
+    python -m benchmarking.parse_benchmark outputs.jsonl --json
+
+Inputs are benchmark CSVs (the raw ``output`` column by default, see
+``--column``), JSONL files of captured outputs (a string or an object
+with ``output``/``text`` per line, or Batch API output lines) or plain
+text files holding one output. Without inputs a small built-in set of
+the failure shapes seen in model output is used.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from benchmarking.base_benchmark import BaseBenchmark
+
+CSV_COLUMNS = ("output", "raw_json", "json")
+
+SAMPLE_OUTPUTS = [
+    '[{"title": "Imperial March", "artist": "John Williams"}, {"title": "Tea for Two", "artist": "Doris Day"}]',
+    '```json\n[\n  {"title": "Space Oddity", "artist": "David Bowie"},\n'
+    '  {"title": "Rocket Man", "artist": "Elton John"}\n]\n```',
+    'Here is your playlist:\n[{"title": "Hurt [Live]", "artist": "Johnny Cash"}, '
+    '{"title": "Creep", "artist": "Radiohead"}]\nEnjoy!',
+    '[\n  {"title": "Ziggy Stardust", "artist": "David Bowie"},\n'
+    '  {"title": "Starman", "artist": "David Bowie"},\n]',
+    'I picked these [10 songs] for you:\n[{"title": "Mr. Blue Sky", "artist": "ELO"}]',
+    '[{"title": "Bohemian Rhapsody", "artist": "Queen"}, {"title": "Under Pressure", "artist": "Que',
+    '[{"title": "Song (feat. [Someone])", "artist": "Band",}, {"title": "Other", "artist": "Act"}]',
+    "Sorry, I can't make a playlist for that.",
+]
+
+
+def legacy_validate_json(text):
+    """`validate_json` as it was before the scanner, for comparison."""
+    def extract_array(s):
+        start, end = s.find("["), s.find("]")
+        if start == -1 or end == -1 or end < start:
+            return s
+        return s[start:end + 1]
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            return json.loads(extract_array(text[1:]))
+        except json.JSONDecodeError:
+            return f"JSON ERROR \n {text}"
+
+
+def load_outputs(path: str, column: Optional[str] = None) -> List[str]:
+    """Captured model outputs from a CSV, JSONL or text file."""
+    if path.endswith(".csv"):
+        # sys.maxsize overflows the C long on Windows
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            name = column or next((c for c in CSV_COLUMNS if c in (reader.fieldnames or ())), None)
+            if name is None:
+                raise ValueError(f"{path}: none of the columns {CSV_COLUMNS}; pass --column")
+            return [row[name] for row in reader
+                    if row.get(name) and not row[name].startswith(("ERROR:", "==="))]
+    if path.endswith((".jsonl", ".ndjson")):
+        outputs = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    text = _output_from_json(line)
+                    if text:
+                        outputs.append(text)
+        return outputs
+    with open(path, "r", encoding="utf-8") as f:
+        return [f.read()]
+
+
+def _output_from_json(line: str) -> Optional[str]:
+    record = json.loads(line)
+    if isinstance(record, str):
+        return record
+    if "response" in record:
+        # Batch API output line
+        from playlist_generation.openai_async_manager import parse_batch_line
+
+        return parse_batch_line(line).text
+    return record.get("output") or record.get("text")
+
+
+@dataclass
+class ParseReport:
+    """Outcome of one parser over a set of outputs."""
+    parser: str
+    outputs: int
+    parsed: int
+    tracks: int
+    seconds: float
+
+    @property
+    def success_rate(self) -> float:
+        return self.parsed / self.outputs if self.outputs else 0.0
+
+    @property
+    def us_per_parse(self) -> float:
+        return self.seconds / self.outputs * 1e6 if self.outputs else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "parser": self.parser,
+            "outputs": self.outputs,
+            "parsed": self.parsed,
+            "success_rate": round(self.success_rate, 4),
+            "tracks": self.tracks,
+            "us_per_parse": round(self.us_per_parse, 2),
+        }
+
+    def format(self) -> str:
+        return (f"{self.parser}: {self.parsed}/{self.outputs} parsed ({self.success_rate:.1%}), "
+                f"{self.tracks} tracks, {self.us_per_parse:.1f}us/parse")
+
+
+def _count_tracks(playlist) -> int:
+    if not isinstance(playlist, list):
+        return 0
+    return sum(1 for t in playlist if isinstance(t, dict) and "title" in t and "artist" in t)
+
+
+def run_parse_benchmark(outputs: Sequence[str], repeat: int = 20) -> List[ParseReport]:
+    """Runs each parser over `outputs`, timing the best of `repeat` passes."""
+    parsers: Dict[str, Callable[[str], object]] = {
+        "legacy": legacy_validate_json,
+        "scanner": BaseBenchmark([], [], None, None).validate_json,
+    }
+    reports = []
+    for name, parse in parsers.items():
+        results = [parse(text) for text in outputs]
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            for text in outputs:
+                parse(text)
+            best = min(best, time.perf_counter() - start)
+        reports.append(ParseReport(
+            parser=name,
+            outputs=len(outputs),
+            parsed=sum(isinstance(r, list) for r in results),
+            tracks=sum(_count_tracks(r) for r in results),
+            seconds=best,
+        ))
+    return reports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare playlist JSON parsing over captured outputs.")
+    parser.add_argument("paths", nargs="*", help="CSV/JSONL/text files (default: built-in samples)")
+    parser.add_argument("--column", help=f"CSV column holding the output (default: first of {CSV_COLUMNS})")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed passes; the fastest is reported")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    outputs = [o for p in args.paths for o in load_outputs(p, args.column)] or list(SAMPLE_OUTPUTS)
+    reports = run_parse_benchmark(outputs, args.repeat)
+    if args.json:
+        print(json.dumps([r.to_dict() for r in reports], indent=2))
+    else:
+        for r in reports:
+            print(r.format())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+"""
+Prompt sources for benchmark sweeps.
+
+Streams prompts from plain-text files (one prompt per line, e.g.
+``shuffled_prompts.txt``) or JSONL files, and selects a deterministic
+subset of them:
+
+* **Sharding** — shard ``i`` of ``N`` keeps the prompts whose stable
+  hash falls in that shard, so a sweep can be split across processes or
+  machines with no coordination, and re-running a shard after the file
+  is reordered picks the same prompts.
+* **Sampling** — a seeded rate (streaming) or a fixed-size reservoir.
+
+JSONL lines may be bare strings or objects. The prompt is taken from
+``prompt``, ``text`` or ``input``; from ``body.input`` for OpenAI Batch
+API request lines (``{"custom_id": ..., "body": {"input": ...}}``); or
+from a string ``body`` for request/ticket style lines. ``id``,
+``custom_id`` or ``request_id`` become the prompt's key.
+
+Per-shard CSV outputs are combined with :func:`merge_csv_outputs`::
+
+    python -m benchmarking.prompt_source list shuffled_prompts.txt --shard 0/4
+    python -m benchmarking.prompt_source merge merged.csv out/shard-*.csv
+"""
+
+import argparse
+import csv
+import json
+import random
+import zlib
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+PROMPT_FIELDS = ("prompt", "text", "input")
+ID_FIELDS = ("id", "custom_id", "request_id")
+MERGE_KEY = ("prompt", "model", "effort", "verbosity")
+
+
+class PromptRecord(NamedTuple):
+    index: int
+    key: str
+    text: str
+
+
+def _stable_hash(*parts) -> int:
+    return zlib.crc32("\x1f".join(str(p) for p in parts).encode("utf-8"))
+
+
+def _prompt_from_json(obj) -> Tuple[Optional[str], Optional[str]]:
+    if isinstance(obj, str):
+        return None, obj
+    if not isinstance(obj, dict):
+        return None, None
+    key = next((str(obj[f]) for f in ID_FIELDS if obj.get(f) is not None), None)
+    for f in PROMPT_FIELDS:
+        if isinstance(obj.get(f), str):
+            return key, obj[f]
+    body = obj.get("body")
+    if isinstance(body, dict):
+        return key, _prompt_from_json(body)[1]
+    if isinstance(body, str):
+        return key, body
+    return key, None
+
+
+def iter_prompts(path: str) -> Iterator[PromptRecord]:
+    """
+    Streams prompts from a text or JSONL file.
+
+    Text files skip blank lines and lines starting with '#'. A file is
+    treated as JSONL if its name ends in '.jsonl'/'.ndjson'.
+
+    Args:
+        path: Prompt file path.
+
+    Yields:
+        PromptRecord: (index, key, text); key defaults to the text.
+
+    Raises:
+        ValueError: If a JSONL line has no recognizable prompt.
+    """
+    is_jsonl = str(path).endswith((".jsonl", ".ndjson"))
+    index = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or (not is_jsonl and line.startswith("#")):
+                continue
+            if is_jsonl:
+                key, text = _prompt_from_json(json.loads(line))
+                if not text:
+                    raise ValueError(f"{path}:{lineno}: no prompt field found")
+            else:
+                key, text = None, line
+            yield PromptRecord(index, key or text, text.strip())
+            index += 1
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parses 'i/N' (0-based shard i of N).
+
+    Raises:
+        ValueError: If the spec is malformed or i is out of range.
+    """
+    try:
+        i, n = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like 'i/N', got {spec!r}") from None
+    if n < 1 or not 0 <= i < n:
+        raise ValueError(f"Shard index must be in [0, {n}), got {i}")
+    return i, n
+
+
+def select_prompts(
+        records: Iterable[PromptRecord],
+        shard: int = 0,
+        num_shards: int = 1,
+        sample_rate: Optional[float] = None,
+        sample_size: Optional[int] = None,
+        seed: int = 0,
+        limit: Optional[int] = None,
+) -> Iterator[PromptRecord]:
+    """
+    Deterministically filters a prompt stream.
+
+    Args:
+        records: Prompt records, e.g. from :func:`iter_prompts`.
+        shard: 0-based shard index.
+        num_shards: Total shards; each key lands in exactly one.
+        sample_rate: Keep each prompt with this probability (seeded,
+            decided per key, so it streams).
+        sample_size: Keep a seeded reservoir of this many prompts,
+            returned in file order. Buffers `sample_size` records.
+        seed: Seed for both sampling modes.
+        limit: Stop after this many prompts.
+
+    Yields:
+        PromptRecord: Selected records, in file order.
+    """
+    def selected():
+        for rec in records:
+            if num_shards > 1 and _stable_hash(rec.key) % num_shards != shard:
+                continue
+            if sample_rate is not None and _stable_hash(seed, rec.key) % 1_000_000 >= sample_rate * 1_000_000:
+                continue
+            yield rec
+
+    stream = selected()
+    if sample_size is not None:
+        rng = random.Random(seed)
+        reservoir: List[PromptRecord] = []
+        for n, rec in enumerate(stream):
+            if n < sample_size:
+                reservoir.append(rec)
+            else:
+                j = rng.randint(0, n)
+                if j < sample_size:
+                    reservoir[j] = rec
+        stream = iter(sorted(reservoir, key=lambda r: r.index))
+
+    for n, rec in enumerate(stream):
+        if limit is not None and n >= limit:
+            return
+        yield rec
+
+
+def load_prompts(path: str, **selection) -> List[str]:
+    """Prompt texts from `path` after :func:`select_prompts` filtering."""
+    return [rec.text for rec in select_prompts(iter_prompts(path), **selection)]
+
+
+def _is_error_row(row: dict) -> bool:
+    # The OpenAI runner puts the error in `model`, the Ollama one in `output`
+    return any(str(row.get(k) or "").startswith("ERROR") for k in ("model", "output"))
+
+
+def _read_merge_rows(path: str, fieldnames: Optional[List[str]], first: str):
+    """Header and result rows of one shard CSV, up to any summary block."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        header = reader.fieldnames
+        if fieldnames is not None and header != fieldnames:
+            raise ValueError(f"{path} has a different header than {first}")
+        rows = []
+        for row in reader:
+            if (row.get(header[0]) or "").startswith("==="):
+                break
+            rows.append(row)
+    return header, rows
+
+
+def merge_csv_outputs(paths: Sequence[str], output_path: str,
+                      key_fields: Sequence[str] = MERGE_KEY) -> int:
+    """
+    Combines per-shard benchmark CSVs into one file.
+
+    Rows sharing key fields (e.g. from a shard that was re-run) are
+    resolved so that re-running a shard replaces its failures: a
+    successful row beats an ``ERROR`` row, and otherwise the row from the
+    last-listed input wins. Error rows that do not name their model (the
+    OpenAI runner's) cannot be matched by key; they are dropped when a
+    later-listed input has a successful row for the same prompt. Rows are
+    written in input order. Reading a file stops at a summary block
+    ('=== ...' in the first column).
+
+    Args:
+        paths: Shard CSV files; all must share the same header.
+        output_path: Merged CSV to write.
+        key_fields: Columns identifying a row; missing ones are ignored.
+
+    Returns:
+        int: Rows written.
+
+    Raises:
+        ValueError: If the shard headers differ.
+    """
+    # First pass: pick each key's winning row, by (input, row) position.
+    # Inputs are read again to write, so only keys are held in memory.
+    fieldnames = None
+    winners = {}
+    last_success = {}
+    for i, path in enumerate(paths):
+        fieldnames, rows = _read_merge_rows(path, fieldnames, paths[0])
+        key_cols = [k for k in key_fields if k in fieldnames]
+        for j, row in enumerate(rows):
+            error = _is_error_row(row)
+            if not error:
+                last_success[row.get("prompt")] = i
+            if not key_cols or str(row.get("model") or "").startswith("ERROR"):
+                continue
+            key = tuple(row.get(k) for k in key_cols)
+            held = winners.get(key)
+            if held is None or not error or held[1]:
+                winners[key] = ((i, j), error)
+
+    written = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, fieldnames=fieldnames or [])
+        if fieldnames is not None:
+            writer.writeheader()
+        for i, path in enumerate(paths):
+            _, rows = _read_merge_rows(path, fieldnames, paths[0])
+            key_cols = [k for k in key_fields if k in fieldnames]
+            for j, row in enumerate(rows):
+                if not key_cols:
+                    keep = True
+                elif str(row.get("model") or "").startswith("ERROR"):
+                    keep = last_success.get(row.get("prompt"), -1) <= i
+                else:
+                    keep = winners[tuple(row.get(k) for k in key_cols)][0] == (i, j)
+                if keep:
+                    writer.writerow(row)
+                    written += 1
+    return written
+
+
+def add_selection_args(parser: argparse.ArgumentParser) -> None:
+    """Adds --shard/--sample-rate/--sample-size/--seed/--limit to a parser."""
+    parser.add_argument("--shard", default="0/1", help="0-based shard 'i/N' (default 0/1)")
+    parser.add_argument("--sample-rate", type=float, help="Keep each prompt with this probability")
+    parser.add_argument("--sample-size", type=int, help="Keep a seeded sample of this many prompts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", type=int, help="Use at most this many prompts")
+
+
+def selection_from_args(args) -> dict:
+    """Keyword arguments for :func:`select_prompts` from parsed selection args."""
+    shard, num_shards = parse_shard(args.shard)
+    return {
+        "shard": shard,
+        "num_shards": num_shards,
+        "sample_rate": args.sample_rate,
+        "sample_size": args.sample_size,
+        "seed": args.seed,
+        "limit": args.limit,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect prompt selections and merge sharded outputs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ls = sub.add_parser("list", help="Print the prompts a selection would run")
+    ls.add_argument("path")
+    add_selection_args(ls)
+    merge = sub.add_parser("merge", help="Merge per-shard CSV outputs")
+    merge.add_argument("output")
+    merge.add_argument("inputs", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for rec in select_prompts(iter_prompts(args.path), **selection_from_args(args)):
+            print(rec.text)
+    else:
+        print(f"Merged {merge_csv_outputs(args.inputs, args.output)} rows into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
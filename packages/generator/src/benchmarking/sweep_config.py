@@ -0,0 +1,314 @@
+"""
+Benchmark sweep configuration.
+
+One :class:`SweepConfig` describes a whole benchmark run: the backend,
+where the prompts come from (and which shard or sample of them), the
+model x effort x verbosity matrix, concurrency and rate limiting, the
+track-lookup cache and where results go. It is read from a JSON or TOML
+file (TOML needs Python 3.11+) and/or command-line flags; flags given on
+the command line override the file::
+
+    playlist-bench --config sweeps/nano.toml --shard 2/8 --concurrency 32
+
+A minimal TOML file::
+
+    backend = "openai"
+    prompts_file = "shuffled_prompts.txt"
+    limit = 200
+    models = ["gpt-5-nano", "gpt-5-mini"]
+    effort = ["minimal", "low"]
+    concurrency = 24
+    rate_limit = 8.0
+
+Keys are the :class:`SweepConfig` field names; unknown keys are errors.
+``--print-config`` shows the resolved configuration without running it.
+"""
+
+import argparse
+import json
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, List, Optional
+
+from benchmarking.prompt_source import PromptRecord, load_prompts, parse_shard, select_prompts
+
+BACKENDS = ("openai", "ollama")
+
+# fuzzy: normalized + near-duplicate title matching (TrackLookupIndex)
+# exact: normalized keys only; off: every lookup searches Spotify
+CACHE_MODES = ("fuzzy", "exact", "off")
+
+STAGES = ("generate", "json_conversion", "validate")
+
+DEFAULT_PROMPTS = [
+    "Darth Vader's tea party playlist",
+    "Playlist for aliens trying to blend in at a human barbecue",
+    "The Joker’s grocery shopping playlist",
+]
+
+DEFAULT_MODELS = {
+    "openai": ["gpt-5-nano"],
+    "ollama": ["gemma2:2b"],
+}
+
+DEFAULT_CSV_NAMES = {
+    "openai": "openai_benchmark_results_async.csv",
+    "ollama": "ollama_benchmark_results.csv",
+}
+
+
+@dataclass
+class SweepConfig:
+    """
+    Settings for one benchmark run.
+
+    Attributes:
+        backend: 'openai' or 'ollama'.
+        prompts_file: Text/JSONL prompt file; None uses `prompts`.
+        prompts: Inline prompts (default: a few built-in ones).
+        shard, sample_rate, sample_size, seed, limit: Prompt selection,
+            as for :func:`benchmarking.prompt_source.select_prompts`.
+        models: Models to run (default: a per-backend default).
+        effort, verbosity: OpenAI reasoning effort / verbosity axes.
+        concurrency: Concurrent rows (per worker process).
+        workers: Worker processes; >1 splits the sweep across them.
+        rate_limit: Global OpenAI requests/second; None is unthrottled.
+        burst: Rate-limit bucket size (default: total concurrency).
+        hedge: Hedge requests slower than this latency percentile.
+        hedge_max_fraction: Cap on hedged requests as a traffic fraction.
+        row_timeout: Seconds a row may take end to end.
+        request_timeout: Seconds per OpenAI request attempt.
+        stage_timeouts: Per-stage limits keyed by 'generate',
+            'json_conversion' and 'validate'.
+        stream: Stream responses and validate tracks while the model
+            is still generating (skips the json_conversion call).
+        batch: Submit through the OpenAI Batch API.
+        poll_interval: Seconds between batch status checks.
+        cache: Track-lookup cache mode, one of CACHE_MODES.
+        output_dir: Run directory (default: output/<timestamp> at the
+            repository root).
+        output_csv: Results file name inside `output_dir` (default per
+            backend; a shard suffix is added for sharded runs).
+        track_store: Metadata store enriched after the run (default:
+            output/track_store.sqlite); "" skips enrichment.
+        run_store: Run database the results are loaded into after the
+            run (default: output/runs.sqlite); "" skips it.
+    """
+    backend: str = "openai"
+    prompts_file: Optional[str] = None
+    prompts: List[str] = field(default_factory=lambda: list(DEFAULT_PROMPTS))
+    shard: str = "0/1"
+    sample_rate: Optional[float] = None
+    sample_size: Optional[int] = None
+    seed: int = 0
+    limit: Optional[int] = None
+    models: List[str] = field(default_factory=list)
+    effort: List[str] = field(default_factory=lambda: ["minimal"])
+    verbosity: List[str] = field(default_factory=lambda: ["low"])
+    concurrency: int = 5
+    workers: int = 1
+    rate_limit: Optional[float] = None
+    burst: Optional[int] = None
+    hedge: Optional[float] = None
+    hedge_max_fraction: float = 0.1
+    row_timeout: Optional[float] = None
+    request_timeout: float = 600.0
+    stage_timeouts: Dict[str, float] = field(default_factory=dict)
+    stream: bool = False
+    batch: bool = False
+    poll_interval: float = 30.0
+    cache: str = "fuzzy"
+    output_dir: Optional[str] = None
+    output_csv: Optional[str] = None
+    track_store: Optional[str] = None
+    run_store: Optional[str] = None
+
+    def __post_init__(self):
+        if self.backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {self.backend!r}")
+        if self.cache not in CACHE_MODES:
+            raise ValueError(f"cache must be one of {CACHE_MODES}, got {self.cache!r}")
+        parse_shard(self.shard)
+        for name in ("prompts", "models", "effort", "verbosity"):
+            value = getattr(self, name)
+            if isinstance(value, str) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f"{name} must be a list of strings")
+        if not self.models:
+            self.models = list(DEFAULT_MODELS[self.backend])
+        if not self.effort or not self.verbosity:
+            raise ValueError("effort and verbosity need at least one value")
+        if self.concurrency < 1 or self.workers < 1:
+            raise ValueError("concurrency and workers must be >= 1")
+        unknown = set(self.stage_timeouts) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stage(s) in stage_timeouts: {sorted(unknown)}")
+        if self.backend == "ollama" and (self.batch or self.workers > 1):
+            raise ValueError("batch and workers > 1 are only supported by the openai backend")
+        if self.stream and self.batch:
+            raise ValueError("stream and batch cannot be combined")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SweepConfig":
+        """
+        Builds a config from file/CLI values.
+
+        Raises:
+            ValueError: On unknown keys or invalid values.
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown config key(s): {sorted(unknown)}")
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def selection(self) -> dict:
+        """Keyword arguments for :func:`select_prompts`."""
+        shard, num_shards = parse_shard(self.shard)
+        return {
+            "shard": shard,
+            "num_shards": num_shards,
+            "sample_rate": self.sample_rate,
+            "sample_size": self.sample_size,
+            "seed": self.seed,
+            "limit": self.limit,
+        }
+
+    def load_prompts(self) -> List[str]:
+        """The prompts this run uses, after shard/sample/limit selection."""
+        if self.prompts_file:
+            return load_prompts(self.prompts_file, **self.selection())
+        # Keyed by text, as for a prompts file without IDs
+        records = (PromptRecord(i, text, text) for i, text in enumerate(self.prompts))
+        return [rec.text for rec in select_prompts(records, **self.selection())]
+
+    def csv_name(self) -> str:
+        """Results file name, with a shard suffix for sharded runs."""
+        if self.output_csv:
+            return self.output_csv
+        name = DEFAULT_CSV_NAMES[self.backend]
+        if self.shard == "0/1":
+            return name
+        stem, ext = name.rsplit(".", 1)
+        return "{}_shard{}of{}.{}".format(stem, *self.shard.split("/"), ext)
+
+
+def track_lookup(spotify_client, cache: str = "fuzzy"):
+    """Wraps `spotify_client` in the lookup cache selected by `cache`."""
+    if cache == "off":
+        return spotify_client
+    from api_clients.track_index import TrackLookupIndex
+
+    if cache == "exact":
+        return TrackLookupIndex(spotify_client, fuzzy_threshold=float("inf"))
+    return TrackLookupIndex(spotify_client)
+
+
+def read_config_file(path: str) -> dict:
+    """
+    Reads a JSON or TOML (by extension, Python 3.11+) config file.
+
+    Raises:
+        ValueError: If the file is not a table/object, or is TOML on a
+            Python without tomllib.
+    """
+    if str(path).endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("TOML config files need Python 3.11+; use JSON instead") from None
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object / TOML table at the top level")
+    return data
+
+
+def _stage_timeout(spec: str):
+    stage, sep, seconds = spec.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected STAGE=SECONDS, got {spec!r}")
+    try:
+        return stage, float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number of seconds: {seconds!r}") from None
+
+
+def add_config_args(parser: argparse.ArgumentParser, backend: Optional[str] = None) -> None:
+    """
+    Adds --config plus one flag per :class:`SweepConfig` field.
+
+    Flags default to "not given" so that only those on the command line
+    override the config file. With `backend`, --backend is omitted and
+    that backend is the default (for the per-backend entry points).
+    """
+    parser.set_defaults(_backend_default=backend)
+    add = parser.add_argument
+    add("--config", help="JSON or TOML file with SweepConfig keys; flags override it")
+    add("--print-config", action="store_true", help="Print the resolved config as JSON and exit")
+    if backend is None:
+        add("--backend", choices=BACKENDS, default=None, help="Model backend (default openai)")
+
+    prompts = parser.add_argument_group("prompts")
+    prompts.add_argument("--prompts", dest="prompts_file", help="Text/JSONL prompt file, e.g. "
+                         "shuffled_prompts.txt (default: a few built-in prompts)")
+    prompts.add_argument("--shard", help="0-based shard 'i/N' (default 0/1)")
+    prompts.add_argument("--sample-rate", type=float, help="Keep each prompt with this probability")
+    prompts.add_argument("--sample-size", type=int, help="Keep a seeded sample of this many prompts")
+    prompts.add_argument("--seed", type=int)
+    prompts.add_argument("--limit", type=int, help="Use at most this many prompts")
+
+    matrix = parser.add_argument_group("matrix")
+    matrix.add_argument("--models", nargs="+", help="Models to benchmark")
+    matrix.add_argument("--effort", nargs="+", help="Reasoning effort values (openai)")
+    matrix.add_argument("--verbosity", nargs="+", help="Verbosity values (openai)")
+
+    run = parser.add_argument_group("execution")
+    run.add_argument("--concurrency", type=int, help="Concurrent rows per worker (default 5)")
+    run.add_argument("--workers", type=int, help="Worker processes; >1 splits the sweep across processes")
+    run.add_argument("--rate-limit", type=float, help="Global OpenAI requests/second (shared by all workers)")
+    run.add_argument("--burst", type=int, help="Rate-limit bucket size (default: total concurrency)")
+    run.add_argument("--hedge", type=float, metavar="PERCENTILE",
+                     help="Duplicate OpenAI requests slower than this latency percentile (e.g. 95)")
+    run.add_argument("--hedge-max-fraction", type=float,
+                     help="Cap on hedged requests as a fraction of traffic (default 0.1)")
+    run.add_argument("--row-timeout", type=float,
+                     help="Seconds a row may take end to end; slower rows are recorded as timed out")
+    run.add_argument("--request-timeout", type=float, help="Seconds per OpenAI request attempt (default 600)")
+    run.add_argument("--stage-timeout", dest="stage_timeouts", action="append", type=_stage_timeout,
+                     metavar="STAGE=SECONDS", help=f"Per-stage limit; STAGE is one of {', '.join(STAGES)}")
+    run.add_argument("--stream", action="store_true", default=None,
+                     help="Stream responses and validate tracks while the model is still generating")
+    run.add_argument("--batch", action="store_true", default=None,
+                     help="Submit through the OpenAI Batch API (cheaper, up to 24h turnaround)")
+    run.add_argument("--poll-interval", type=float, help="Seconds between batch status checks (default 30)")
+
+    out = parser.add_argument_group("caching and output")
+    out.add_argument("--cache", choices=CACHE_MODES, help="Track-lookup cache (default fuzzy)")
+    out.add_argument("--output-dir", help="Run directory (default output/<timestamp>)")
+    out.add_argument("--output-csv", help="Results file name inside the run directory")
+    out.add_argument("--track-store", help="Track metadata store to enrich; '' to skip")
+    out.add_argument("--run-store", help="Run database to record the results in; '' to skip")
+
+
+def config_from_args(args: argparse.Namespace) -> SweepConfig:
+    """
+    Resolves the config: built-in defaults, then --config, then flags.
+
+    Raises:
+        ValueError: On unknown keys or invalid values.
+    """
+    values = vars(args).copy()
+    data = read_config_file(values.pop("config")) if values.get("config") else {}
+    backend_default = values.pop("_backend_default", None)
+    values.pop("print_config", None)
+    if backend_default:
+        data.setdefault("backend", backend_default)
+    if values.get("stage_timeouts"):
+        values["stage_timeouts"] = {**data.get("stage_timeouts", {}), **dict(values["stage_timeouts"])}
+    data.update({k: v for k, v in values.items() if v is not None})
+    return SweepConfig.from_dict(data)
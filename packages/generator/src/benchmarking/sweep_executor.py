@@ -0,0 +1,225 @@
+"""
+Multi-process executor for large OpenAI benchmark sweeps.
+
+A single :class:`OpenAIModelAsyncBenchmark` runs every combination on
+one event loop, so JSON parsing, logging and CSV formatting compete with
+I/O on one core. :func:`run_sweep` splits the prompt x model x effort x
+verbosity matrix across worker processes instead. Each worker has its
+own event loop, OpenAI manager and Spotify client, and all workers draw
+from one :class:`SharedRateLimiter` request budget. Workers stream
+finished rows back to the coordinator, which is the only writer of the
+output CSV.
+
+Factories passed to :func:`run_sweep` run inside the workers and must be
+picklable (module-level functions or ``functools.partial`` of them).
+"""
+
+import functools
+import itertools
+import multiprocessing
+import os
+import queue
+import traceback
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from benchmarking.base_benchmark import BaseBenchmark
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+from utils.logger_config import logger
+from utils.rate_limiter import SharedRateLimiter
+
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class _QueueSinkBenchmark(OpenAIModelAsyncBenchmark):
+    """Worker-side benchmark that ships rows to the coordinator."""
+
+    def __init__(self, rows_queue, worker_id, **kwargs):
+        super().__init__(output_csv=None, **kwargs)
+        self._rows_queue = rows_queue
+        self._worker_id = worker_id
+        self.rows_sent = 0
+
+    def record_result(self, row: dict):
+        self._rows_queue.put(("row", self._worker_id, row))
+        self.rows_sent += 1
+
+
+def openai_manager_factory(limiter=None, hedge_percentile=None, hedge_max_fraction=0.1,
+                           request_timeout=600.0):
+    """
+    Default worker manager: OpenAIAsyncManager keyed from $OPENAI_API_KEY,
+    optionally hedging requests slower than `hedge_percentile`.
+    """
+    from dotenv import load_dotenv
+    from playlist_generation.openai_async_manager import OpenAIAsyncManager
+    from utils.hedging import HedgePolicy
+
+    load_dotenv()
+    hedging = HedgePolicy(hedge_percentile, hedge_max_fraction) if hedge_percentile else None
+    return OpenAIAsyncManager(os.getenv("OPENAI_API_KEY"), limiter=limiter, hedging=hedging,
+                              request_timeout=request_timeout)
+
+
+def spotify_client_factory(token, cache="fuzzy"):
+    """
+    Default worker Spotify client. `token` is a token dict or, better, a
+    TokenHandler: each worker gets a copy that starts from the
+    coordinator's token and refreshes it on its own. `cache` is a
+    track-lookup cache mode (see `benchmarking.sweep_config`).
+    """
+    from api_clients.spotify_client import SpotifyClient
+    from benchmarking.sweep_config import track_lookup
+
+    return track_lookup(SpotifyClient(token), cache)
+
+
+def _worker_main(worker_id, combos, manager_factory, spotify_factory, limiter,
+                 concurrency, rows_queue, log_dir, bench_options):
+    import asyncio
+
+    try:
+        if log_dir:
+            from utils.logger_config import set_log_file
+            set_log_file(str(Path(log_dir) / f"worker{worker_id}.log"), mode="w", queued=True,
+                         max_message_chars=8192)
+        spotify_client = spotify_factory()
+        bench = _QueueSinkBenchmark(
+            rows_queue, worker_id,
+            prompts=[], models=[],
+            manager=manager_factory(limiter),
+            spotify_client=spotify_client,
+            **bench_options,
+        )
+        asyncio.run(bench.run(concurrency=concurrency, combos=combos, progress=False))
+        # TrackLookupIndex wraps the SpotifyClient that records the IDs
+        client = getattr(spotify_client, "client", spotify_client)
+        track_ids = dict(getattr(client, "track_ids", {}))
+        rows_queue.put(("done", worker_id, {"rows": bench.rows_sent, "track_ids": track_ids}))
+    except BaseException:
+        rows_queue.put(("error", worker_id, traceback.format_exc()))
+    finally:
+        from utils.logger_config import stop_queue_logging
+        stop_queue_logging()
+
+
+def split_combos(combos: Sequence[tuple], workers: int) -> List[List[tuple]]:
+    """
+    Deals combinations round-robin, so each worker gets a similar mix of
+    prompts, models and settings (and hence of expected latency).
+    """
+    return [list(combos[i::workers]) for i in range(workers)]
+
+
+def run_sweep(
+        prompts: Sequence[str],
+        models: Sequence[str],
+        output_csv: str,
+        effort: Sequence[str] = ("minimal",),
+        verb: Sequence[str] = ("low",),
+        workers: Optional[int] = None,
+        concurrency: int = 5,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        manager_factory: Callable = openai_manager_factory,
+        spotify_factory: Optional[Callable] = None,
+        log_dir: Optional[str] = None,
+        progress: bool = True,
+        row_timeout: Optional[float] = None,
+        stage_timeouts: Optional[dict] = None,
+        stream: bool = False,
+) -> dict:
+    """
+    Runs the benchmark matrix across worker processes into one CSV.
+
+    Args:
+        prompts, models, effort, verb: Sweep axes.
+        output_csv: Merged output written by the coordinator.
+        workers: Worker processes; defaults to the CPU count.
+        concurrency: Concurrent rows per worker.
+        rate_limit: Global OpenAI requests/second across all workers;
+            None leaves requests unthrottled.
+        burst: Rate-limit bucket size; defaults to the total concurrency.
+        manager_factory: Called in each worker with the shared limiter
+            (or None); returns an OpenAIAsyncManager-like object.
+        spotify_factory: Called in each worker; returns the Spotify
+            client. Defaults to one sharing a TokenHandler warmed up here.
+        log_dir: Write a log file per worker into this directory.
+        progress: Show a tqdm progress bar.
+        row_timeout, stage_timeouts: Per-row and per-stage deadlines, as
+            for OpenAIModelAsyncBenchmark.
+        stream: Overlap validation with streamed generation, as for
+            OpenAIModelAsyncBenchmark.
+
+    Returns:
+        dict: 'rows' written, 'failed_rows', per-worker 'workers' row
+        counts, merged Spotify 'track_ids' and any worker 'errors'.
+    """
+    combos = list(itertools.product(prompts, models, effort, verb))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(combos) or 1))
+    limiter = None
+    if rate_limit:
+        limiter = SharedRateLimiter(rate_limit, burst or workers * concurrency, context=_CONTEXT)
+    if spotify_factory is None:
+        from api_clients.token_handler import TokenHandler
+        token_handler = TokenHandler()
+        token_handler.load_token()
+        spotify_factory = functools.partial(spotify_client_factory, token_handler)
+
+    sink = BaseBenchmark(prompts, models, output_csv, None)
+    sink.initialize_csv(OpenAIModelAsyncBenchmark.FIELDNAMES)
+
+    bench_options = {"row_timeout": row_timeout, "stage_timeouts": stage_timeouts, "stream": stream}
+    rows_queue = _CONTEXT.Queue()
+    processes = {}
+    for worker_id, share in enumerate(split_combos(combos, workers)):
+        proc = _CONTEXT.Process(
+            target=_worker_main,
+            args=(worker_id, share, manager_factory, spotify_factory, limiter,
+                  concurrency, rows_queue, log_dir, bench_options),
+            name=f"sweep-worker-{worker_id}",
+        )
+        proc.start()
+        processes[worker_id] = proc
+    logger.info("Sweep started: %s combos across %s workers", len(combos), workers)
+
+    summary = {"rows": 0, "failed_rows": 0, "workers": {}, "track_ids": {}, "errors": {}}
+    pending = set(processes)
+    exited = set()
+    from tqdm import tqdm
+    with tqdm(total=len(combos), desc="OpenAI sweep", unit="run", dynamic_ncols=True,
+              disable=not progress) as pbar:
+        while pending:
+            try:
+                kind, worker_id, payload = rows_queue.get(timeout=0.5)
+            except queue.Empty:
+                for worker_id in list(pending):
+                    if processes[worker_id].exitcode is None:
+                        continue
+                    # A worker flushes its queue before exiting, so one more
+                    # empty poll after seeing it exit means it died silently.
+                    if worker_id in exited:
+                        pending.discard(worker_id)
+                        summary["errors"][worker_id] = f"exited with code {processes[worker_id].exitcode}"
+                    exited.add(worker_id)
+                continue
+            if kind == "row":
+                sink.append_csv_row(payload)
+                summary["rows"] += 1
+                if not payload.get("tracks_parsed"):
+                    summary["failed_rows"] += 1
+                pbar.update(1)
+            elif kind == "done":
+                pending.discard(worker_id)
+                summary["workers"][worker_id] = payload["rows"]
+                summary["track_ids"].update(payload["track_ids"])
+            elif kind == "error":
+                pending.discard(worker_id)
+                summary["errors"][worker_id] = payload
+                logger.error("Sweep worker %s failed:\n%s", worker_id, payload)
+
+    for proc in processes.values():
+        proc.join()
+    logger.info("Sweep finished: %s rows, %s failed, %s worker errors",
+                summary["rows"], summary["failed_rows"], len(summary["errors"]))
+    return summary
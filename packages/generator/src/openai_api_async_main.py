@@ -5,84 +5,129 @@ PlaylistGenAI — OpenAI Async Benchmark Entrypoint
 Runs the same benchmark as the sync entrypoint but executes OpenAI calls
 concurrently using asyncio. Produces an identical CSV schema so results
 are directly comparable to the sync runner.
+
+The command line is the benchmark CLI (:mod:`benchmark_cli`) with the
+backend preset to OpenAI; the sweep matrix, concurrency, limits, cache
+mode and output location come from a config file and/or flags.
 """
 
 import os
 import asyncio
+import functools
 from pathlib import Path
-from datetime import datetime
-from dotenv import load_dotenv
-
-from playlist_generation.openai_async_manager import OpenAIAsyncManager
-from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
-from api_clients.token_handler import TokenHandler
-from api_clients.spotify_client import SpotifyClient
-from utils.logger_config import set_log_file
-
-
-load_dotenv()
-API_KEY = os.getenv("OPENAI_API_KEY")
-
-
-async def main_async():
-    prompts = [
-        "Darth Vader's tea party playlist",
-        "Playlist for aliens trying to blend in at a human barbecue",
-        "The Joker’s grocery shopping playlist",
-    ]
-
-    models = [
-        # "gpt-5",
-        # "gpt-5-mini",
-        "gpt-5-nano",
-        # "gpt-5-chat-latest"
-    ]
-
-    effort = [
-        "minimal",
-        # "low",
-        # "medium",
-        # "high"
-    ]
-
-    verb = [
-        "low",
-        # "medium",
-        # "high"
-    ]
-
-    # Create per-run output directory under repo-root/output/YYYYMMDD_HHMMSS
-    repo_root = Path(__file__).resolve().parents[3]
-    output_root = repo_root / "output"
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    run_dir = output_root / timestamp
-    run_dir.mkdir(parents=True, exist_ok=True)
 
-    # Configure logging to file inside the run directory
-    set_log_file(str(run_dir / "playlistGenAI.log"), mode="w")
+from utils.logger_config import logger, set_log_file
 
-    manager = OpenAIAsyncManager(API_KEY)
-    csv_file_path = str(run_dir / "openai_benchmark_results_async.csv")
+# The OpenAI SDK, requests, tqdm and the benchmark modules are imported
+# inside main_async, and only for the mode in use, so --help and argument
+# errors return immediately and sweep workers skip what they don't run.
 
-    token_handler = TokenHandler()
-    token = token_handler.load_token()
-    spotify_client = SpotifyClient(token)
-
-    benchmark = OpenAIModelAsyncBenchmark(
-        prompts=prompts,
-        models=models,
-        manager=manager,
-        effort=effort,
-        verb=verb,
-        output_csv=csv_file_path,
-        spotify_client=spotify_client,
-    )
 
-    await benchmark.run(concurrency=5)
+async def main_async(config, run_dir):
+    """
+    Runs an OpenAI benchmark sweep.
+
+    Args:
+        config (SweepConfig): What to run and how.
+        run_dir (Path): Directory for the CSV and log.
+    """
+    from dotenv import load_dotenv
+    from api_clients.spotify_client import SpotifyClient
+    from api_clients.token_handler import TokenHandler
+    from api_clients.track_enricher import TrackEnricher
+    from benchmarking.sweep_config import track_lookup
+    from utils.track_store import TrackStore
 
+    load_dotenv()
+    prompts = config.load_prompts()
+    run_dir = Path(run_dir)
 
-def main():
-    asyncio.run(main_async())
+    # Configure logging to file inside the run directory
+    # Queued so file I/O and formatting stay off the event loop thread
+    set_log_file(
+        str(run_dir / "playlistGenAI.log"),
+        mode="w",
+        queued=True,
+        max_message_chars=8192,
+    )
+
+    csv_file_path = str(run_dir / config.csv_name())
+
+    # The client asks the handler for a token per request, so it is
+    # refreshed in the background rather than expiring mid-sweep
+    token_handler = TokenHandler()
+    await token_handler.aget_token()
+    spotify_client = SpotifyClient(token_handler)
+
+    if config.workers > 1 and not config.batch:
+        from benchmarking.sweep_executor import openai_manager_factory, run_sweep, spotify_client_factory
+
+        # Metrics and traces stay in each worker process; rows are merged here
+        summary = await asyncio.to_thread(
+            run_sweep, prompts, config.models, csv_file_path, effort=config.effort, verb=config.verbosity,
+            workers=config.workers, concurrency=config.concurrency, rate_limit=config.rate_limit,
+            burst=config.burst,
+            manager_factory=functools.partial(openai_manager_factory, hedge_percentile=config.hedge,
+                                              hedge_max_fraction=config.hedge_max_fraction,
+                                              request_timeout=config.request_timeout),
+            row_timeout=config.row_timeout, stage_timeouts=config.stage_timeouts, stream=config.stream,
+            spotify_factory=functools.partial(spotify_client_factory, token_handler, cache=config.cache),
+            log_dir=str(run_dir),
+        )
+        spotify_client.track_ids.update(summary["track_ids"])
+        print(f"Sweep wrote {summary['rows']} rows ({summary['failed_rows']} failed, "
+              f"{len(summary['errors'])} worker errors)")
+    else:
+        from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+        from playlist_generation.openai_async_manager import OpenAIAsyncManager
+        from utils.hedging import HedgePolicy
+        from utils.rate_limiter import SharedRateLimiter
+
+        limiter = None
+        if config.rate_limit:
+            limiter = SharedRateLimiter(config.rate_limit, config.burst or config.concurrency)
+        hedging = HedgePolicy(config.hedge, config.hedge_max_fraction) if config.hedge else None
+        manager = OpenAIAsyncManager(os.getenv("OPENAI_API_KEY"), limiter=limiter, hedging=hedging,
+                                     request_timeout=config.request_timeout)
+        track_index = track_lookup(spotify_client, config.cache)
+
+        benchmark = OpenAIModelAsyncBenchmark(
+            prompts=prompts,
+            models=config.models,
+            manager=manager,
+            effort=config.effort,
+            verb=config.verbosity,
+            output_csv=csv_file_path,
+            spotify_client=track_index,
+            row_timeout=config.row_timeout,
+            stage_timeouts=config.stage_timeouts,
+            stream=config.stream,
+        )
+
+        if config.batch:
+            await benchmark.run_batch(str(run_dir), poll_interval=config.poll_interval)
+        else:
+            await benchmark.run(concurrency=config.concurrency)
+        if track_index is not spotify_client:
+            logger.info(track_index.format_stats())
+            print(track_index.format_stats())
+
+    # Bulk-fetch metadata for every track found during validation into the
+    # store shared across runs (read by the evaluator).
+    if config.track_store:
+        try:
+            with TrackStore(config.track_store) as store:
+                await asyncio.to_thread(TrackEnricher(spotify_client, store).enrich_from_client)
+        except Exception as e:
+            # The results are already written; losing enrichment must not lose the run
+            logger.warning("Track store enrichment into %s failed: %s", config.track_store, e)
+            print(f"Track store enrichment failed: {e}")
+
+
+def main(argv=None):
+    from benchmark_cli import main as cli_main
+
+    return cli_main(argv, backend="openai")
 
 
 if __name__ == "__main__":
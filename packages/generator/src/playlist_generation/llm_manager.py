@@ -5,11 +5,15 @@ Provides methods to start, stop, and check the Ollama server, as well as send pr
 to generate playlist responses in JSON format.
 """
 
+import json
 import subprocess
 import requests
 import time
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import DeadlineExceeded
 from utils.helpers import extract_array
 from utils.helpers import logged_request
+from utils.metrics import LLM_INFLIGHT, LLM_REQUEST_SECONDS, LLM_TOKENS
 
 class OllamaManager:
     """
@@ -17,7 +21,10 @@ class OllamaManager:
     on specified LLM models and retrieve text responses.
     """
 
-    def __init__(self):
+    def __init__(self, timeout: float = 180.0):
+        # Per-request timeout in seconds; a tighter caller deadline
+        # (utils.deadline) takes precedence inside logged_request
+        self.timeout = timeout
         # Ollama REST API endpoint. 
         self.url = "http://localhost:11434/api/generate"
         # Prompt instructing the model to respond in a specific JSON format.
@@ -59,12 +66,13 @@ class OllamaManager:
             RequestException: if post unsuccessful
         """
         try:
-            r = logged_request("POST", self.url, json={"model": model, "prompt": "", "stream": False}, timeout=5)
+            r = logged_request("POST", self.url, json={"model": model, "prompt": "", "stream": False}, timeout=5,
+                               circuit=False)
             return r.status_code == 200
         except requests.exceptions.RequestException:
             return False
         
-    def get_response(self, model, prompt):
+    def get_response(self, model, prompt, on_delta=None):
         """
         Sends a prompt to the specified Ollama model and returns the model's response as a string
         Appends the system prompt to enforce JSON format.
@@ -72,34 +80,76 @@ class OllamaManager:
         Args:
             model (string): The name of the model being used
             prompt (string): The prompt passed to the model
+            on_delta (callable, optional): Stream the response, calling this with each
+                piece of text as the model produces it
         
         Returns:
             string: The response from the mode
         
         Raises:
-            error: if the request isn't returned within 3 minutes it returns an error message to be logged
+            error: if the request isn't returned within `timeout` seconds it returns an error message to be logged
+            CircuitOpenError, DeadlineExceeded: if the server is down or the caller's deadline passed
         """
         full_prompt = prompt + " " + self.system_prompt
         payload = {
             "model": model,
             "prompt": full_prompt,
             "format": "json",
-            "stream": False
+            "stream": on_delta is not None
         }
         print(payload)
 
         try:
-            raw_response = logged_request("POST", self.url, json=payload, timeout=180)
-            raw_response.raise_for_status()
-            # Ollama returns a response in a JSON string field named 'response'
-            raw_json_string = raw_response.json()['response']
+            with LLM_INFLIGHT.track_inprogress(backend="ollama"), \
+                    LLM_REQUEST_SECONDS.time(backend="ollama", operation="generate", model=model):
+                raw_response = logged_request("POST", self.url, json=payload, timeout=self.timeout,
+                                              stream=payload["stream"])
+                raw_response.raise_for_status()
+                if on_delta is None:
+                    body = raw_response.json()
+                    # Ollama returns a response in a JSON string field named 'response'
+                    raw_json_string = body['response']
+                else:
+                    body, raw_json_string = self._read_stream(raw_response, on_delta)
+            # Ollama reports prompt/completion token counts alongside the text
+            for direction, field in (("input", "prompt_eval_count"), ("output", "eval_count")):
+                if isinstance(body.get(field), int):
+                    LLM_TOKENS.inc(body[field], backend="ollama", model=model, direction=direction)
             # Extract the array potion from the raw JSON string for further processing
             response = extract_array(raw_json_string)
 
             return response
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except:
-            return {"error": "The request timed out after 3 mins"}
+            return {"error": f"The request timed out after {self.timeout:g} s"}
         
+    @staticmethod
+    def _read_stream(raw_response, on_delta):
+        """
+        Reads a streamed /api/generate response: one JSON object per line,
+        each with the next piece of 'response', the last marked 'done'.
+
+        Returns:
+            tuple: (final object, with the token counts; full response text)
+        """
+        parts, body = [], {}
+        try:
+            for line in raw_response.iter_lines():
+                if not line:
+                    continue
+                body = json.loads(line)
+                if body.get("error"):
+                    raise RuntimeError(body["error"])
+                if body.get("response"):
+                    parts.append(body["response"])
+                    on_delta(body["response"])
+                if body.get("done"):
+                    break
+        finally:
+            raw_response.close()
+        return body, "".join(parts)
+
     def kill_ollama_servers(self):
         """
         Finds and kills any running Ollama server processes.
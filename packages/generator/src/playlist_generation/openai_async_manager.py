@@ -1,12 +1,83 @@
-from typing import Optional, Tuple, Callable, Awaitable, TypeVar
+from typing import TYPE_CHECKING, Optional, Tuple, Callable, Awaitable, TypeVar, Dict, AsyncIterator, NamedTuple
+from types import SimpleNamespace
 import asyncio
-import random
+import hashlib
+import json
+import os
 import time
-from openai import AsyncOpenAI
 from utils.logger_config import logger
+from utils.metrics import (
+    LLM_FAILURES,
+    LLM_INFLIGHT,
+    LLM_REQUEST_SECONDS,
+    LLM_RETRIES,
+    LLM_TOKENS,
+    error_cause,
+)
+from utils.circuit_breaker import CircuitBreaker, circuit_breaker
+from utils.deadline import DeadlineExceeded, check as check_deadline, clamp_timeout, remaining
+from utils.hedging import LLM_HEDGES, HedgePolicy
+from utils.retry_policy import RetryPolicy
+from utils.tracing import span
+
+if TYPE_CHECKING:
+    # The SDK takes most of a second to import; only load it to build a client
+    from openai import AsyncOpenAI
 
 R = TypeVar("R")
 
+BATCH_ENDPOINT = "/v1/responses"
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# Batch API limit on requests per input file
+MAX_BATCH_REQUESTS = 50_000
+
+
+class StreamInterrupted(RuntimeError):
+    """A streamed response failed after part of its text was delivered."""
+
+
+class BatchResult(NamedTuple):
+    custom_id: str
+    text: Optional[str]
+    usage: object
+    error: Optional[str]
+
+
+def _response_output_text(body: dict) -> str:
+    """Concatenated output_text of a raw Responses API body (as the SDK computes it)."""
+    if isinstance(body.get("output_text"), str):
+        return body["output_text"]
+    parts = []
+    for item in body.get("output") or []:
+        if item.get("type") != "message":
+            continue
+        for content in item.get("content") or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
+
+
+def _body_digest(body: dict) -> str:
+    """Stable digest of a batch request body, for matching saved batches."""
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def parse_batch_line(line: str) -> BatchResult:
+    """Parses one line of a Batch API output or error file."""
+    record = json.loads(line)
+    custom_id = record.get("custom_id")
+    if record.get("error"):
+        err = record["error"]
+        return BatchResult(custom_id, None, None, f"{err.get('code')}: {err.get('message')}")
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    status = response.get("status_code")
+    if status != 200:
+        err = body.get("error") or {}
+        return BatchResult(custom_id, None, None, f"HTTP {status}: {err.get('message', 'request failed')}")
+    usage = body.get("usage") or {}
+    return BatchResult(custom_id, _response_output_text(body), SimpleNamespace(**usage), None)
+
 class OpenAIAsyncManager:
     """
     Async twin of OpenAIManger. Same inputs/outputs, but awaitable.
@@ -17,14 +88,33 @@ class OpenAIAsyncManager:
             model: str = "gpt-5-nano",
             max_retries: int = 5,
             backoff_base: float = 0.5,
-            client: Optional[AsyncOpenAI] = None,
+            client: Optional["AsyncOpenAI"] = None,
             sleep: Optional[Callable[[float], Awaitable[None]]] = None,
+            limiter=None,
+            retry_policy: Optional[RetryPolicy] = None,
+            breaker: Optional[CircuitBreaker] = None,
+            hedging: Optional[HedgePolicy] = None,
+            request_timeout: Optional[float] = 600.0,
     ):
         self.model = model
-        self.client = client or AsyncOpenAI(api_key=api_key)
+        # Optional shared request budget (e.g. utils.rate_limiter.SharedRateLimiter)
+        self.limiter = limiter
+        if client is None:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=api_key)
+        self.client = client
         self.max_retries = max_retries
         self.backoff_base = backoff_base
         self._sleep = sleep or asyncio.sleep
+        # Classification, backoff and the process-wide retry budget
+        self.retry_policy = retry_policy or RetryPolicy(
+            "openai", max_attempts=max_retries, backoff_base=backoff_base)
+        # Fails calls fast while the API is down (shared by all managers)
+        self.breaker = breaker or circuit_breaker("openai")
+        # Optional duplicate requests for slow-tail calls
+        self.hedging = hedging
+        # Per-attempt timeout; further capped by any deadline set by the caller
+        self.request_timeout = request_timeout
         self.system_prompt = (
             """You are an AI DJ with a mischievous sense of humor and impeccable taste in music.
                 Your job is to create playlists in response to surreal, whimsical, or unusual prompts.
@@ -59,27 +149,62 @@ class OpenAIAsyncManager:
         
     async def get_response(
                 self, prompt: str, model_name: Optional[str] = None,
-                effort: str = "minimal", verb: str = "low"
+                effort: str = "minimal", verb: str = "low",
+                on_delta: Optional[Callable[[str], None]] = None,
         ) -> Tuple[str, object]:
+            """
+            Generates a freeform playlist for `prompt`.
+
+            Args:
+                on_delta: Stream the response, calling this with each
+                    piece of output text as it arrives (e.g. to start
+                    validating tracks before generation finishes). A
+                    streamed call is retried only until its first piece
+                    is delivered, and is never hedged.
+
+            Returns:
+                tuple: (output text, usage)
+            """
             model = model_name or self.model
+            outcome = {}
+
+            def deliver(delta):
+                # Once text is out, _with_retry must not replay the call
+                outcome["delivered"] = True
+                on_delta(delta)
 
             async def _call():
-                return await self.client.responses.create(
+                if on_delta is None:
+                    return await self.client.responses.create(
+                        model=model,
+                        reasoning={"effort": effort},
+                        text={"verbosity": verb},
+                        instructions=self.system_prompt,
+                        input=prompt,
+                    )
+                stream = await self.client.responses.create(
                     model=model,
                     reasoning={"effort": effort},
                     text={"verbosity": verb},
                     instructions=self.system_prompt,
                     input=prompt,
+                    stream=True,
                 )
+                return await self._consume_stream(stream, deliver)
 
             operation = self._format_operation(
                 "responses.create",
                 model=model,
                 prompt_preview=self._preview(prompt),
+                note="stream" if on_delta else None,
             )
-            resp = await self._with_retry(_call, operation)
+            resp = await self._with_retry(_call, operation, kind="generate", model=model, outcome=outcome,
+                                          hedge=on_delta is None)
             text = getattr(resp, "output_text", "")
             usage = getattr(resp, "usage", None)
+            if outcome.get("hedged"):
+                usage = self._hedged_usage(usage)
+            self._record_usage(model, usage)
             logger.info(
                 "OpenAI call %s completed; output='%s'; usage=%s",
                 operation,
@@ -104,8 +229,12 @@ class OpenAIAsyncManager:
                 prompt_preview=self._preview(freeform_playlist_text),
                 note="json_conversion",
             )
-            resp = await self._with_retry(_call, operation)
+            outcome = {}
+            resp = await self._with_retry(_call, operation, kind="json_conversion", model=self.model,
+                                          outcome=outcome)
             text = getattr(resp, "output_text", "")
+            usage = getattr(resp, "usage", None)
+            self._record_usage(self.model, self._hedged_usage(usage) if outcome.get("hedged") else usage)
             logger.info(
                 "OpenAI call %s completed; json_preview='%s'",
                 operation,
@@ -113,20 +242,246 @@ class OpenAIAsyncManager:
             )
             return text
 
-    async def _with_retry(self, fn: Callable[[], Awaitable[R]], operation: str) -> R:
+    async def _consume_stream(self, stream, on_delta: Callable[[str], None]):
+            """
+            Reads a Responses API event stream, passing text deltas to
+            `on_delta`. Returns the completed response (or a stand-in
+            with the joined text if the stream ends without one).
+
+            A failure after the first delta is turned into StreamInterrupted
+            by :meth:`_with_retry` (see the ``delivered`` outcome flag).
+            """
+            parts = []
+            completed = None
+            async for event in stream:
+                kind = getattr(event, "type", "")
+                if kind == "response.output_text.delta":
+                    parts.append(event.delta)
+                    on_delta(event.delta)
+                elif kind == "response.completed":
+                    completed = event.response
+                elif kind in ("response.failed", "error"):
+                    error = getattr(getattr(event, "response", None), "error", None) or event
+                    raise RuntimeError(f"stream {kind}: {getattr(error, 'message', error)}")
+            if completed is None:
+                return SimpleNamespace(output_text="".join(parts), usage=None)
+            if not getattr(completed, "output_text", None):
+                completed.output_text = "".join(parts)
+            return completed
+
+    def generate_request(
+                self, prompt: str, model_name: Optional[str] = None,
+                effort: str = "minimal", verb: str = "low"
+        ) -> dict:
+            """Responses API body equivalent to :meth:`get_response`."""
+            return {
+                "model": model_name or self.model,
+                "reasoning": {"effort": effort},
+                "text": {"verbosity": verb},
+                "instructions": self.system_prompt,
+                "input": prompt,
+            }
+
+    def json_conversion_request(self, freeform_playlist_text: str) -> dict:
+            """Responses API body equivalent to :meth:`convert_to_json`."""
+            return {
+                "model": self.model,
+                "reasoning": {"effort": "minimal"},
+                "text": {"verbosity": "low"},
+                "instructions": self.alt_sys_prompt,
+                "input": freeform_playlist_text,
+            }
+
+    async def run_batch(
+                self, bodies: Dict[str, dict], request_path: str,
+                poll_interval: float = 30.0, max_requests: int = MAX_BATCH_REQUESTS,
+        ) -> AsyncIterator[BatchResult]:
+            """
+            Runs requests through the OpenAI Batch API.
+
+            Writes the request file(s), uploads and submits them, polls
+            until every batch finishes, then yields one result per
+            request as each batch's output is downloaded. Requests a
+            batch did not complete (failed/expired/cancelled) are yielded
+            with an error.
+
+            Unfinished batches are recorded in ``<request root>.batches.json``
+            (removed once all are done); a rerun with the same
+            `request_path` resumes polling those whose request bodies are
+            unchanged and only submits requests they do not cover.
+
+            Args:
+                bodies: custom_id -> Responses API request body.
+                request_path: JSONL path for the request file; larger
+                    sweeps get numbered siblings, one per batch.
+                poll_interval: Seconds between status checks.
+                max_requests: Requests per batch file.
+
+            Yields:
+                BatchResult: (custom_id, text, usage, error).
+            """
+            root, ext = os.path.splitext(request_path)
+            state_path = f"{root}.batches.json"
+            # batch_id -> {custom_id: body digest}
+            pending = self._load_batch_state(state_path, bodies)
+            submitted = {custom_id for chunk in pending.values() for custom_id in chunk}
+            ids = [custom_id for custom_id in bodies if custom_id not in submitted]
+            if pending:
+                logger.info("Resuming %s submitted batch(es) from %s", len(pending), state_path)
+            chunks = [ids[i:i + max_requests] for i in range(0, len(ids), max_requests)]
+            for n, chunk in enumerate(chunks):
+                path = request_path if len(chunks) == 1 and not pending else f"{root}.{len(pending)}{ext}"
+                with open(path, "w", encoding="utf-8") as f:
+                    for custom_id in chunk:
+                        line = {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT,
+                                "body": bodies[custom_id]}
+                        f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+                async def _upload(path=path):
+                    # Fresh handle per attempt; a failed upload may have read it
+                    with open(path, "rb") as f:
+                        return await self.client.files.create(file=f, purpose="batch")
+
+                uploaded = await self._with_retry(_upload, f"batch upload {path}", kind="batch", hedge=False)
+                batch = await self._with_retry(
+                    lambda: self.client.batches.create(
+                        input_file_id=uploaded.id, endpoint=BATCH_ENDPOINT, completion_window="24h",
+                    ),
+                    f"batch create {path}", kind="batch", hedge=False,
+                )
+                logger.info("Submitted batch %s (%s requests from %s)", batch.id, len(chunk), path)
+                pending[batch.id] = {custom_id: _body_digest(bodies[custom_id]) for custom_id in chunk}
+                # Recorded before polling so a rerun resumes instead of resubmitting
+                self._save_batch_state(state_path, pending)
+
+            while pending:
+                for batch_id in list(pending):
+                    batch = await self._with_retry(
+                        lambda: self.client.batches.retrieve(batch_id),
+                        f"batch retrieve {batch_id}", kind="batch", hedge=False,
+                    )
+                    if batch.status not in BATCH_TERMINAL_STATUSES:
+                        continue
+                    chunk = pending.pop(batch_id)
+                    logger.info("Batch %s %s; request_counts=%s", batch_id, batch.status,
+                                getattr(batch, "request_counts", None))
+                    seen = set()
+                    for file_id in (batch.output_file_id, batch.error_file_id):
+                        if not file_id:
+                            continue
+                        content = await self._with_retry(
+                            lambda: self.client.files.content(file_id),
+                            f"batch download {file_id}", kind="batch", hedge=False,
+                        )
+                        for line in content.text.splitlines():
+                            if not line.strip():
+                                continue
+                            result = parse_batch_line(line)
+                            seen.add(result.custom_id)
+                            if result.error is None:
+                                model = bodies.get(result.custom_id, {}).get("model", self.model)
+                                self._record_usage(model, result.usage, backend="openai-batch")
+                            yield result
+                    for custom_id in chunk:
+                        if custom_id not in seen:
+                            yield BatchResult(custom_id, None, None, f"batch {batch.status}")
+                    # Only once its results are out, so an interrupted rerun still resumes it
+                    self._save_batch_state(state_path, pending)
+                if pending:
+                    await self._sleep(poll_interval)
+
+    @staticmethod
+    def _load_batch_state(path: str, bodies: Dict[str, dict]) -> Dict[str, list]:
+        """
+        Batches a previous run submitted for these requests (batch_id ->
+        {custom_id: body digest}), from the state file next to the
+        request files. A batch is only resumed if every request in it is
+        still asked for with the same body; custom IDs are positional, so
+        a rerun with other prompts must not pick up old outputs.
+        """
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable batch state %s: %s", path, e)
+            return {}
+        resumed = {}
+        for batch_id, chunk in state.items():
+            if isinstance(chunk, dict) and all(
+                    custom_id in bodies and digest == _body_digest(bodies[custom_id])
+                    for custom_id, digest in chunk.items()):
+                resumed[batch_id] = chunk
+            else:
+                logger.warning("Not resuming batch %s from %s: its requests changed", batch_id, path)
+        return resumed
+
+    @staticmethod
+    def _save_batch_state(path: str, pending: Dict[str, dict]) -> None:
+        """Writes the unfinished batches; removes the file once there are none."""
+        if not pending:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pending, f)
+        os.replace(tmp, path)
+
+    async def _with_retry(
+                self, fn: Callable[[], Awaitable[R]], operation: str,
+                kind: str = "generate", model: Optional[str] = None,
+                outcome: Optional[dict] = None, hedge: bool = True,
+        ) -> R:
+            """
+            Calls `fn` under the retry policy, circuit breaker, rate limiter
+            and (if enabled and `hedge`) hedging. If a hedge was fired, sets
+            ``outcome["hedged"]`` so the caller can account for its tokens.
+            Once `fn` has set ``outcome["delivered"]`` (streamed text was
+            passed on), a failure is never retried.
+
+            Each attempt is bounded by `request_timeout` and the caller's
+            deadline (utils.deadline); a retry that could not finish before
+            the deadline is not started.
+
+            Raises:
+                DeadlineExceeded: If the caller's deadline passes.
+                CircuitOpenError: If the OpenAI circuit is open.
+                StreamInterrupted: If a streamed call fails after
+                    delivering text.
+            """
             last_err = None
+            model = model or self.model
+            retry = self.retry_policy.start()
             for attempt in range(self.max_retries):
+                # Raises CircuitOpenError rather than waiting out an outage here
+                self.breaker.before_call()
+                attempt_start = time.monotonic()
                 try:
                     logger.debug(
                         "OpenAI call %s attempt %s/%s", operation, attempt + 1, self.max_retries
                     )
-                    result = await fn()
-                    logger.debug(
-                        "OpenAI call %s succeeded on attempt %s/%s",
-                        operation,
-                        attempt + 1,
-                        self.max_retries,
-                    )
+                    if self.limiter is not None:
+                        with span("llm.rate_limit_wait"):
+                            await self.limiter.acquire()
+                    with span("llm.attempt", operation=kind, model=model, attempt=attempt + 1), \
+                            LLM_INFLIGHT.track_inprogress(backend="openai"), \
+                            LLM_REQUEST_SECONDS.time(backend="openai", operation=kind, model=model):
+                        timeout = clamp_timeout(self.request_timeout, f"openai {kind}")
+                        if self.hedging is None or not hedge:
+                            call = fn()
+                        else:
+                            call = self._hedged(fn, f"{kind}:{model}", model, outcome)
+                        try:
+                            result = await asyncio.wait_for(call, timeout)
+                        except asyncio.TimeoutError:
+                            # Past the deadline: DeadlineExceeded, not retried
+                            check_deadline(f"openai {kind}")
+                            raise
+                    self.breaker.record_success()
                     logger.debug(
                         "OpenAI call %s succeeded on attempt %s/%s",
                         operation,
@@ -136,48 +491,109 @@ class OpenAIAsyncManager:
                     return result
                 except Exception as e:
                     last_err = e
-                    # Decide if retryable
-                    msg = str(e).lower()
-                    status = getattr(e, "status_code", None) or getattr(e, "status", None)
-                    retryable_status = {408, 409, 429, 500, 502, 503, 504}
-                    code = str(getattr(e, "code", "") or "").lower()
-                    invalid_prompt = (
-                        status == 400 and (
-                            "invalid_prompt" in code or "invalid prompt" in msg
-                        )
-                    )
-                    is_retryable = (
-                        (status in retryable_status)
-                        or ("rate limit" in msg)
-                        or ("retry" in msg)
-                        or ("temporar" in msg)
-                        or ("timeout" in msg)
-                        or ("server error" in msg)
-                        or invalid_prompt
-                    )
-                    if not is_retryable or attempt == self.max_retries - 1:
+                    cls = self.retry_policy.classify(e)
+                    self.breaker.record(cls.error_class)
+                    if outcome is not None and outcome.get("delivered") and not isinstance(e, DeadlineExceeded):
+                        # A replay would pass the same text on again
+                        LLM_FAILURES.inc(backend="openai", cause=error_cause(e))
+                        logger.error("OpenAI call %s failed after streaming output (%s): %s",
+                                     operation, cls.error_class, e)
+                        raise StreamInterrupted(
+                            f"stream interrupted after output was delivered: {e!r}") from e
+                    delay = retry.next_delay(cls, remaining=remaining(),
+                                             attempt_estimate=time.monotonic() - attempt_start)
+                    if delay is None:
+                        LLM_FAILURES.inc(backend="openai", cause=error_cause(e))
                         logger.error(
-                            "OpenAI call %s failed on attempt %s/%s: %s",
+                            "OpenAI call %s failed on attempt %s/%s (%s, %s): %s",
                             operation,
                             attempt + 1,
                             self.max_retries,
+                            cls.error_class,
+                            retry.decision,
                             e,
                         )
                         raise
-                    # Prefer server-provided retry hints
-                    delay = self._retry_after_from_error(e)
-                    if delay is None:
-                        # Exponential backoff with jitter
-                        delay = self.backoff_base * (2 ** attempt) + random.uniform(0, 0.25)
+                    LLM_RETRIES.inc(backend="openai", cause=error_cause(e))
                     logger.warning(
                         "OpenAI call %s retrying after %.2fs due to %s",
                         operation,
                         delay,
                         e,
                     )
-                    await self._sleep(delay)
+                    with span("llm.backoff", delay=delay, cause=error_cause(e),
+                              error_class=cls.error_class):
+                        await self._sleep(delay)
             raise last_err
 
+    async def _hedged(self, fn: Callable[[], Awaitable[R]], key: str, model: str,
+                      outcome: Optional[dict]) -> R:
+            """
+            Runs `fn`, firing a duplicate once it outlives the hedge delay
+            for `key`. Returns the first successful result and cancels the
+            other request; raises only if every request fails.
+            """
+            delay = self.hedging.hedge_delay(key)
+            # One sample per call, timed from the primary's start: a winning
+            # hedge's own duration would understate what the caller waited
+            start = time.monotonic()
+            primary = asyncio.ensure_future(fn())
+            tasks = [primary]
+            try:
+                if delay is not None:
+                    await asyncio.wait(tasks, timeout=delay)
+                if primary.done() or delay is None or not self.hedging.try_hedge():
+                    result = await primary
+                    self.hedging.observe(key, time.monotonic() - start)
+                    return result
+
+                LLM_HEDGES.inc(backend="openai", model=model, outcome="fired")
+                if outcome is not None:
+                    outcome["hedged"] = True
+
+                async def hedge():
+                    with span("llm.hedge", model=model, delay=delay):
+                        if self.limiter is not None:
+                            await self.limiter.acquire()
+                        return await fn()
+
+                tasks.append(asyncio.ensure_future(hedge()))
+                pending, first_err = set(tasks), None
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            LLM_HEDGES.inc(backend="openai", model=model,
+                                           outcome="lost" if task is primary else "won")
+                            self.hedging.observe(key, time.monotonic() - start)
+                            return task.result()
+                        first_err = first_err or task.exception()
+                raise first_err
+            finally:
+                # Cancel the losing (or abandoned) request
+                losers = [t for t in tasks if not t.done()]
+                for task in losers:
+                    task.cancel()
+                if losers:
+                    await asyncio.gather(*losers, return_exceptions=True)
+
+    def _hedged_usage(self, usage):
+            """
+            Winner's usage plus the hedge's input tokens, which are billed
+            too. (The loser's partial output is cancelled and not reported.)
+            """
+            def get(field):
+                value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+                return value if isinstance(value, (int, float)) else 0
+
+            hedge_input = get("input_tokens")
+            return SimpleNamespace(
+                input_tokens=get("input_tokens"),
+                output_tokens=get("output_tokens"),
+                total_tokens=get("total_tokens") + hedge_input,
+                hedge_input_tokens=hedge_input,
+            )
+
     def _format_operation(self, endpoint: str, *, model: str, prompt_preview: str, note: Optional[str] = None) -> str:
             parts = [endpoint, f"model={model}", f"prompt='{prompt_preview}'"]
             if note:
@@ -192,6 +608,14 @@ class OpenAIAsyncManager:
                 return cleaned
             return cleaned[: limit - 3] + "..."
 
+    def _record_usage(self, model: str, usage, backend: str = "openai") -> None:
+            """Adds a response's token usage to the llm_tokens counter."""
+            for direction in ("input", "output", "hedge_input"):
+                field = f"{direction}_tokens"
+                value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+                if isinstance(value, (int, float)) and value > 0:
+                    LLM_TOKENS.inc(value, backend=backend, model=model, direction=direction)
+
     def _format_usage(self, usage) -> str:
             if not usage:
                 return "{}"
@@ -206,35 +630,3 @@ class OpenAIAsyncManager:
                     return str(usage)
                 except Exception:
                     return "{unavailable}"
-
-    def _retry_after_from_error(self, err) -> Optional[float]:
-            """Extract server-suggested delay (seconds) from error response headers, if any."""
-            try:
-                resp = getattr(err, "response", None)
-                headers = getattr(resp, "headers", None)
-                if not headers:
-                    return None
-                # Case-insensitive access
-                h = {str(k).lower(): v for k, v in headers.items()}
-                # Retry-After (seconds or HTTP date)
-                ra = h.get("retry-after")
-                if ra is not None:
-                    try:
-                        return float(ra)
-                    except Exception:
-                        # Possibly an HTTP-date; ignore for simplicity here
-                        return None
-                # OpenAI rate limit reset hints
-                reset_req = h.get("x-ratelimit-reset-requests") or h.get("x-ratelimit-reset")
-                if reset_req is not None:
-                    try:
-                        val = float(reset_req)
-                        # Heuristic: treat small values as seconds; large as epoch
-                        if val > 1e6:
-                            return max(0.0, val - time.time())
-                        return max(0.0, val)
-                    except Exception:
-                        return None
-            except Exception:
-                return None
-            return None
@@ -0,0 +1,118 @@
+"""
+PlaylistGenAI — Run database CLI
+================================
+
+Queries the run database that every ``playlist-bench`` run is recorded
+in (see :mod:`utils.run_store`), so cross-run comparisons do not
+re-parse the CSVs under ``output/``::
+
+    playlist-runs list --last 10
+    playlist-runs latency --last 20 --by model effort
+    playlist-runs summary --model gpt-5-nano --by run_id
+    playlist-runs import output/*/            # backfill older runs
+
+``--json`` prints machine-readable rows instead of a table.
+"""
+
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+
+from benchmark_cli import OUTPUT_ROOT
+from utils.run_store import GROUP_COLUMNS, RunStore
+
+DEFAULT_DB = OUTPUT_ROOT / "runs.sqlite"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Query the benchmark run database.")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="Run database (default output/runs.sqlite)")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def selection(sub):
+        sub.add_argument("--last", type=int, help="Only the N most recent runs")
+        sub.add_argument("--backend", choices=("openai", "ollama"))
+        sub.add_argument("--model", nargs="+", help="Only these models")
+        sub.add_argument("--by", nargs="+", default=["model"], choices=GROUP_COLUMNS,
+                         help="Group columns (default model)")
+
+    runs = commands.add_parser("list", help="Recorded runs, newest first")
+    runs.add_argument("--last", type=int, default=20)
+    runs.add_argument("--backend", choices=("openai", "ollama"))
+
+    latency = commands.add_parser("latency", help="Runtime percentiles of successful rows")
+    selection(latency)
+    latency.add_argument("--percentiles", nargs="+", type=float, default=[50, 90, 99])
+
+    summary = commands.add_parser("summary", help="Rows, failures, runtime, tracks and tokens")
+    selection(summary)
+
+    imports = commands.add_parser("import", help="Load results CSVs or run directories")
+    imports.add_argument("paths", nargs="+", help="Results CSVs, or run directories holding them")
+    return parser
+
+
+def _results_csvs(path):
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.glob("*.csv") if "results" in p.stem)
+    return [path]
+
+
+def _cell(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
+
+
+def format_table(rows):
+    """Rows (dicts with the same keys) as aligned text columns."""
+    if not rows:
+        return "(no rows)"
+    names = list(rows[0])
+    cells = [[_cell(r[n]) for n in names] for r in rows]
+    widths = [max(len(n), *(len(c[i]) for c in cells)) for i, n in enumerate(names)]
+    lines = ["  ".join(n.ljust(w) for n, w in zip(names, widths))]
+    lines += ["  ".join(c.ljust(w) for c, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+
+def run_command(args, store):
+    """Runs the parsed subcommand against `store`; returns result rows."""
+    if args.command == "list":
+        rows = store.runs(last=args.last, backend=args.backend)
+        for row in rows:
+            row["started_at"] = datetime.fromtimestamp(row["started_at"]).isoformat(sep=" ",
+                                                                                    timespec="seconds")
+        return rows
+    if args.command == "latency":
+        return store.latency_percentiles(args.percentiles, by=args.by, last=args.last,
+                                         backend=args.backend, model=args.model)
+    if args.command == "summary":
+        return store.summary(by=args.by, last=args.last, backend=args.backend, model=args.model)
+    imported = []
+    for path in args.paths:
+        for csv_path in _results_csvs(path):
+            run_id = store.import_csv(csv_path)
+            imported.append({"run_id": run_id, "source": str(csv_path)})
+    return imported
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        with RunStore(args.db) as store:
+            rows = run_command(args, store)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(json.dumps(rows, indent=2, ensure_ascii=False) if args.json else format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
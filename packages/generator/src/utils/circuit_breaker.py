@@ -0,0 +1,200 @@
+"""
+Per-backend circuit breakers.
+
+When a backend (the OpenAI API, the local Ollama server, Spotify) stops
+answering, retrying every row through the full backoff schedule turns an
+outage into hours of waiting. A :class:`CircuitBreaker` counts
+consecutive outage-class failures (5xx, timeouts, connection errors) and
+after `failure_threshold` of them *opens*: calls fail immediately with
+:class:`CircuitOpenError` instead of reaching the backend. After
+`recovery_time` it goes *half-open* and lets a single probe through; a
+successful probe closes it, a failed one re-opens it for twice as long
+(up to `max_recovery_time`).
+
+Breakers are shared per backend name through :func:`circuit_breaker`.
+Benchmarks use :func:`call_when_closed` / :func:`acall_when_closed` to
+pause a row's stage until its backend recovers rather than burning it
+into an error row.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from utils.logger_config import logger
+from utils.metrics import REGISTRY
+
+R = TypeVar("R")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Retry-policy error classes that indicate the backend itself is unhealthy.
+# Rate limits and client errors mean it is up and answering.
+OUTAGE_CLASSES = frozenset({"server", "server_other", "timeout", "connection"})
+
+CIRCUIT_STATE = REGISTRY.gauge(
+    "circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", ("backend",))
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "circuit_rejections", "Calls failed fast by an open circuit breaker.", ("backend",))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+
+    def __init__(self, backend: str, retry_in: float):
+        super().__init__(f"circuit open for {backend}; retry in {retry_in:.1f}s")
+        self.backend = backend
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one backend. Thread-safe."""
+
+    def __init__(self, name: str, failure_threshold: int = 10, recovery_time: float = 30.0,
+                 max_recovery_time: float = 300.0):
+        """
+        Args:
+            name: Backend label used in errors, logs and metrics.
+            failure_threshold: Consecutive outage failures that open the circuit.
+            recovery_time: Seconds open before the first half-open probe.
+            max_recovery_time: Cap on the open period after repeated failed probes.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.max_recovery_time = max_recovery_time
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._open_for = recovery_time
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        CIRCUIT_STATE.set(0, backend=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning("Circuit for %s %s -> %s", self.name, self._state, state)
+            self._state = state
+            CIRCUIT_STATE.set(_STATE_VALUES[state], backend=self.name)
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self._open_for:
+            self._set_state(HALF_OPEN)
+            self._probe_started = None
+
+    def before_call(self) -> None:
+        """
+        Admits a call or fails fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with
+                its probe already in flight.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._maybe_half_open(now)
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN:
+                # A probe that never reported back (e.g. cancelled) is
+                # written off after one recovery period
+                if self._probe_started is None or now - self._probe_started >= self.recovery_time:
+                    self._probe_started = now
+                    return
+                retry_in = min(1.0, self.recovery_time)
+            else:
+                retry_in = self._open_for - (now - self._opened_at)
+        CIRCUIT_REJECTIONS.inc(backend=self.name)
+        raise CircuitOpenError(self.name, max(0.0, retry_in))
+
+    def record_success(self) -> None:
+        """The backend answered (any non-outage outcome)."""
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._open_for = self.recovery_time
+                self._probe_started = None
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        """The backend failed with an outage-class error."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._open_for = min(self._open_for * 2, self.max_recovery_time)
+            elif self._state == CLOSED:
+                self._failures += 1
+                if self._failures < self.failure_threshold:
+                    return
+            self._opened_at = now
+            self._probe_started = None
+            self._set_state(OPEN)
+
+    def record(self, error_class: Optional[str]) -> None:
+        """Records an attempt by its retry-policy error class (None for success)."""
+        if error_class == "deadline":
+            # Cut short by the caller, says nothing about the backend
+            return
+        if error_class in OUTAGE_CLASSES:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for backend `name` (e.g. a host)."""
+    with _BREAKERS_LOCK:
+        if name not in _BREAKERS:
+            _BREAKERS[name] = CircuitBreaker(name)
+        return _BREAKERS[name]
+
+
+def reset_breakers() -> None:
+    """Forgets every shared breaker (mainly for tests)."""
+    with _BREAKERS_LOCK:
+        _BREAKERS.clear()
+
+
+def call_when_closed(fn: Callable[[], R], max_wait: float, sleep=time.sleep) -> R:
+    """
+    Calls `fn`, sleeping through open circuits for up to `max_wait`
+    seconds in total before letting CircuitOpenError propagate.
+    """
+    waited = 0.0
+    while True:
+        try:
+            return fn()
+        except CircuitOpenError as e:
+            if waited + e.retry_in > max_wait:
+                raise
+            delay = max(e.retry_in, 0.05)
+            logger.info("Pausing %.1fs for %s to recover", delay, e.backend)
+            sleep(delay)
+            waited += delay
+
+
+async def acall_when_closed(fn: Callable[[], Awaitable[R]], max_wait: float, sleep=asyncio.sleep) -> R:
+    """Async variant of :func:`call_when_closed`; `fn` returns a fresh awaitable."""
+    waited = 0.0
+    while True:
+        try:
+            return await fn()
+        except CircuitOpenError as e:
+            if waited + e.retry_in > max_wait:
+                raise
+            delay = max(e.retry_in, 0.05)
+            logger.info("Pausing %.1fs for %s to recover", delay, e.backend)
+            await sleep(delay)
+            waited += delay
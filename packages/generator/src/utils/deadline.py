@@ -0,0 +1,91 @@
+"""
+Deadlines propagated through the call stack.
+
+A deadline set with :func:`deadline` applies to everything run inside
+the ``with`` block, including awaited coroutines, tasks created there and
+``asyncio.to_thread`` calls (it lives in a ContextVar, which those copy).
+Nested deadlines can only tighten the outer one. Lower layers read
+:func:`remaining` to cap request timeouts and to skip retries that could
+not finish in time; :func:`with_deadline` enforces it on an awaitable.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+R = TypeVar("R")
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+# Event-loop timers may fire up to a clock tick early
+_CLOCK_SLACK = 0.01
+
+
+class DeadlineExceeded(TimeoutError):
+    """The current deadline passed before `stage` finished."""
+
+    def __init__(self, stage: str = "call"):
+        super().__init__(f"deadline exceeded during {stage}")
+        self.stage = stage
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Runs the block under a deadline `seconds` from now (None: no new limit)."""
+    if seconds is None:
+        yield
+        return
+    new = time.monotonic() + seconds
+    current = _DEADLINE.get()
+    token = _DEADLINE.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (may be <= 0), or None."""
+    at = _DEADLINE.get()
+    return None if at is None else at - time.monotonic()
+
+
+def check(stage: str) -> None:
+    """Raises DeadlineExceeded if the current deadline has passed."""
+    left = remaining()
+    if left is not None and left <= _CLOCK_SLACK:
+        raise DeadlineExceeded(stage)
+
+
+def clamp_timeout(timeout: Optional[float], stage: str) -> Optional[float]:
+    """
+    `timeout` capped to the time left before the deadline.
+
+    Raises:
+        DeadlineExceeded: If no time is left.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded(stage)
+    return left if timeout is None else min(timeout, left)
+
+
+async def with_deadline(aw: Awaitable[R], stage: str) -> R:
+    """Awaits `aw`, cancelling it with DeadlineExceeded if the deadline passes."""
+    try:
+        timeout = clamp_timeout(None, stage)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise
+    if timeout is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, timeout)
+    except asyncio.TimeoutError:
+        check(stage)
+        raise
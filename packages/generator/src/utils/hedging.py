@@ -0,0 +1,81 @@
+"""
+Request hedging for slow-tail LLM calls.
+
+A few `responses.create` calls take many times the median and hold up a
+whole sweep. With a :class:`HedgePolicy`, `OpenAIAsyncManager` fires a
+duplicate of a request that has been running longer than a high
+percentile of recent latencies for the same model and call kind, takes
+whichever response arrives first and cancels the other.
+
+Hedges cost tokens, so they are capped at `max_fraction` of requests and
+the duplicate's input tokens are reported in the usage columns.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from utils.metrics import REGISTRY
+
+LLM_HEDGES = REGISTRY.counter(
+    "llm_hedges", "Hedged LLM requests by outcome (fired/won/lost).", ("backend", "model", "outcome"))
+
+
+class HedgePolicy:
+    """
+    Decides when to hedge, from per-key latency history. Keys are
+    typically ``"<kind>:<model>"``. Thread-safe.
+    """
+
+    def __init__(self, percentile: float = 95.0, max_fraction: float = 0.1,
+                 min_samples: int = 20, window: int = 500, min_delay: float = 0.0):
+        """
+        Args:
+            percentile: Hedge once a request outlives this latency percentile.
+            max_fraction: Upper bound on hedges as a fraction of requests.
+            min_samples: Observed latencies needed before hedging a key.
+            window: Recent latencies kept per key.
+            min_delay: Never hedge sooner than this many seconds.
+
+        Raises:
+            ValueError: On a percentile outside (0, 100] or a negative fraction.
+        """
+        if not 0 < percentile <= 100 or max_fraction < 0:
+            raise ValueError("percentile must be in (0, 100] and max_fraction >= 0")
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay
+        self.requests = 0
+        self.hedges = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        """Records the latency of a completed request."""
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """
+        Counts a new request and returns how long to wait before hedging
+        it, or None if `key` has too little history.
+        """
+        with self._lock:
+            self.requests += 1
+            samples = self._latencies.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+            rank = max(1, math.ceil(self.percentile / 100 * len(ordered)))
+            return max(self.min_delay, ordered[rank - 1])
+
+    def try_hedge(self) -> bool:
+        """Takes a hedge from the traffic allowance, if any is left."""
+        with self._lock:
+            if self.hedges + 1 > self.max_fraction * self.requests:
+                return False
+            self.hedges += 1
+            return True
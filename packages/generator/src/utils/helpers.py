@@ -4,11 +4,20 @@ Helper functions for making HTTP requests and parsing model output.
 Includes JSON array extraction, key checking, and logged HTTP requests.
 """
 
+import logging
+import re
 import time
-import random
 import requests
+from collections.abc import Mapping
+from functools import lru_cache
+from urllib.parse import urlparse
 from utils.logger_config import logger
-from copy import deepcopy
+from utils.metrics import HTTP_INFLIGHT, HTTP_REQUEST_SECONDS, HTTP_RETRIES, error_cause
+from utils.circuit_breaker import circuit_breaker
+from utils.deadline import check as check_deadline, clamp_timeout, remaining
+from utils.json_scan import array_span
+from utils.retry_policy import RetryPolicy
+from utils.tracing import span
 
 
 SENSITIVE_KEYS = {
@@ -24,6 +33,15 @@ SENSITIVE_KEYS = {
     "secret",
 }
 
+# Any key containing one of these fragments is treated as sensitive;
+# this covers every entry of SENSITIVE_KEYS as well.
+_SENSITIVE_KEY_RE = re.compile(r"auth|secret|token|password|key", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _is_sensitive_key(key: str) -> bool:
+    return key.lower() in SENSITIVE_KEYS or _SENSITIVE_KEY_RE.search(key) is not None
+
 
 def _redact_value(value: str) -> str:
     try:
@@ -35,39 +53,75 @@ def _redact_value(value: str) -> str:
 
 
 def _redact_mapping(mapping):
+    """
+    Returns `mapping` with sensitive top-level values redacted.
+
+    Copy-on-write: the input is returned as-is when nothing needs
+    redacting; otherwise a shallow dict copy is made at the first
+    sensitive key. Values are never deep-copied.
+    """
+    if not isinstance(mapping, Mapping):
+        return mapping
     try:
-        data = deepcopy(mapping)
+        redacted = None
+        for k, v in mapping.items():
+            if _is_sensitive_key(str(k)):
+                if redacted is None:
+                    redacted = dict(mapping.items())
+                redacted[k] = _redact_value(v)
+        return mapping if redacted is None else redacted
     except Exception:
         return "***REDACTED***"
-    if isinstance(data, dict):
-        redacted = {}
-        for k, v in data.items():
-            key_lower = str(k).lower()
-            if key_lower in SENSITIVE_KEYS or any(w in key_lower for w in ("auth", "secret", "token", "password", "key")):
-                redacted[k] = _redact_value(v)
-            else:
-                redacted[k] = v
-        return redacted
-    return data
+
+
+class _Lazy:
+    """Log argument that defers `fn()` until the record is formatted."""
+
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn):
+        self._fn = fn
+
+    def __str__(self):
+        try:
+            return str(self._fn())
+        except Exception as e:
+            return f"<unavailable: {e}>"
+
+
+def _debug_logged() -> bool:
+    """True if any handler on the logger's chain would emit a DEBUG record."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    current = logger
+    while current:
+        if any(h.level <= logging.DEBUG for h in current.handlers):
+            return True
+        if not current.propagate:
+            break
+        current = current.parent
+    return False
 
 
 def extract_array(text):
     """
     Extracts and returns the first JSON array substring from text. 
 
+    The array must be balanced and decodable (possibly after dropping
+    trailing commas); brackets inside strings, e.g. "Song [Live]", and
+    bracketed prose before it are skipped. See `utils.json_scan`.
+
     Args:
         text (str): String potentially containing a JSON array.
     
     Returns:
         str: The extracted JSON array or original text if not found.
     """
-    start_index = text.find('[')
-    end_index = text.find(']')
-
-    if start_index == -1 or end_index == -1 or end_index < start_index:
+    span = array_span(text)
+    if span is None:
         return text
     
-    return text[start_index:end_index + 1]
+    return text[span[0]:span[1]]
 
 def has_keys(obj, key1, key2):
     """
@@ -86,13 +140,26 @@ def has_keys(obj, key1, key2):
     return key1 in obj and key2 in obj
 
 
-def logged_request(method, url, retries: int = 4, backoff_base: float = 0.5, **kwargs):
+def logged_request(method, url, retries: int = 4, backoff_base: float = 0.5,
+                   retry_policy: RetryPolicy | None = None, circuit: bool = True,
+                   session=None, **kwargs):
     """
     Makes an HTTP request and logs detailed request/response info.
 
+    Retryable failures (see utils.retry_policy) are retried with backoff.
+    The `timeout` of each attempt is capped by the caller's deadline
+    (utils.deadline), and no retry is started that could not finish.
+
     Args:
         method (str): HTTP method 'GET', 'POST', etc.
         url (str): Full URL to request.
+        retries (int): Retries after the first attempt.
+        backoff_base (float): First backoff delay in seconds.
+        retry_policy (RetryPolicy, optional): Overrides retries/backoff_base.
+        circuit (bool): Fail fast through the host's circuit breaker; turn
+            off for health checks that expect the host to be down.
+        session (requests.Session, optional): Sends each attempt instead
+            of `requests.request`, e.g. a simulated transport.
         **kwargs: Another keyword arguments for requests.request.
 
     Returns:
@@ -100,74 +167,100 @@ def logged_request(method, url, retries: int = 4, backoff_base: float = 0.5, **k
     
     Raises:
         requests.RequestException: If the request fails.
+        CircuitOpenError: If the host's circuit is open.
+        DeadlineExceeded: If the caller's deadline passes.
     """
 
     try:
-        logger.info(f"HTTP {method.upper()} {url}")
-        if 'params' in kwargs:
-            logger.debug(f"Query Params: {_redact_mapping(kwargs['params'])}")
-        if 'json' in kwargs:
-            logger.debug(f"JSON Body: {_redact_mapping(kwargs['json'])}")
-        if 'headers' in kwargs:
-            logger.debug(f"Headers: {_redact_mapping(kwargs['headers'])}")
-
-        attempt = 0
+        logger.info("HTTP %s %s", method.upper(), url)
+        # Redaction and body decoding only run if a DEBUG record is
+        # actually formatted (possibly later, on the log listener thread).
+        debug = _debug_logged()
+        if debug:
+            for key, label in (("params", "Query Params"), ("json", "JSON Body"), ("headers", "Headers")):
+                if key in kwargs:
+                    value = kwargs[key]
+                    logger.debug("%s: %s", label, _Lazy(lambda v=value: _redact_mapping(v)))
+
+        host = urlparse(url).netloc or "unknown"
+        # Policies named "http" share one process-wide retry budget
+        policy = retry_policy or RetryPolicy(
+            "http", max_attempts=retries + 1, backoff_base=backoff_base, max_elapsed=60.0)
+        retry = policy.start()
+        breaker = circuit_breaker(host) if circuit else None
+        timeout = kwargs.pop("timeout", None)
         while True:
+            if breaker:
+                breaker.before_call()
+            attempt_timeout = clamp_timeout(timeout, f"http {host}")
+            if attempt_timeout is not None:
+                kwargs["timeout"] = attempt_timeout
+            attempt_start = time.monotonic()
             try:
-                response = requests.request(method, url, **kwargs)
-                logger.info(f"Response Status: {response.status_code}")
-                logger.debug(f"Response Headers: {_redact_mapping(response.headers)}")
-                logger.debug(f"Response Body: {response.text}")
-
-                # Retry on 429 and 5xx
-                if response.status_code in {429, 500, 502, 503, 504} and attempt < retries:
-                    delay = _retry_after_from_headers(response.headers)
-                    if delay is None:
-                        delay = backoff_base * (2 ** attempt) + random.uniform(0, 0.25)
-                    logger.warning(f"Transient HTTP {response.status_code}; retrying in {delay:.2f}s")
-                    time.sleep(delay)
-                    attempt += 1
-                    continue
+                response = _timed_request(method, url, host, session, **kwargs)
+                logger.info("Response Status: %s", response.status_code)
+                if debug:
+                    logger.debug("Response Headers: %s",
+                                 _Lazy(lambda r=response: _redact_mapping(r.headers)))
+                    if not kwargs.get("stream"):
+                        # Reading a streamed body here would consume it
+                        logger.debug("Response Body: %s", _Lazy(lambda r=response: r.text))
+
+                cls = None
+                if response.status_code >= 400:
+                    cls = policy.classify(status=response.status_code, headers=response.headers)
+                if breaker:
+                    breaker.record(cls and cls.error_class)
+                if cls is not None:
+                    delay = retry.next_delay(cls, remaining=remaining(),
+                                             attempt_estimate=time.monotonic() - attempt_start)
+                    if delay is not None:
+                        HTTP_RETRIES.inc(host=host, cause=str(response.status_code))
+                        logger.warning("Transient HTTP %s; retrying in %.2fs", response.status_code, delay)
+                        with span("http.backoff", delay=delay, cause=response.status_code,
+                                  error_class=cls.error_class):
+                            time.sleep(delay)
+                        continue
 
                 response.raise_for_status()
                 return response
+            except requests.exceptions.HTTPError:
+                # Retryable statuses were retried above; anything else is final
+                raise
             except requests.exceptions.RequestException as e:
-                # Retry network errors/timeouts
-                if attempt < retries:
-                    delay = backoff_base * (2 ** attempt) + random.uniform(0, 0.25)
-                    logger.warning(f"Request error '{e}'; retrying in {delay:.2f}s")
+                if isinstance(e, requests.exceptions.Timeout):
+                    # Timed out because the caller's deadline passed
+                    check_deadline(f"http {host}")
+                cls = policy.classify(e)
+                if breaker:
+                    breaker.record(cls.error_class)
+                delay = retry.next_delay(cls, remaining=remaining(),
+                                         attempt_estimate=time.monotonic() - attempt_start)
+                if delay is None:
+                    raise
+                HTTP_RETRIES.inc(host=host, cause=error_cause(e))
+                logger.warning("Request error '%s'; retrying in %.2fs", e, delay)
+                with span("http.backoff", delay=delay, cause=error_cause(e), error_class=cls.error_class):
                     time.sleep(delay)
-                    attempt += 1
-                    continue
-                raise
     except requests.exceptions.RequestException as e:
-        logger.error(f"Request failed: {e}")
+        logger.error("Request failed: %s", e)
         raise
 
-def _retry_after_from_headers(headers) -> float | None:
-    """Best-effort extraction of server-suggested retry delay in seconds.
-
-    Checks 'Retry-After' and common rate-limit reset headers.
-    """
+def _timed_request(method, url, host, session=None, **kwargs):
+    """One `requests.request` attempt, recorded in the HTTP metrics."""
+    start = time.perf_counter()
+    status = "error"
     try:
-        h = {str(k).lower(): v for k, v in headers.items()}
-        ra = h.get("retry-after")
-        if ra is not None:
-            try:
-                return float(ra)
-            except Exception:
-                return None
-        reset = h.get("x-ratelimit-reset") or h.get("x-ratelimit-reset-requests") or h.get("x-ratelimit-reset-tokens")
-        if reset is not None:
-            try:
-                val = float(reset)
-                if val > 1e6:
-                    return max(0.0, val - time.time())
-                return max(0.0, val)
-            except Exception:
-                return None
-    except Exception:
-        return None
-    return None
-    
-
+        with span("http.request", method=method.upper(), host=host) as s, \
+                HTTP_INFLIGHT.track_inprogress(host=host):
+            send = session.request if session is not None else requests.request
+            response = send(method, url, **kwargs)
+            s.set(status=response.status_code)
+        status = str(response.status_code)
+        return response
+    except Exception as e:
+        status = type(e).__name__
+        raise
+    finally:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, host=host, method=method.upper(), status=status)
@@ -0,0 +1,277 @@
+"""
+Incremental extraction of JSON arrays from LLM output.
+
+Models wrap the playlist array in code fences or prose, put brackets in
+titles ("Song [Live]"), leave trailing commas and get cut off mid-array.
+:class:`ArrayScanner` tracks just enough JSON structure (nesting depth,
+strings and escapes) to find the first balanced array in one pass,
+jumping between structural characters with a regex rather than stepping
+through every character. Each top-level element is decoded as soon as it
+is complete, so text can be fed in chunks as it streams in and only the
+unfinished element is buffered.
+
+A ``[`` in prose whose first element is not valid JSON ("[Verse 1]") is
+skipped and scanning resumes after it. Once an array has produced an
+element it is committed to: later elements that do not decode are
+dropped, and a truncated array yields the elements completed so far,
+including a last element that is whole but lacks its ``,`` or ``]``.
+
+:func:`scan_array` is the one-shot form; it first tries the C decoder at
+the first ``[`` and only falls back to the scanner when that fails.
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+# Structural characters outside strings, and string terminators/escapes
+_STRUCTURAL_RE = re.compile(r'[\[\]{}",]')
+_IN_STRING_RE = re.compile(r'["\\]')
+
+_decoder = json.JSONDecoder()
+
+
+def _loads(text: str, start: int, end: int, commas: List[int]):
+    """Decodes text[start:end], skipping the trailing commas at `commas`."""
+    if not commas:
+        return json.loads(text[start:end])
+    parts, pos = [], start
+    for c in commas:
+        parts.append(text[pos:c])
+        pos = c + 1
+    parts.append(text[pos:end])
+    return json.loads("".join(parts))
+
+
+class ArrayScanner:
+    """
+    Finds and decodes the first JSON array in text fed piece by piece.
+
+    Usage::
+
+        scanner = ArrayScanner()
+        for chunk in stream:
+            for item in scanner.feed(chunk):
+                ...  # each array element, as soon as it is complete
+        playlist = scanner.close()
+    """
+
+    def __init__(self, objects_only: bool = False):
+        """
+        Args:
+            objects_only: Only accept arrays of objects (e.g. playlists):
+                arrays whose first element is not an object are skipped
+                and non-object elements of the accepted one are dropped.
+        """
+        self.objects_only = objects_only
+        self.items: List[Any] = []
+        self.done = False
+        self.truncated = False
+        self._text = ""
+        # Characters dropped from the front of _text (for `span`)
+        self._offset = 0
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._item_start = 0
+        self._committed = False
+        self._last = ""
+        self._last_pos = -1
+        # Trailing commas inside the current element (dropped when decoding)
+        self._commas: List[int] = []
+
+    @property
+    def span(self) -> Optional[Tuple[int, int]]:
+        """(start, end) of the accepted array in all text fed, once done."""
+        if not self.done or self._start is None:
+            return None
+        return self._start + self._offset, self._end + self._offset
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Scans more text.
+
+        Returns:
+            list: Array elements completed by this chunk (possibly none).
+        """
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        before = len(self.items)
+        self._scan()
+        new = self.items[before:]
+        if self._committed and not self.done and self._depth == 1:
+            self._trim()
+        return new
+
+    def close(self) -> Optional[List[Any]]:
+        """
+        Ends the input.
+
+        Returns:
+            list or None: The array; for a committed array cut off
+            mid-way, the elements completed so far (`truncated` is set).
+            None if no array was found.
+        """
+        if self.done:
+            return self.items
+        if self._start is not None and self._depth == 1 and not self._in_string:
+            # The last element may be complete, missing only its ',' or ']';
+            # _end_item drops it if it does not decode
+            self._end_item(len(self._text))
+        if self._committed:
+            self.truncated = True
+            self.done = True
+            return self.items
+        return None
+
+    def _scan(self) -> None:
+        text = self._text
+        pos = self._pos
+        n = len(text)
+        while pos < n and not self.done:
+            if self._start is None:
+                pos = text.find("[", pos)
+                if pos == -1:
+                    pos = n
+                    break
+                self._open(pos)
+                pos += 1
+                continue
+            if self._in_string:
+                m = _IN_STRING_RE.search(text, pos)
+                if m is None:
+                    pos = n
+                    break
+                if m.group() == "\\":
+                    pos = m.end() + 1
+                    continue
+                self._in_string = False
+                self._mark('"', m.start())
+                pos = m.end()
+                continue
+            m = _STRUCTURAL_RE.search(text, pos)
+            if m is None:
+                pos = n
+                break
+            ch, i = m.group(), m.start()
+            pos = m.end()
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                if self._last == "," and not text[self._last_pos + 1:i].strip():
+                    self._commas.append(self._last_pos)
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end_item(i)
+                    if self._start is None:
+                        # Abandoned; resume just after its '['
+                        pos = self._pos
+                        continue
+                    self._end = i + 1
+                    self.done = True
+                    break
+            elif ch == "," and self._depth == 1:
+                self._end_item(i)
+                if self._start is None:
+                    pos = self._pos
+                    continue
+                self._item_start = i + 1
+            self._mark(ch, i)
+        self._pos = pos
+
+    def _open(self, i: int) -> None:
+        self._start = i
+        self._depth = 1
+        self._in_string = False
+        self._item_start = i + 1
+        self._commas = []
+        self._last, self._last_pos = "[", i
+
+    def _mark(self, ch: str, i: int) -> None:
+        self._last, self._last_pos = ch, i
+
+    def _end_item(self, i: int) -> None:
+        """Decodes the top-level element ending at `i` (',' or ']')."""
+        start, commas = self._item_start, self._commas
+        self._commas = []
+        if not self._text[start:i].strip():
+            # "[]", or a trailing/doubled comma
+            if self._depth == 0 and not self.items and not self._committed:
+                self._committed = True
+            return
+        try:
+            item = _loads(self._text, start, i, commas)
+        except ValueError:
+            item = _INVALID
+        if item is not _INVALID and (not self.objects_only or isinstance(item, dict)):
+            self.items.append(item)
+            self._committed = True
+        elif not self._committed:
+            self._abandon()
+
+    def _abandon(self) -> None:
+        self._pos = self._start + 1
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._commas = []
+
+    def _trim(self) -> None:
+        """Drops text before the current element; it is never re-read."""
+        cut = self._item_start
+        if cut <= 0:
+            return
+        self._text = self._text[cut:]
+        self._offset += cut
+        self._pos -= cut
+        self._start -= cut
+        self._item_start = 0
+        self._last_pos -= cut
+        self._commas = [c - cut for c in self._commas]
+
+
+_INVALID = object()
+
+
+def scan_array(text: str, objects_only: bool = False) -> Optional[List[Any]]:
+    """
+    Decodes the first JSON array in `text` (see :class:`ArrayScanner`).
+
+    Returns:
+        list or None: The array, or None if there is none.
+    """
+    start = text.find("[")
+    if start == -1:
+        return None
+    try:
+        # Common case: the first '[' starts a well-formed array. No copy.
+        value, _ = _decoder.raw_decode(text, start)
+        if not objects_only or (value and all(isinstance(v, dict) for v in value)):
+            return value
+    except ValueError:
+        pass
+    scanner = ArrayScanner(objects_only=objects_only)
+    scanner._pos = start
+    scanner.feed(text)
+    return scanner.close()
+
+
+def array_span(text: str) -> Optional[Tuple[int, int]]:
+    """(start, end) of the first balanced, decodable array in `text`."""
+    start = text.find("[")
+    if start == -1:
+        return None
+    try:
+        _, end = _decoder.raw_decode(text, start)
+        return start, end
+    except ValueError:
+        pass
+    scanner = ArrayScanner()
+    scanner._pos = start
+    scanner.feed(text)
+    return scanner.span
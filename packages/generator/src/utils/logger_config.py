@@ -2,16 +2,26 @@
 Logger configuration for playlistGenAI.
 
 Provides a global logger and a helper to set the log file path per run.
+
+With `queued=True` the file is written by a background listener thread:
+the calling thread (typically the asyncio event loop) only enqueues the
+record, and message formatting, size capping and disk I/O all happen on
+the listener thread.
 """
 
+import atexit
+import itertools
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
 logger = logging.getLogger("playlistGenAI")
 logger.setLevel(logging.DEBUG)
 
-_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_formatter = logging.Formatter(_FORMAT)
 
 # Default to console logging; file logging can be configured per run
 # if not any(isinstance(h, logging.StreamHandler) for h in logger.handlers):
@@ -20,18 +30,94 @@ _formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 #     _console.setFormatter(_formatter)
 #     logger.addHandler(_console)
 
+_listener: Optional[QueueListener] = None
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records untouched.
+
+    The stock handler formats every record before enqueueing it; here the
+    listener thread formats instead, so `%`-style arguments are only
+    rendered off the caller's thread. The queue is in-process, so records
+    need not be pickled.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class CappedFormatter(logging.Formatter):
+    """Formatter that truncates output longer than `max_chars`."""
+
+    def __init__(self, fmt=None, max_chars: Optional[int] = None):
+        super().__init__(fmt)
+        self.max_chars = max_chars
+
+    def format(self, record):
+        text = super().format(record)
+        if self.max_chars and len(text) > self.max_chars:
+            dropped = len(text) - self.max_chars
+            text = f"{text[:self.max_chars]}... [truncated {dropped} chars]"
+        return text
+
 
-def set_log_file(path: str, mode: str = "a", level: int = logging.DEBUG) -> None:
+class DebugSampler(logging.Filter):
+    """Passes one in every `every` DEBUG records; other levels always pass."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, int(every))
+        self._counter = itertools.count()
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG:
+            return True
+        return next(self._counter) % self.every == 0
+
+
+def stop_queue_logging() -> None:
+    """Flushes and stops the background listener, if one is running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
+    for h in list(logger.handlers):
+        if isinstance(h, QueueHandler):
+            logger.removeHandler(h)
+
+
+atexit.register(stop_queue_logging)
+
+
+def set_log_file(
+        path: str,
+        mode: str = "a",
+        level: int = logging.DEBUG,
+        queued: bool = False,
+        max_message_chars: Optional[int] = None,
+        debug_sample_every: int = 1,
+) -> None:
     """
     Configure the logger to write to the specified file.
 
-    Existing FileHandlers are removed to avoid duplicate logs.
+    Existing FileHandlers (and any queued pipeline) are removed to avoid
+    duplicate logs.
 
     Args:
         path: File path for the log output.
         mode: File open mode ('a' to append, 'w' to truncate).
         level: Log level for the file handler.
+        queued: Write through a background QueueListener instead of
+            blocking the logging thread on file I/O.
+        max_message_chars: Truncate formatted records beyond this length
+            (e.g. full HTTP response bodies). None disables the cap.
+        debug_sample_every: Keep only one in N DEBUG records.
     """
+    global _listener
+    stop_queue_logging()
     # Remove existing file handlers
     for h in list(logger.handlers):
         if isinstance(h, logging.FileHandler):
@@ -39,5 +125,19 @@ def set_log_file(path: str, mode: str = "a", level: int = logging.DEBUG) -> None
 
     fh = logging.FileHandler(path, mode=mode)
     fh.setLevel(level)
-    fh.setFormatter(_formatter)
-    logger.addHandler(fh)
+    fh.setFormatter(CappedFormatter(_FORMAT, max_chars=max_message_chars))
+
+    if not queued:
+        if debug_sample_every > 1:
+            fh.addFilter(DebugSampler(debug_sample_every))
+        logger.addHandler(fh)
+        return
+
+    records = queue.SimpleQueue()
+    qh = LazyQueueHandler(records)
+    qh.setLevel(level)
+    if debug_sample_every > 1:
+        qh.addFilter(DebugSampler(debug_sample_every))
+    _listener = QueueListener(records, fh, respect_handler_level=True)
+    _listener.start()
+    logger.addHandler(qh)
@@ -0,0 +1,314 @@
+"""
+In-process metrics for playlistGenAI.
+
+A small, dependency-free registry of counters, gauges and histograms with
+labels, shared by the LLM managers, the Spotify client and
+`logged_request`. Metrics can be exposed live over a local OpenMetrics
+endpoint (`start_metrics_server`) or written as a snapshot at the end of
+a run (`write_snapshot`), so a long sweep's throughput, retries and
+cache behaviour can be watched without parsing logs.
+
+All metric operations are thread-safe.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Sequence, Tuple
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Seconds; spans fast Spotify lookups through slow reasoning-model calls
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = lock
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _reset(self) -> None:
+        self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, exposed as `<name>_total`."""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def _snapshot(self):
+        return [{"labels": dict(zip(self.labelnames, k)), "value": v} for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. requests in flight."""
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def _snapshot(self):
+        return [{"labels": dict(zip(self.labelnames, k)), "value": v} for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed upper-bound buckets."""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames, lock, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames, lock)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall-clock duration of the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+    def _samples(self):
+        for key, state in self._values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets, state["counts"]):
+                cumulative += n
+                le = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{le} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_count{labels} {state['count']}"
+            yield f"{self.name}_sum{labels} {_format_value(state['sum'])}"
+
+    def _snapshot(self):
+        return [
+            {
+                "labels": dict(zip(self.labelnames, k)),
+                "count": s["count"],
+                "sum": s["sum"],
+                "buckets": {_format_value(b): c for b, c in zip(self.buckets, s["counts"])},
+            }
+            for k, s in self._values.items()
+        ]
+
+
+class MetricsRegistry:
+    """Named collection of metrics with OpenMetrics and JSON exporters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, self._lock, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def reset(self) -> None:
+        """Clears every recorded value, keeping metric definitions."""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric._reset()
+
+    def render(self) -> str:
+        """Current values in OpenMetrics text exposition format."""
+        lines = []
+        with self._lock:
+            for metric in self._metrics.values():
+                lines.append(f"# TYPE {metric.name} {metric.type_name}")
+                lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+                lines.extend(metric._samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Current values as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "metrics": {
+                    m.name: {"type": m.type_name, "help": m.documentation, "samples": m._snapshot()}
+                    for m in self._metrics.values()
+                },
+            }
+
+
+REGISTRY = MetricsRegistry()
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds", "Latency of individual LLM API attempts.", ("backend", "operation", "model"))
+LLM_RETRIES = REGISTRY.counter(
+    "llm_retries", "LLM call retries by cause (HTTP status or error type).", ("backend", "cause"))
+LLM_FAILURES = REGISTRY.counter(
+    "llm_failures", "LLM calls that failed after all retries.", ("backend", "cause"))
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens", "Tokens consumed, by direction (input/output).", ("backend", "model", "direction"))
+LLM_INFLIGHT = REGISTRY.gauge(
+    "llm_inflight_requests", "LLM API attempts currently in flight.", ("backend",))
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "Latency of logged_request attempts.", ("host", "method", "status"))
+HTTP_RETRIES = REGISTRY.counter(
+    "http_retries", "logged_request retries by cause (HTTP status or error type).", ("host", "cause"))
+HTTP_INFLIGHT = REGISTRY.gauge(
+    "http_inflight_requests", "logged_request attempts currently in flight.", ("host",))
+
+TRACK_LOOKUPS = REGISTRY.counter(
+    "track_lookups", "Track index lookups by outcome (exact/fuzzy/coalesced/miss).", ("result",))
+
+
+def error_cause(err) -> str:
+    """Short retry/failure cause label: the HTTP status if known, else the error type."""
+    status = getattr(err, "status_code", None) or getattr(err, "status", None)
+    if status is None:
+        status = getattr(getattr(err, "response", None), "status_code", None)
+    return str(status) if status is not None else type(err).__name__
+
+
+def write_snapshot(path: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Writes the registry to `path`: OpenMetrics text if it ends in '.prom'
+    or '.txt', JSON otherwise.
+    """
+    if str(path).endswith((".prom", ".txt")):
+        content = registry.render()
+    else:
+        content = json.dumps(registry.snapshot(), indent=2)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def start_metrics_server(port: int = 0, addr: str = "127.0.0.1",
+                         registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serves `registry` at http://addr:port/metrics from a daemon thread.
+
+    Args:
+        port: TCP port; 0 picks a free one (see `server.server_address`).
+        addr: Interface to bind; local-only by default.
+        registry: Registry to expose.
+
+    Returns:
+        ThreadingHTTPServer: Call `shutdown()` to stop it.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    return server
@@ -0,0 +1,67 @@
+"""
+Request rate limiting shared across threads, tasks and processes.
+
+:class:`SharedRateLimiter` is a token bucket whose state lives in
+``multiprocessing`` shared memory, so one budget can be enforced across
+every worker of a sweep. Callers reserve a token and then sleep off any
+deficit outside the lock, so waiters are served in arrival order without
+polling.
+"""
+
+import asyncio
+import multiprocessing
+import time
+
+
+class SharedRateLimiter:
+    """
+    Token bucket allowing `rate` acquisitions per second with bursts of
+    up to `burst`. Safe to pass to child processes at creation time.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, context=None):
+        """
+        Args:
+            rate: Sustained acquisitions per second (> 0).
+            burst: Bucket capacity; acquisitions allowed back to back.
+            context: multiprocessing context used to allocate shared
+                state; defaults to the 'spawn' context.
+
+        Raises:
+            ValueError: If rate or burst is not positive.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate and burst must be positive")
+        ctx = context or multiprocessing.get_context("spawn")
+        self.rate = float(rate)
+        self.burst = int(burst)
+        self._lock = ctx.Lock()
+        self._tokens = ctx.Value("d", float(burst), lock=False)
+        self._updated = ctx.Value("d", time.monotonic(), lock=False)
+
+    def reserve(self, n: float = 1.0) -> float:
+        """
+        Takes `n` tokens, possibly going into debt.
+
+        Returns:
+            float: Seconds the caller must wait before proceeding.
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.burst, self._tokens.value + (now - self._updated.value) * self.rate)
+            tokens -= n
+            self._tokens.value = tokens
+            self._updated.value = now
+        return max(0.0, -tokens / self.rate)
+
+    async def acquire(self, n: float = 1.0) -> None:
+        """Waits (without blocking the event loop) until `n` tokens are granted."""
+        delay = self.reserve(n)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self, n: float = 1.0) -> None:
+        """Blocking variant of :meth:`acquire` for threaded callers."""
+        delay = self.reserve(n)
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,295 @@
+"""
+Shared retry policy for LLM and HTTP calls.
+
+`OpenAIAsyncManager` and `logged_request` both decide whether and how
+long to back off through a :class:`RetryPolicy`:
+
+* Errors are classified by exception type and HTTP status against a
+  table of :class:`RetryRule` entries, never by searching the message
+  text. Unknown errors are not retried.
+* Delays honour server hints (Retry-After / rate-limit reset headers)
+  and otherwise use exponential backoff with decorrelated jitter.
+* Each call has a cap on total time spent retrying.
+* All calls of one policy share a :class:`RetryBudget`, so during an
+  outage retries stay a bounded fraction of traffic instead of
+  multiplying it.
+
+Every decision is counted in ``retry_decisions{policy,error_class,decision}``.
+The policy only decides; callers keep their own loop so each can sleep the
+way it needs to (``await`` in the manager, ``time.sleep`` for requests).
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from utils.metrics import REGISTRY
+
+RETRY_DECISIONS = REGISTRY.counter(
+    "retry_decisions",
+    "Retry policy decisions by error class (retry/fatal/exhausted/deadline/budget).",
+    ("policy", "error_class", "decision"),
+)
+
+
+@dataclass(frozen=True)
+class RetryRule:
+    """
+    One row of the classification table. A rule matches an error whose
+    status is in `statuses`, or whose class (or a base class) is named in
+    `types`; if `codes` is set, the error's `code` must also contain one
+    of them. Types are matched by name so SDK errors need no import.
+    """
+
+    error_class: str
+    retryable: bool
+    statuses: Tuple[int, ...] = ()
+    types: Tuple[str, ...] = ()
+    codes: Tuple[str, ...] = ()
+
+
+DEFAULT_RULES: Tuple[RetryRule, ...] = (
+    # The caller's deadline passed; a retry could not finish either
+    RetryRule("deadline", False, types=("DeadlineExceeded",)),
+    # Moderation false positives on reasoning models usually pass on a retry
+    RetryRule("invalid_prompt", True, statuses=(400,), codes=("invalid_prompt",)),
+    RetryRule("rate_limit", True, statuses=(429,), types=("RateLimitError",)),
+    RetryRule("timeout", True, statuses=(408,),
+              types=("Timeout", "TimeoutError", "APITimeoutError")),
+    RetryRule("conflict", True, statuses=(409,)),
+    RetryRule("server", True, statuses=(500, 502, 503, 504), types=("InternalServerError",)),
+    RetryRule("connection", True,
+              types=("ConnectionError", "APIConnectionError", "ChunkedEncodingError")),
+    RetryRule("client", False, statuses=tuple(range(400, 500))),
+    RetryRule("server_other", False, statuses=tuple(range(500, 600))),
+)
+
+
+class Classification(NamedTuple):
+    error_class: str
+    retryable: bool
+    retry_after: Optional[float]
+
+
+def error_status(err) -> Optional[int]:
+    """HTTP status carried by an SDK/requests error, if any."""
+    status = getattr(err, "status_code", None) or getattr(err, "status", None)
+    if status is None:
+        status = getattr(getattr(err, "response", None), "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_from_headers(headers) -> Optional[float]:
+    """Best-effort server-suggested delay in seconds.
+
+    Checks 'Retry-After' and common rate-limit reset headers.
+    """
+    try:
+        if not headers:
+            return None
+        h = {str(k).lower(): v for k, v in headers.items()}
+        ra = h.get("retry-after")
+        if ra is not None:
+            try:
+                return float(ra)
+            except Exception:
+                # Possibly an HTTP-date; ignore for simplicity here
+                return None
+        reset = (h.get("x-ratelimit-reset") or h.get("x-ratelimit-reset-requests")
+                 or h.get("x-ratelimit-reset-tokens"))
+        if reset is not None:
+            try:
+                val = float(reset)
+                # Heuristic: treat small values as seconds; large as epoch
+                if val > 1e6:
+                    return max(0.0, val - time.time())
+                return max(0.0, val)
+            except Exception:
+                return None
+    except Exception:
+        return None
+    return None
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of traffic.
+
+    Every first attempt deposits `ratio` tokens, every retry withdraws
+    one, and the bucket also refills at `min_per_sec` so low-traffic
+    callers can always retry a little. Thread-safe.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_sec: float = 10.0, capacity: float = 100.0):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.capacity = capacity
+        self._balance = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._balance = min(self.capacity, self._balance + (now - self._updated) * self.min_per_sec)
+        self._updated = now
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill()
+            self._balance = min(self.capacity, self._balance + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            return True
+
+    @property
+    def balance(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._balance
+
+
+class RetryPolicy:
+    """
+    Classification, backoff and budget settings shared by many calls.
+    Use :meth:`start` once per logical call to get its :class:`RetryState`.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            max_attempts: int = 5,
+            backoff_base: float = 0.5,
+            max_delay: float = 30.0,
+            max_elapsed: Optional[float] = 300.0,
+            jitter: float = 0.25,
+            rules: Iterable[RetryRule] = DEFAULT_RULES,
+            budget: Optional[RetryBudget] = None,
+    ):
+        """
+        Args:
+            name: Label for the retry_decisions counter.
+            max_attempts: Attempts per call, including the first.
+            backoff_base: First backoff delay in seconds.
+            max_delay: Upper bound on a computed (not server-hinted) delay.
+            max_elapsed: Give up rather than retry past this many seconds
+                since the call started; None for no cap.
+            jitter: Minimum random spread added to each computed delay;
+                0 gives plain exponential backoff (base * 2^attempt).
+            rules: Classification table, first match wins.
+            budget: Shared retry budget; defaults to the process-wide
+                budget for `name`.
+        """
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+        self.rules = tuple(rules)
+        self.budget = budget or retry_budget(name)
+
+    def classify(self, err: Optional[BaseException] = None, status: Optional[int] = None,
+                 headers=None) -> Classification:
+        """Classifies an exception, or a response by its status and headers."""
+        if err is not None:
+            status = error_status(err) if status is None else status
+            if headers is None:
+                headers = getattr(getattr(err, "response", None), "headers", None)
+        type_names = {cls.__name__ for cls in type(err).__mro__} if err is not None else set()
+        code = str(getattr(err, "code", "") or "").lower()
+        for rule in self.rules:
+            if not (status in rule.statuses or type_names & set(rule.types)):
+                continue
+            if rule.codes and not any(c in code for c in rule.codes):
+                continue
+            return Classification(rule.error_class, rule.retryable, retry_after_from_headers(headers))
+        return Classification("unknown", False, None)
+
+    def start(self) -> "RetryState":
+        """Begins one logical call: counts it toward the retry budget."""
+        self.budget.deposit()
+        return RetryState(self)
+
+
+class RetryState:
+    """Per-call retry bookkeeping handed out by :meth:`RetryPolicy.start`."""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.attempt = 0
+        self.started = time.monotonic()
+        self._prev_delay = 0.0
+        self.decision = None
+
+    def next_delay(self, classification: Classification, remaining: Optional[float] = None,
+                   attempt_estimate: float = 0.0) -> Optional[float]:
+        """
+        Decides what to do after a failed attempt.
+
+        Args:
+            classification: The failed attempt's classification.
+            remaining: Seconds left before the caller's deadline, if any.
+            attempt_estimate: Expected duration of another attempt; no
+                retry is started that could not finish before the deadline.
+
+        Returns:
+            float | None: Seconds to back off before the next attempt, or
+            None to give up. The reason is left in `decision`.
+        """
+        policy = self.policy
+        delay = None
+        if not classification.retryable:
+            self.decision = "fatal"
+        elif self.attempt + 1 >= policy.max_attempts:
+            self.decision = "exhausted"
+        else:
+            delay = classification.retry_after
+            if delay is None:
+                delay = self._backoff()
+            if (policy.max_elapsed is not None
+                    and time.monotonic() - self.started + delay > policy.max_elapsed):
+                self.decision, delay = "deadline", None
+            elif remaining is not None and delay + attempt_estimate >= remaining:
+                self.decision, delay = "deadline", None
+            elif not policy.budget.try_withdraw():
+                self.decision, delay = "budget", None
+            else:
+                self.decision = "retry"
+                self._prev_delay = delay
+                self.attempt += 1
+        RETRY_DECISIONS.inc(policy=policy.name, error_class=classification.error_class,
+                            decision=self.decision)
+        return delay
+
+    def _backoff(self) -> float:
+        # Decorrelated jitter (spread up to 3x the previous delay) on top of
+        # an exponential floor, so growth is guaranteed but retries from
+        # concurrent callers don't line up. No jitter: just the floor.
+        policy = self.policy
+        floor = policy.backoff_base * (2 ** self.attempt)
+        if not policy.jitter:
+            return min(policy.max_delay, floor)
+        spread = max(policy.jitter, 3 * self._prev_delay - floor)
+        return min(policy.max_delay, floor + random.uniform(0, spread))
+
+
+_BUDGETS: Dict[str, RetryBudget] = {}
+_BUDGETS_LOCK = threading.Lock()
+
+
+def retry_budget(name: str) -> RetryBudget:
+    """The process-wide retry budget shared by policies named `name`."""
+    with _BUDGETS_LOCK:
+        if name not in _BUDGETS:
+            _BUDGETS[name] = RetryBudget()
+        return _BUDGETS[name]
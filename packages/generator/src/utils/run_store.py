@@ -0,0 +1,352 @@
+"""
+Local SQLite index of benchmark runs.
+
+Every run of the benchmark CLI is loaded here from its results CSV (and
+older run directories can be imported), so comparisons across runs are
+indexed queries instead of re-parsing every CSV under ``output/``.
+
+Tables
+------
+runs     — one row per run: ID (the run directory name, plus the shard
+           for sharded runs), backend, start time, source CSV, the
+           resolved sweep config and row/failure counts.
+results  — one row per benchmark row: prompt, model, effort, verbosity,
+           runtime, track counts, tokens, stage timings and the error
+           for failed rows. OpenAI error rows carry no model (the CSV
+           puts the error in the model column), so they count toward
+           their run's failures but not toward any model.
+"""
+
+import csv
+import itertools
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+GROUP_COLUMNS = ("run_id", "model", "effort", "verbosity", "prompt")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    backend TEXT,
+    started_at REAL NOT NULL,
+    source TEXT,
+    config TEXT NOT NULL DEFAULT '{}',
+    rows INTEGER NOT NULL DEFAULT 0,
+    failed_rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    prompt TEXT,
+    model TEXT,
+    effort TEXT,
+    verbosity TEXT,
+    runtime REAL,
+    tracks_parsed INTEGER,
+    tracks_found INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    total_tokens INTEGER,
+    error TEXT,
+    stage_timings TEXT,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_results_model ON results(model, effort, verbosity, runtime);
+CREATE INDEX IF NOT EXISTS idx_results_effort ON results(effort, verbosity);
+CREATE INDEX IF NOT EXISTS idx_results_prompt ON results(prompt);
+"""
+
+_RESULT_COLUMNS = ("run_id", "seq", "prompt", "model", "effort", "verbosity", "runtime",
+                   "tracks_parsed", "tracks_found", "input_tokens", "output_tokens",
+                   "total_tokens", "error", "stage_timings")
+_SHARD_RE = re.compile(r"_(shard\d+of\d+)$")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of sorted `values`; None for no values."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def _number(value, kind=float):
+    if value is None or value == "":
+        return None
+    try:
+        return kind(float(value)) if kind is int else kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def result_record(row):
+    """
+    Normalizes a results-CSV row from either runner.
+
+    Returns:
+        dict: The `results` columns (without run_id/seq).
+    """
+    model = row.get("model") or None
+    error = None
+    if model and model.startswith("ERROR"):
+        error, model = model, None
+    elif str(row.get("output") or "").startswith("ERROR"):
+        # Ollama rows keep the model and put the error in the output
+        error = row["output"]
+    return {
+        "prompt": row.get("prompt") or None,
+        "model": model,
+        "effort": row.get("effort") or None,
+        "verbosity": row.get("verbosity") or None,
+        "runtime": _number(row.get("runtime", row.get("runtime_sec"))),
+        "tracks_parsed": _number(row.get("tracks_parsed"), int),
+        "tracks_found": _number(row.get("tracks_found"), int),
+        "input_tokens": _number(row.get("input_tokens"), int),
+        "output_tokens": _number(row.get("output_tokens"), int),
+        "total_tokens": _number(row.get("total_tokens"), int),
+        "error": error,
+        "stage_timings": row.get("stage_timings") or None,
+    }
+
+
+def read_results_csv(path):
+    """
+    Yields the result rows of a benchmark CSV, stopping at the summary
+    tables the Ollama runner appends after its rows.
+    """
+    # sys.maxsize overflows the C long on Windows
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if str(row.get("model") or "").startswith("==="):
+                break
+            if any(row.values()):
+                yield row
+
+
+class RunStore:
+    """
+    Thread-safe writer/reader for the run database.
+    """
+
+    def __init__(self, path):
+        """
+        Opens (creating if needed) the store at `path`.
+
+        Args:
+            path (str): SQLite file path, or ':memory:'.
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_run(self, run_id, rows, backend=None, started_at=None, config=None, source=None):
+        """
+        Stores a run and its result rows, replacing any earlier copy of
+        the same run.
+
+        Args:
+            run_id (str): Run identifier.
+            rows (iterable): Result rows as written to the results CSV.
+            backend (str, optional): 'openai' or 'ollama'.
+            started_at (float, optional): Epoch seconds; defaults to now.
+            config (dict, optional): The run's resolved sweep config.
+            source (str, optional): Where the rows came from (CSV path).
+
+        Returns:
+            int: Number of result rows stored.
+        """
+        records = [result_record(row) for row in rows]
+        # As the sweep executor counts them: errors and rows without tracks
+        failed = sum(1 for r in records if r["error"] is not None or not r["tracks_parsed"])
+        marks = ",".join("?" * len(_RESULT_COLUMNS))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results WHERE run_id = ?", (run_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, backend, started_at, source, config, rows, failed_rows) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, backend, started_at if started_at is not None else time.time(), source,
+                 json.dumps(config or {}, ensure_ascii=False), len(records), failed),
+            )
+            self._conn.executemany(
+                f"INSERT INTO results ({', '.join(_RESULT_COLUMNS)}) VALUES ({marks})",
+                [(run_id, seq, *(r[c] for c in _RESULT_COLUMNS[2:])) for seq, r in enumerate(records)],
+            )
+        return len(records)
+
+    def import_csv(self, path, run_id=None, backend=None, started_at=None, config=None):
+        """
+        Loads a results CSV as one run.
+
+        Defaults are taken from the run directory: the ID is its name
+        (plus the CSV's shard suffix), the start time is parsed from a
+        ``YYYYmmdd_HHMMSS`` name (else the file's mtime), the config is
+        its ``config.json`` and the backend is inferred from the columns.
+
+        Returns:
+            str: The run ID.
+        """
+        path = Path(path)
+        run_dir = path.parent
+        if run_id is None:
+            shard = _SHARD_RE.search(path.stem)
+            run_id = run_dir.name + (f"-{shard.group(1)}" if shard else "")
+        if started_at is None:
+            try:
+                started_at = datetime.strptime(run_dir.name, "%Y%m%d_%H%M%S").timestamp()
+            except ValueError:
+                started_at = os.path.getmtime(path)
+        if config is None and (run_dir / "config.json").exists():
+            with open(run_dir / "config.json", "r", encoding="utf-8") as f:
+                config = json.load(f)
+        rows = list(read_results_csv(path))
+        if backend is None:
+            backend = (config or {}).get("backend") or (
+                "ollama" if rows and "runtime_sec" in rows[0] else "openai")
+        self.add_run(run_id, rows, backend=backend, started_at=started_at, config=config,
+                     source=str(path))
+        return run_id
+
+    def _filters(self, last=None, backend=None, model=None):
+        """WHERE clause and parameters selecting results."""
+        clauses, params = [], []
+        if last is not None or backend is not None:
+            runs_sql = "SELECT run_id FROM runs"
+            if backend is not None:
+                runs_sql += " WHERE backend = ?"
+                params.append(backend)
+            runs_sql += " ORDER BY started_at DESC"
+            if last is not None:
+                runs_sql += " LIMIT ?"
+                params.append(int(last))
+            clauses.append(f"run_id IN ({runs_sql})")
+        if model:
+            models = [model] if isinstance(model, str) else list(model)
+            clauses.append(f"model IN ({','.join('?' * len(models))})")
+            params.extend(models)
+        return clauses, params
+
+    @staticmethod
+    def _group_columns(by):
+        by = (by,) if isinstance(by, str) else tuple(by)
+        unknown = set(by) - set(GROUP_COLUMNS)
+        if unknown or not by:
+            raise ValueError(f"group by must be one or more of {GROUP_COLUMNS}, got {by!r}")
+        return by
+
+    def runs(self, last=None, backend=None):
+        """
+        Lists runs, newest first.
+
+        Returns:
+            list: Dicts with run_id, backend, started_at, source, rows
+            and failed_rows.
+        """
+        sql = "SELECT run_id, backend, started_at, source, rows, failed_rows FROM runs"
+        params = []
+        if backend is not None:
+            sql += " WHERE backend = ?"
+            params.append(backend)
+        sql += " ORDER BY started_at DESC"
+        if last is not None:
+            sql += " LIMIT ?"
+            params.append(int(last))
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, r)) for r in cur.fetchall()]
+
+    def latency_percentiles(self, percentiles=(50, 90, 99), by=("model",), last=None,
+                            backend=None, model=None):
+        """
+        Runtime percentiles of successful rows per group.
+
+        The matching runtimes are read sorted by group and runtime (the
+        model index covers the default grouping) and the nearest-rank
+        percentiles picked in Python, so memory grows with the rows
+        selected.
+
+        Args:
+            percentiles (sequence): Percentiles to report (nearest rank).
+            by (sequence): Grouping columns, from GROUP_COLUMNS.
+            last (int, optional): Only the most recent `last` runs.
+            backend (str, optional): Only runs of this backend.
+            model (str or list, optional): Only these models.
+
+        Returns:
+            list: One dict per group: the group columns, 'rows' and
+            'p<N>' per percentile, in seconds.
+        """
+        by = self._group_columns(by)
+        clauses, params = self._filters(last, backend, model)
+        clauses[:0] = ["runtime IS NOT NULL", "error IS NULL"]
+        cols = ", ".join(by)
+        sql = (f"SELECT {cols}, runtime FROM results WHERE {' AND '.join(clauses)} "
+               f"ORDER BY {cols}, runtime")
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        report = []
+        for key, group in itertools.groupby(rows, key=lambda r: r[:len(by)]):
+            runtimes = [r[-1] for r in group]
+            entry = dict(zip(by, key))
+            entry["rows"] = len(runtimes)
+            for pct in percentiles:
+                entry[f"p{pct:g}"] = percentile(runtimes, pct)
+            report.append(entry)
+        return report
+
+    def summary(self, by=("model",), last=None, backend=None, model=None):
+        """
+        Per-group row counts, failures, mean runtime, mean tracks parsed
+        and found, Spotify hit rate and mean total tokens.
+
+        Arguments match :meth:`latency_percentiles`.
+
+        Returns:
+            list: One dict per group.
+        """
+        by = self._group_columns(by)
+        clauses, params = self._filters(last, backend, model)
+        cols = ", ".join(by)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"""
+            SELECT {cols},
+                   COUNT(*) AS rows,
+                   SUM(error IS NOT NULL OR COALESCE(tracks_parsed, 0) = 0) AS failed_rows,
+                   AVG(CASE WHEN error IS NULL THEN runtime END) AS avg_runtime,
+                   AVG(tracks_parsed) AS avg_tracks_parsed,
+                   AVG(tracks_found) AS avg_tracks_found,
+                   1.0 * SUM(tracks_found) / NULLIF(SUM(tracks_parsed), 0) AS found_rate,
+                   AVG(total_tokens) AS avg_total_tokens
+            FROM results {where}
+            GROUP BY {cols}
+            ORDER BY {cols}
+        """
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, r)) for r in cur.fetchall()]
@@ -0,0 +1,177 @@
+"""
+Span tracing for playlistGenAI benchmark runs.
+
+Records nested, timed spans (a benchmark row, each LLM attempt, backoff
+sleeps, Spotify lookups, the CSV write) and exports them as a Chrome
+trace-event JSON file that loads in Perfetto (ui.perfetto.dev) or
+chrome://tracing.
+
+Tracing is off by default. While disabled, `span()` returns a shared
+no-op context manager, so instrumented code pays one attribute check
+per span. The current span is tracked with a ContextVar, so parentage
+follows asyncio tasks and `asyncio.to_thread` calls automatically.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+class Span:
+    """A single timed operation; set attributes with `span.set(...)`."""
+
+    __slots__ = ("name", "span_id", "parent_id", "lane", "start_us", "end_us", "thread", "attrs")
+
+    def __init__(self, name: str, span_id: int, parent: Optional["Span"], attrs: Dict[str, object]):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent.span_id if parent else None
+        # Each root span (e.g. a benchmark row) gets its own lane in the
+        # viewer; concurrent rows would otherwise overlap on one thread.
+        self.lane = parent.lane if parent else span_id
+        self.start_us = time.perf_counter_ns() // 1000
+        self.end_us = None
+        self.thread = threading.current_thread().name
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    @property
+    def duration_us(self) -> int:
+        return (self.end_us or self.start_us) - self.start_us
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current: ContextVar[Optional[Span]] = ContextVar("playlist_current_span", default=None)
+
+
+class _ActiveSpan:
+    __slots__ = ("_tracer", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        self._span.end_us = time.perf_counter_ns() // 1000
+        if exc_type is not None:
+            self._span.attrs["error"] = exc_type.__name__
+        _current.reset(self._token)
+        self._tracer._finish(self._span)
+        return False
+
+
+class Tracer:
+    """Collects finished spans in memory until exported."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._spans: List[Span] = []
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans = []
+
+    @property
+    def spans(self) -> List[Span]:
+        """Finished spans, in completion order."""
+        with self._lock:
+            return list(self._spans)
+
+    def span(self, name: str, *, root: bool = False, **attrs):
+        """
+        Context manager timing the enclosed block as a child of the
+        current span.
+
+        Args:
+            name: Span name shown in the viewer.
+            root: Start a new lane instead of nesting under the current span.
+            **attrs: Attributes recorded with the span.
+
+        Returns:
+            Context manager yielding the Span (a no-op when disabled).
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        parent = None if root else _current.get()
+        return _ActiveSpan(self, Span(name, next(self._ids), parent, attrs))
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def to_chrome_trace(self) -> dict:
+        """Finished spans as a Chrome trace-event document."""
+        spans = self.spans
+        pid = os.getpid()
+        events = []
+        for s in spans:
+            if s.parent_id is None:
+                label = s.attrs.get("label") or s.name
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": s.lane,
+                               "args": {"name": str(label)}})
+        for s in spans:
+            args = {k: v if isinstance(v, (int, float, bool)) or v is None else str(v)
+                    for k, v in s.attrs.items()}
+            args.update(span_id=s.span_id, parent_id=s.parent_id, thread=s.thread)
+            events.append({
+                "name": s.name,
+                "cat": s.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": s.start_us,
+                "dur": s.duration_us,
+                "pid": pid,
+                "tid": s.lane,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """
+        Writes finished spans to `path` in Chrome trace-event JSON.
+
+        Returns:
+            int: Number of spans written.
+        """
+        doc = self.to_chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f)
+        return sum(1 for e in doc["traceEvents"] if e["ph"] == "X")
+
+
+TRACER = Tracer()
+
+
+def span(name: str, **attrs):
+    """Shorthand for `TRACER.span(...)`."""
+    return TRACER.span(name, **attrs)
@@ -0,0 +1,79 @@
+"""
+Incremental parsing of freeform "Song Title — Artist" playlists.
+
+The OpenAI generate prompt asks for one track per line in that format.
+:class:`TrackLineParser` turns text fed piece by piece (e.g. a response
+token stream) into ``{"title", "artist"}`` dicts, one per line as soon as
+its newline arrives, so each track can be checked while the model is
+still writing the rest. It mirrors :class:`utils.json_scan.ArrayScanner`:
+``feed`` returns the tracks a chunk completed and ``close`` returns them
+all, including the unterminated last line.
+"""
+
+import re
+from typing import List, Optional
+
+# Em/en dash as the prompt asks; a spaced hyphen as a fallback
+_SEPARATORS = (" — ", " – ", " -- ", " - ")
+# List numbering or bullets the model adds despite the prompt
+_BULLET_RE = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+")
+_QUOTES = "\"'“”‘’"
+
+
+def parse_track_line(line: str) -> Optional[dict]:
+    """
+    Parses one "Song Title — Artist" line.
+
+    Returns:
+        dict or None: {'title', 'artist'}, or None for lines that are not
+        a track (blank, headings, prose without a separator).
+    """
+    line = _BULLET_RE.sub("", line.strip())
+    for sep in _SEPARATORS:
+        title, found, artist = line.partition(sep)
+        if found:
+            break
+    else:
+        return None
+    title = title.strip().strip(_QUOTES).strip()
+    artist = artist.strip().strip(_QUOTES).strip()
+    if not title or not artist:
+        return None
+    return {"title": title, "artist": artist}
+
+
+class TrackLineParser:
+    """Parses tracks out of freeform playlist text fed piece by piece."""
+
+    def __init__(self):
+        self.items: List[dict] = []
+        self.done = False
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[dict]:
+        """
+        Scans more text.
+
+        Returns:
+            list: Tracks on lines completed by this chunk (possibly none).
+        """
+        if self.done or not chunk:
+            return []
+        self._buffer += chunk
+        if "\n" not in chunk:
+            return []
+        *lines, self._buffer = self._buffer.split("\n")
+        return self._add(lines)
+
+    def close(self) -> List[dict]:
+        """Ends the input; returns every track parsed."""
+        if not self.done:
+            self.done = True
+            self._add([self._buffer])
+            self._buffer = ""
+        return self.items
+
+    def _add(self, lines: List[str]) -> List[dict]:
+        new = [track for track in map(parse_track_line, lines) if track is not None]
+        self.items.extend(new)
+        return new
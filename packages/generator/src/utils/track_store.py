@@ -0,0 +1,214 @@
+"""
+Local SQLite store of Spotify track metadata.
+
+Written by :class:`api_clients.track_enricher.TrackEnricher` and read by
+the evaluator (`evaluator.track_store`), so the two packages share only
+the file format below, not code.
+
+Tables
+------
+tracks   — one row per Spotify track ID: name, artists, popularity,
+           genres (union of its artists' genres) and audio features.
+artists  — artist ID -> genres, cached so artists shared by many tracks
+           are fetched once.
+lookups  — (title_key, artist_key) as generated by a model -> track ID,
+           keyed with :func:`lookup_key`.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+FEATURE_COLUMNS = (
+    "danceability",
+    "energy",
+    "valence",
+    "tempo",
+    "acousticness",
+    "instrumentalness",
+    "speechiness",
+    "loudness",
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tracks (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    artists TEXT NOT NULL,
+    artist_ids TEXT NOT NULL,
+    popularity INTEGER,
+    duration_ms INTEGER,
+    genres TEXT NOT NULL DEFAULT '[]',
+    {", ".join(f"{c} REAL" for c in FEATURE_COLUMNS)},
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artists (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    genres TEXT NOT NULL DEFAULT '[]',
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lookups (
+    title_key TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    track_id TEXT NOT NULL,
+    PRIMARY KEY (title_key, artist_key)
+);
+CREATE INDEX IF NOT EXISTS idx_lookups_track_id ON lookups(track_id);
+"""
+
+
+def lookup_key(text):
+    """Case- and whitespace-insensitive key for a title or artist name."""
+    return " ".join(str(text).casefold().split())
+
+
+class TrackStore:
+    """
+    Thread-safe writer/reader for the track metadata database.
+    """
+
+    def __init__(self, path):
+        """
+        Opens (creating if needed) the store at `path`.
+
+        Args:
+            path (str): SQLite file path, or ':memory:'.
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _existing(self, table, ids):
+        ids = list(dict.fromkeys(i for i in ids if i))
+        found = set()
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            marks = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT id FROM {table} WHERE id IN ({marks})", batch
+            ).fetchall()
+            found.update(r[0] for r in rows)
+        return found
+
+    def known_track_ids(self, ids):
+        """Returns the subset of `ids` already stored in `tracks`."""
+        with self._lock:
+            return self._existing("tracks", ids)
+
+    def artist_genres(self, ids):
+        """
+        Returns genres for the stored subset of artist `ids`.
+
+        Returns:
+            dict: artist ID -> list of genres.
+        """
+        ids = list(dict.fromkeys(i for i in ids if i))
+        result = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT id, genres FROM artists WHERE id IN ({marks})", batch
+                ).fetchall()
+                result.update((r[0], json.loads(r[1])) for r in rows)
+        return result
+
+    def upsert_artists(self, artists):
+        """
+        Stores Spotify artist objects.
+
+        Args:
+            artists (iterable): Artist dicts as returned by `/artists`.
+        """
+        now = time.time()
+        rows = [
+            (a["id"], a.get("name"), json.dumps(a.get("genres") or []), now)
+            for a in artists
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO artists (id, name, genres, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def upsert_tracks(self, tracks):
+        """
+        Stores enriched track records.
+
+        Args:
+            tracks (iterable): Dicts with keys 'id', 'name', 'artists',
+                'artist_ids', 'popularity', 'duration_ms', 'genres' and
+                optionally any of FEATURE_COLUMNS.
+        """
+        now = time.time()
+        columns = ("id", "name", "artists", "artist_ids", "popularity",
+                   "duration_ms", "genres") + FEATURE_COLUMNS + ("updated_at",)
+        rows = [
+            (
+                t["id"],
+                t["name"],
+                json.dumps(t.get("artists") or []),
+                json.dumps(t.get("artist_ids") or []),
+                t.get("popularity"),
+                t.get("duration_ms"),
+                json.dumps(t.get("genres") or []),
+                *(t.get(c) for c in FEATURE_COLUMNS),
+                now,
+            )
+            for t in tracks
+        ]
+        marks = ",".join("?" * len(columns))
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO tracks ({', '.join(columns)}) VALUES ({marks})",
+                rows,
+            )
+            self._conn.commit()
+
+    def add_lookups(self, mapping):
+        """
+        Records which track ID a generated (title, artist) resolved to.
+
+        Args:
+            mapping (dict): (title, artist) -> track ID.
+        """
+        rows = [
+            (lookup_key(title), lookup_key(artist), track_id)
+            for (title, artist), track_id in mapping.items()
+            if track_id
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lookups (title_key, artist_key, track_id) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def track_id_for(self, title, artist):
+        """Returns the stored track ID for a generated (title, artist), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT track_id FROM lookups WHERE title_key = ? AND artist_key = ?",
+                (lookup_key(title), lookup_key(artist)),
+            ).fetchone()
+        return row[0] if row else None
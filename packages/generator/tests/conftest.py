@@ -2,6 +2,8 @@ import logging
 import sys
 from pathlib import Path
 
+import pytest
+
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = ROOT / "src"
@@ -12,6 +14,33 @@ LOG_DIR = Path(__file__).parent / "logs"
 LOG_FILE = LOG_DIR / "rate_limit_tests.log"
 
 
+@pytest.fixture(autouse=True)
+def _fresh_circuit_breakers():
+    # Breakers are process-wide; one test's simulated outage must not
+    # fail the next test fast
+    from utils.circuit_breaker import reset_breakers
+
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    # Metrics and retry budgets are process-wide too: counters start at
+    # zero, and one test's retries must not drain the next test's budget
+    from utils import metrics, retry_policy
+
+    def reset():
+        metrics.REGISTRY.reset()
+        with retry_policy._BUDGETS_LOCK:
+            retry_policy._BUDGETS.clear()
+
+    reset()
+    yield
+    reset()
+
+
 def pytest_configure(config):
     LOG_DIR.mkdir(exist_ok=True)
 
@@ -8,6 +8,8 @@ from typing import Any, List, Sequence
 
 import requests
 
+from api_clients.local_spotify import LocalSpotifyServer
+
 
 def make_openai_success(text: str = "stub", usage: Any | None = None) -> SimpleNamespace:
     return SimpleNamespace(output_text=text, usage=usage or {})
@@ -77,3 +79,18 @@ class FakeRequestsResponse:
             raise requests.exceptions.HTTPError(
                 f"HTTP {self.status_code}", response=self
             )
+
+
+class FakeSpotifyServer(LocalSpotifyServer):
+    """Local stand-in for the Spotify Web API search and multi-ID endpoints.
+
+    Thin test alias of :class:`LocalSpotifyServer` with no latency or 429s.
+    """
+
+    def __init__(
+        self,
+        tracks: Sequence[dict],
+        artists: Sequence[dict] = (),
+        features: Sequence[dict] | None = None,
+    ) -> None:
+        super().__init__(tracks, artists, features)
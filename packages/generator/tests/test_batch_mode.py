@@ -0,0 +1,191 @@
+import asyncio
+import csv
+import json
+
+import pytest
+
+from benchmarking.load_harness import (
+    BackendProfile,
+    Latency,
+    PlaylistSynth,
+    SimulatedAPIError,
+    SimulatedBackend,
+    SimulatedOpenAIClient,
+    simulated_spotify_factory,
+)
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+from playlist_generation.openai_async_manager import OpenAIAsyncManager, parse_batch_line
+
+FAST = BackendProfile(Latency(0, "fixed"))
+
+
+async def _no_sleep(_):
+    return None
+
+
+def _manager(profile=FAST):
+    client = SimulatedOpenAIClient(SimulatedBackend("openai", profile, seed=3), PlaylistSynth())
+    return OpenAIAsyncManager(api_key="x", model="sim-model", client=client, sleep=_no_sleep)
+
+
+def test_parse_batch_line_success_and_failures():
+    ok = parse_batch_line(json.dumps({
+        "custom_id": "gen-0", "error": None,
+        "response": {"status_code": 200, "body": {
+            "output": [{"type": "reasoning"},
+                       {"type": "message", "content": [{"type": "output_text", "text": "hi"}]}],
+            "usage": {"input_tokens": 3, "output_tokens": 1, "total_tokens": 4},
+        }},
+    }))
+    assert (ok.custom_id, ok.text, ok.error) == ("gen-0", "hi", None)
+    assert ok.usage.total_tokens == 4
+
+    http = parse_batch_line(json.dumps({
+        "custom_id": "gen-1", "error": None,
+        "response": {"status_code": 400, "body": {"error": {"message": "bad input"}}},
+    }))
+    assert http.text is None and http.error == "HTTP 400: bad input"
+
+    expired = parse_batch_line(json.dumps({
+        "custom_id": "gen-2", "response": None,
+        "error": {"code": "batch_expired", "message": "not completed in time"},
+    }))
+    assert expired.error == "batch_expired: not completed in time"
+
+
+def test_run_batch_writes_request_files_and_chunks(tmp_path):
+    manager = _manager()
+    bodies = {f"r-{i}": manager.generate_request(f"prompt {i}") for i in range(5)}
+
+    async def collect():
+        return [r async for r in manager.run_batch(bodies, str(tmp_path / "req.jsonl"),
+                                                   poll_interval=0, max_requests=2)]
+
+    results = asyncio.run(collect())
+    assert sorted(r.custom_id for r in results) == sorted(bodies)
+    assert all(r.error is None and r.text for r in results)
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["req.0.jsonl", "req.1.jsonl", "req.2.jsonl"]
+    first = json.loads((tmp_path / "req.0.jsonl").read_text().splitlines()[0])
+    assert first["url"] == "/v1/responses" and first["body"]["input"] == "prompt 0"
+
+
+def test_run_batch_retries_transient_api_errors(tmp_path):
+    manager = _manager()
+    client = manager.client
+    failures = {"upload": 1, "retrieve": 2}
+
+    def flaky(name, call):
+        async def wrapper(*args, **kwargs):
+            if failures[name]:
+                failures[name] -= 1
+                raise SimulatedAPIError(500, "Server error")
+            return await call(*args, **kwargs)
+        return wrapper
+
+    client.files.create = flaky("upload", client.files.create)
+    client.batches.retrieve = flaky("retrieve", client.batches.retrieve)
+    bodies = {f"r-{i}": manager.generate_request(f"prompt {i}") for i in range(3)}
+
+    async def collect():
+        return [r async for r in manager.run_batch(bodies, str(tmp_path / "req.jsonl"), poll_interval=0)]
+
+    results = asyncio.run(collect())
+    assert failures == {"upload": 0, "retrieve": 0}
+    assert sorted(r.custom_id for r in results) == sorted(bodies)
+    assert all(r.error is None for r in results)
+
+
+def test_run_batch_rerun_resumes_submitted_batches(tmp_path):
+    manager = _manager()
+    client = manager.client
+    retrieve = client.batches.retrieve
+    created = []
+    create = client.batches.create
+
+    async def counting_create(**kwargs):
+        batch = await create(**kwargs)
+        created.append(batch.id)
+        return batch
+
+    async def unavailable(batch_id):
+        raise SimulatedAPIError(400, "bad request")
+
+    client.batches.create = counting_create
+    client.batches.retrieve = unavailable
+    bodies = {f"r-{i}": manager.generate_request(f"prompt {i}") for i in range(5)}
+    request_path = str(tmp_path / "req.jsonl")
+
+    async def collect():
+        return [r async for r in manager.run_batch(bodies, request_path, poll_interval=0, max_requests=2)]
+
+    with pytest.raises(SimulatedAPIError):
+        asyncio.run(collect())
+    assert len(created) == 3
+    state = json.loads((tmp_path / "req.batches.json").read_text())
+    assert sorted(state) == sorted(created)
+
+    client.batches.retrieve = retrieve
+    results = asyncio.run(collect())
+    assert len(created) == 3
+    assert sorted(r.custom_id for r in results) == sorted(bodies)
+    assert all(r.error is None for r in results)
+    assert not (tmp_path / "req.batches.json").exists()
+
+
+def test_run_batch_does_not_resume_batches_for_changed_requests(tmp_path):
+    manager = _manager()
+    client = manager.client
+    retrieve = client.batches.retrieve
+
+    async def unavailable(batch_id):
+        raise SimulatedAPIError(400, "bad request")
+
+    request_path = str(tmp_path / "req.jsonl")
+
+    async def collect(bodies):
+        return [r async for r in manager.run_batch(bodies, request_path, poll_interval=0)]
+
+    client.batches.retrieve = unavailable
+    with pytest.raises(SimulatedAPIError):
+        asyncio.run(collect({"gen-0": manager.generate_request("old prompt")}))
+
+    client.batches.retrieve = retrieve
+    results = asyncio.run(collect({"gen-0": manager.generate_request("new prompt")}))
+    assert [r.custom_id for r in results] == ["gen-0"]
+    assert sorted(client._batches) == ["batch-0", "batch-1"]
+    assert "new prompt" in client._files[client._batches["batch-1"].input_file_id]
+
+
+def test_benchmark_batch_mode_validates_and_records_rows(tmp_path):
+    out = tmp_path / "batch.csv"
+    bench = OpenAIModelAsyncBenchmark(
+        prompts=[f"prompt {i}" for i in range(6)], models=["sim-model"], manager=_manager(),
+        output_csv=str(out), spotify_client=simulated_spotify_factory(FAST), effort=["minimal", "low"],
+    )
+
+    asyncio.run(bench.run_batch(str(tmp_path), poll_interval=0, progress=False))
+
+    with out.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 12
+    assert all(r["model"] == "sim-model" and int(r["tracks_found"]) > 0 for r in rows)
+    assert all(r["runtime"] == "" and r["total_tokens"] for r in rows)
+    assert (tmp_path / "batch_generate.jsonl").exists() and (tmp_path / "batch_json.jsonl").exists()
+
+
+def test_benchmark_batch_mode_records_failed_requests(tmp_path):
+    out = tmp_path / "batch.csv"
+    flaky = BackendProfile(Latency(0, "fixed"), error_rate=0.3)
+    bench = OpenAIModelAsyncBenchmark(
+        prompts=[f"prompt {i}" for i in range(20)], models=["sim-model"], manager=_manager(flaky),
+        output_csv=str(out), spotify_client=simulated_spotify_factory(FAST),
+    )
+
+    asyncio.run(bench.run_batch(str(tmp_path), poll_interval=0, progress=False))
+
+    with out.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    errors = [r for r in rows if r["model"].startswith("ERROR")]
+    assert len(rows) == 20
+    assert errors and all("HTTP 500" in r["model"] for r in errors)
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from benchmarking.load_harness import (
+    BackendProfile,
+    Latency,
+    simulated_manager_factory,
+    simulated_spotify_factory,
+)
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+from utils import helpers
+from utils.circuit_breaker import (
+    CIRCUIT_REJECTIONS,
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    call_when_closed,
+    circuit_breaker,
+)
+
+from .mocks import FakeRequestsResponse
+
+FAST = BackendProfile(Latency(0, "fixed"))
+
+
+def test_opens_after_consecutive_outages_and_probes_when_half_open(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("utils.circuit_breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("svc", failure_threshold=3, recovery_time=10.0)
+
+    breaker.record("server")
+    breaker.record("rate_limit")  # the backend answered, so the streak resets
+    for _ in range(3):
+        breaker.record("timeout")
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as err:
+        breaker.before_call()
+    assert err.value.retry_in == pytest.approx(10.0)
+
+    now[0] += 10.0
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A failed probe re-opens for twice as long
+    breaker.record_failure()
+    now[0] += 10.0
+    assert breaker.state == OPEN
+    now[0] += 10.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_logged_request_fails_fast_once_host_circuit_opens(monkeypatch):
+    calls = []
+    monkeypatch.setattr(helpers.time, "sleep", lambda _: None)
+    monkeypatch.setattr(helpers.requests, "request",
+                        lambda *a, **k: calls.append(1) or FakeRequestsResponse(503, text="down"))
+    breaker = circuit_breaker("down.example")
+    breaker.failure_threshold = 3
+
+    with pytest.raises(CircuitOpenError):
+        helpers.logged_request("get", "https://down.example/x", retries=5)
+    assert len(calls) == 3
+    with pytest.raises(CircuitOpenError):
+        helpers.logged_request("get", "https://down.example/y")
+    assert len(calls) == 3
+
+
+def test_call_when_closed_waits_then_gives_up():
+    sleeps = []
+    outcomes = iter([CircuitOpenError("svc", 2.0), "ok"])
+
+    def fn():
+        value = next(outcomes)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    assert call_when_closed(fn, max_wait=5, sleep=sleeps.append) == "ok"
+    assert sleeps == [2.0]
+
+    def always_open():
+        raise CircuitOpenError("svc", 2.0)
+
+    with pytest.raises(CircuitOpenError):
+        call_when_closed(always_open, max_wait=5, sleep=sleeps.append)
+    assert sleeps == [2.0, 2.0, 2.0]
+
+
+def _benchmark(tmp_path, breaker):
+    manager = simulated_manager_factory(profile=FAST)
+    manager.breaker = breaker
+    return OpenAIModelAsyncBenchmark(
+        prompts=[f"prompt {i}" for i in range(6)], models=["sim-model"], manager=manager,
+        output_csv=str(tmp_path / "out.csv"), spotify_client=simulated_spotify_factory(FAST),
+    )
+
+
+def test_rows_pause_through_an_outage_instead_of_failing(tmp_path):
+    breaker = CircuitBreaker("openai", failure_threshold=1, recovery_time=0.05)
+    breaker.record_failure()
+    bench = _benchmark(tmp_path, breaker)
+
+    asyncio.run(bench.run(concurrency=3, progress=False))
+
+    assert [r["model"] for r in bench.results] == ["sim-model"] * 6
+    assert breaker.state == CLOSED
+    assert CIRCUIT_REJECTIONS.value(backend="openai") >= 1
+
+
+def test_rows_are_marked_failed_after_max_outage_wait(tmp_path):
+    breaker = CircuitBreaker("openai", failure_threshold=1, recovery_time=60.0)
+    breaker.record_failure()
+    bench = _benchmark(tmp_path, breaker)
+    bench.max_outage_wait = 0.1
+
+    asyncio.run(bench.run(concurrency=3, progress=False))
+
+    assert len(bench.results) == 6
+    assert all(r["model"].startswith("ERROR: circuit open for openai") for r in bench.results)
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from api_clients.spotify_client import SpotifyClient
+from api_clients.track_index import TrackLookupIndex
+from benchmarking.load_harness import BackendProfile, Latency, simulated_spotify_factory
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+from playlist_generation.openai_async_manager import OpenAIAsyncManager
+from utils import helpers
+from utils.deadline import DeadlineExceeded, deadline, remaining
+from utils.retry_policy import RetryBudget, RetryPolicy
+
+from .mocks import FakeRequestsResponse
+
+FAST = BackendProfile(Latency(0, "fixed"))
+
+
+class ScriptedClient:
+    """responses.create sleeping `durations[n]` on call n (last one repeats)."""
+
+    def __init__(self, durations, json_delay=0.0):
+        self.durations = list(durations)
+        self.json_delay = json_delay
+        self.calls = 0
+        self.responses = SimpleNamespace(create=self._create)
+
+    async def _create(self, *, input, instructions="", **_):
+        if "JSON" in instructions:
+            await asyncio.sleep(self.json_delay)
+            return SimpleNamespace(output_text='[{"title": "Song", "artist": "Band"}]', usage=None)
+        delay = self.durations[min(self.calls, len(self.durations) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        usage = SimpleNamespace(input_tokens=1, output_tokens=1, total_tokens=2)
+        return SimpleNamespace(output_text="Song — Band", usage=usage)
+
+
+def _manager(client, **kwargs):
+    policy = RetryPolicy("test", backoff_base=0.01, jitter=0.0, budget=RetryBudget())
+    return OpenAIAsyncManager(api_key="k", model="m", client=client, retry_policy=policy, **kwargs)
+
+
+def test_nested_deadlines_only_tighten_and_reach_threads():
+    assert remaining() is None
+    with deadline(10):
+        with deadline(60):
+            assert remaining() <= 10
+        with deadline(1):
+            assert remaining() <= 1
+            seen = asyncio.run(asyncio.to_thread(remaining))
+            assert seen is not None and seen <= 1
+    assert remaining() is None
+
+
+def test_request_timeout_is_retried_as_a_timeout():
+    client = ScriptedClient([5.0, 0.0])
+    manager = _manager(client, request_timeout=0.05)
+
+    text, _ = asyncio.run(manager.get_response("prompt"))
+
+    assert text == "Song — Band"
+    assert client.calls == 2
+
+
+def test_deadline_cuts_a_stuck_call_without_retrying():
+    client = ScriptedClient([5.0])
+    manager = _manager(client)
+
+    async def call():
+        with deadline(0.1):
+            return await manager.get_response("prompt")
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(call())
+    assert time.monotonic() - start < 1.0
+    assert client.calls == 1
+
+
+def test_retry_that_cannot_finish_before_the_deadline_is_not_started():
+    policy = RetryPolicy("test", backoff_base=0.5, jitter=0.0, budget=RetryBudget())
+    retry = policy.start()
+    server = policy.classify(status=503)
+
+    assert retry.next_delay(server, remaining=0.4) is None
+    assert retry.decision == "deadline"
+    assert retry.next_delay(server, remaining=5.0, attempt_estimate=1.0) == pytest.approx(0.5)
+
+
+def test_logged_request_caps_timeout_to_the_deadline(monkeypatch):
+    seen = []
+    monkeypatch.setattr(helpers.requests, "request",
+                        lambda method, url, **kw: seen.append(kw["timeout"]) or FakeRequestsResponse(200))
+
+    with deadline(0.5):
+        helpers.logged_request("get", "https://example.com", timeout=30)
+    helpers.logged_request("get", "https://example.com", timeout=30)
+
+    assert seen[0] <= 0.5 and seen[1] == 30
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            helpers.logged_request("get", "https://example.com", timeout=30)
+
+
+def test_timed_out_row_is_recorded_with_partial_timings(tmp_path):
+    manager = _manager(ScriptedClient([0.0], json_delay=5.0))
+    bench = OpenAIModelAsyncBenchmark(
+        prompts=["p1", "p2"], models=["m"], manager=manager, output_csv=str(tmp_path / "out.csv"),
+        spotify_client=simulated_spotify_factory(FAST), stage_timeouts={"json_conversion": 0.1},
+    )
+
+    start = time.monotonic()
+    asyncio.run(bench.run(concurrency=2, progress=False))
+
+    assert time.monotonic() - start < 1.0
+    for row in bench.results:
+        # Raised by the stage or, just as it expires, by the request inside it
+        assert row["model"].startswith("ERROR: deadline exceeded during")
+        assert row["model"].endswith("json_conversion")
+        timings = json.loads(row["stage_timings"])
+        assert set(timings) == {"generate", "json_conversion"}
+        assert timings["json_conversion"] == pytest.approx(0.1, abs=0.05)
+
+
+@pytest.mark.parametrize("wrap", [lambda c: c, TrackLookupIndex], ids=["client", "index"])
+def test_track_exists_propagates_a_passed_deadline(wrap):
+    class UnreachableSession:
+        def request(self, *args, **kwargs):
+            raise AssertionError("no request should start after the deadline")
+
+    client = wrap(SpotifyClient({"access_token": "t"}, base_url="https://spotify.test/v1",
+                                session=UnreachableSession()))
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            client.track_exists("Song", "Band")
@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from playlist_generation.openai_async_manager import OpenAIAsyncManager
+from utils import metrics
+from utils.hedging import LLM_HEDGES, HedgePolicy
+
+
+class SlowFirstClient:
+    """responses.create whose calls take the scripted durations in order."""
+
+    def __init__(self, durations):
+        self.durations = list(durations)
+        self.calls = 0
+        self.cancelled = 0
+        self.responses = SimpleNamespace(create=self._create)
+
+    async def _create(self, **kwargs):
+        n = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.durations[n])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        usage = SimpleNamespace(input_tokens=10, output_tokens=5, total_tokens=15)
+        return SimpleNamespace(output_text=f"call {n}", usage=usage)
+
+
+def _warm(policy, key="generate:m", latency=0.01):
+    for _ in range(policy.min_samples):
+        policy.observe(key, latency)
+
+
+def test_policy_needs_history_and_uses_percentile():
+    policy = HedgePolicy(percentile=90, min_samples=10)
+    assert policy.hedge_delay("k") is None
+    for i in range(1, 11):
+        policy.observe("k", i / 10)
+    assert policy.hedge_delay("k") == pytest.approx(0.9)
+    assert policy.hedge_delay("other") is None
+
+
+def test_policy_caps_hedges_to_a_fraction_of_requests():
+    policy = HedgePolicy(max_fraction=0.25)
+    granted = []
+    for _ in range(8):
+        policy.hedge_delay("k")
+        granted.append(policy.try_hedge())
+    assert granted.count(True) == 2
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=0)
+
+
+def test_slow_request_is_hedged_and_loser_cancelled():
+    policy = HedgePolicy(percentile=95, max_fraction=1.0)
+    _warm(policy)
+    client = SlowFirstClient([5.0, 0.01])
+    manager = OpenAIAsyncManager(api_key="k", model="m", client=client, hedging=policy)
+
+    text, usage = asyncio.run(asyncio.wait_for(manager.get_response("prompt"), 2))
+
+    assert text == "call 1"
+    assert client.calls == 2 and client.cancelled == 1
+    assert usage.hedge_input_tokens == 10
+    assert usage.total_tokens == 25
+    assert LLM_HEDGES.value(backend="openai", model="m", outcome="fired") == 1
+    assert LLM_HEDGES.value(backend="openai", model="m", outcome="won") == 1
+    assert metrics.LLM_TOKENS.value(backend="openai", model="m", direction="hedge_input") == 10
+
+
+def test_hedged_call_latency_is_timed_from_the_primary_start():
+    policy = HedgePolicy(percentile=95, max_fraction=1.0, min_samples=5)
+    _warm(policy, latency=0.1)
+    client = SlowFirstClient([5.0, 0.01])
+    manager = OpenAIAsyncManager(api_key="k", model="m", client=client, hedging=policy)
+
+    asyncio.run(asyncio.wait_for(manager.get_response("prompt"), 2))
+
+    # One new sample: the hedge delay plus the winning hedge, not 0.01s
+    samples = list(policy._latencies["generate:m"])
+    assert len(samples) == policy.min_samples + 1
+    assert samples[-1] >= 0.1
+
+
+def test_fast_request_and_exhausted_allowance_do_not_hedge():
+    policy = HedgePolicy(percentile=95, max_fraction=0.0)
+    _warm(policy, latency=0.01)
+    client = SlowFirstClient([0.05])
+    manager = OpenAIAsyncManager(api_key="k", model="m", client=client, hedging=policy)
+
+    text, usage = asyncio.run(manager.get_response("prompt"))
+
+    assert text == "call 0" and client.calls == 1
+    assert not hasattr(usage, "hedge_input_tokens")
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+HEAVY = {"openai", "tqdm", "dotenv", "requests"}
+
+# Cumulative import time allowed per module, in seconds. Generous: these
+# take well under a tenth of that locally, the OpenAI SDK alone ~0.8 s.
+BUDGET = 0.5
+
+
+def _import_profile(module):
+    """Top-level package -> cumulative seconds, from `python -X importtime`."""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        profile[name] = int(cumulative) / 1e6
+    return profile
+
+
+@pytest.mark.parametrize("module, allowed", [
+    ("openai_api_async_main", set()),
+    ("benchmark_main", set()),
+    ("benchmarking.openai_async_benchmark", {"requests"}),
+    ("benchmarking.sweep_executor", {"requests"}),
+])
+def test_entry_points_defer_heavy_imports(module, allowed):
+    profile = _import_profile(module)
+
+    assert HEAVY & set(profile) <= allowed
+    assert profile[module] < BUDGET
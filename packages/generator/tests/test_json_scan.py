@@ -0,0 +1,65 @@
+import json
+
+from benchmarking.base_benchmark import BaseBenchmark
+from benchmarking.parse_benchmark import SAMPLE_OUTPUTS, run_parse_benchmark
+from utils.helpers import extract_array
+from utils.json_scan import ArrayScanner, scan_array
+
+
+def test_scan_array_repairs_common_model_output():
+    assert scan_array('```json\n[{"title": "A", "artist": "B"}]\n```') == [{"title": "A", "artist": "B"}]
+    assert scan_array('Intro [Verse 1]\n[{"title": "Hurt [Live]", "artist": "Cash"}]',
+                      objects_only=True) == [{"title": "Hurt [Live]", "artist": "Cash"}]
+    assert scan_array('[{"title": "A", "artist": "B",}, {"title": "C", "artist": "D"},\n]') == [
+        {"title": "A", "artist": "B"}, {"title": "C", "artist": "D"}]
+    assert scan_array('[{"title": "say \\"hi]\\"", "artist": "X"}]') == [{"title": 'say "hi]"', "artist": "X"}]
+    assert scan_array("no playlist here") is None
+
+
+def test_truncated_array_keeps_completed_elements():
+    scanner = ArrayScanner(objects_only=True)
+    scanner.feed('[{"title": "A", "artist": "B"}, {"title": "C", "art')
+
+    assert scanner.close() == [{"title": "A", "artist": "B"}]
+    assert scanner.truncated
+
+    scanner = ArrayScanner(objects_only=True)
+    scanner.feed('[{"title": "A", "artist": "B"}, {"title": "C", "artist": "D"}\n')
+    assert scanner.close() == [{"title": "A", "artist": "B"}, {"title": "C", "artist": "D"}]
+    assert scanner.truncated
+
+    assert scan_array('[{"title": "a", "artist": "x"}', objects_only=True) == [{"title": "a", "artist": "x"}]
+    assert scan_array("[1, 2") == [1, 2]
+    assert scan_array('[{"a": 1}, true ') == [{"a": 1}, True]
+    assert scan_array('[{"a": 1}, tr') == [{"a": 1}]
+    assert BaseBenchmark([], [], None, None).validate_json('[{"title": "a", "artist": "x"},') == [
+        {"title": "a", "artist": "x"}]
+
+
+def test_feed_yields_elements_as_they_complete():
+    text = 'Sure!\n[{"title": "One [Live]", "artist": "X"},\n {"title": "Two", "artist": "Y"}]\nDone.'
+    scanner = ArrayScanner()
+    seen = []
+    for i in range(0, len(text), 3):
+        seen.append(scanner.feed(text[i:i + 3]))
+
+    assert [item for batch in seen for item in batch] == json.loads(text[text.index("["):text.index("]\n") + 1])
+    assert scanner.done and not scanner.truncated
+    start, end = scanner.span
+    assert text[start] == "[" and text[end - 1] == "]"
+
+
+def test_validate_json_and_extract_array():
+    bench = BaseBenchmark([], [], None, None)
+
+    assert bench.validate_json('Here:\n[{"title": "A", "artist": "B"}] thanks') == [{"title": "A", "artist": "B"}]
+    assert bench.validate_json("not json").startswith("JSON ERROR")
+    assert extract_array('x [{"title": "Song [Remix]"}] y') == '[{"title": "Song [Remix]"}]'
+    assert extract_array("nothing") == "nothing"
+
+
+def test_scanner_recovers_more_than_legacy_parser():
+    legacy, scanner = run_parse_benchmark(SAMPLE_OUTPUTS, repeat=1)
+
+    assert scanner.parsed > legacy.parsed
+    assert scanner.tracks > legacy.tracks
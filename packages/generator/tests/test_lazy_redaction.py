@@ -0,0 +1,91 @@
+import logging
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from utils import helpers
+
+from .mocks import FakeRequestsResponse
+
+
+def test_redact_mapping_returns_input_when_nothing_sensitive():
+    payload = {"model": "gemma2:2b", "prompt": "x" * 10_000, "stream": False}
+    assert helpers._redact_mapping(payload) is payload
+
+
+def test_redact_mapping_copies_shallowly_on_first_sensitive_key():
+    nested = {"deep": [1, 2, 3]}
+    headers = {"Authorization": "Bearer abcdefghijkl", "X-Api-Key": "short", "meta": nested}
+
+    redacted = helpers._redact_mapping(headers)
+
+    assert redacted is not headers
+    assert redacted["Authorization"] == "***REDACTED***…ijkl"
+    assert redacted["X-Api-Key"] == "***REDACTED***"
+    assert redacted["meta"] is nested
+    assert headers["Authorization"] == "Bearer abcdefghijkl"
+
+
+def test_redact_mapping_handles_non_dict_mappings():
+    headers = CaseInsensitiveDict({"Set-Cookie": "a", "X-Access-Token": "0123456789"})
+    redacted = helpers._redact_mapping(headers)
+    assert redacted["X-Access-Token"] == "***REDACTED***…6789"
+    assert redacted["Set-Cookie"] == "a"
+
+
+@pytest.fixture
+def isolated_logger(monkeypatch):
+    # Private logger so handlers installed by pytest/conftest don't count
+    isolated = logging.Logger("test.lazy_redaction", level=logging.DEBUG)
+    isolated.propagate = False
+    monkeypatch.setattr(helpers, "logger", isolated)
+    return isolated
+
+
+def _fake_request(monkeypatch):
+    body_reads = {"count": 0}
+
+    class Response(FakeRequestsResponse):
+        @property
+        def text(self):
+            body_reads["count"] += 1
+            return "body"
+
+        @text.setter
+        def text(self, value):
+            pass
+
+    monkeypatch.setattr(helpers.requests, "request", lambda *a, **k: Response(200))
+    return body_reads
+
+
+def test_logged_request_skips_redaction_without_debug_handler(monkeypatch, isolated_logger):
+    calls = []
+    monkeypatch.setattr(helpers, "_redact_mapping", lambda m: calls.append(m) or m)
+    body_reads = _fake_request(monkeypatch)
+    isolated_logger.addHandler(logging.NullHandler(level=logging.INFO))
+
+    helpers.logged_request("GET", "https://example.com", headers={"Authorization": "Bearer secret-token"})
+
+    assert calls == []
+    assert body_reads["count"] == 0
+
+
+def test_logged_request_redacts_when_record_is_formatted(monkeypatch, isolated_logger):
+    records = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    isolated_logger.addHandler(Collect(level=logging.DEBUG))
+    body_reads = _fake_request(monkeypatch)
+
+    helpers.logged_request("GET", "https://example.com", headers={"Authorization": "Bearer secret-token"})
+
+    # Nothing has been rendered until a formatter asks for the message
+    assert body_reads["count"] == 0
+    messages = [r.getMessage() for r in records]
+    assert "Headers: {'Authorization': '***REDACTED***…oken'}" in messages
+    assert "Response Body: body" in messages
+    assert body_reads["count"] == 1
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from benchmarking import load_harness as lh
+from benchmarking.load_harness import BackendProfile, Latency, PlaylistSynth
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+
+FAST = BackendProfile(Latency(0.001, "fixed"))
+
+
+def test_latency_distributions_are_seeded_and_centered():
+    for kind in ("fixed", "uniform", "exponential", "lognormal"):
+        latency = Latency(0.02, kind)
+        a = [latency.sample(random.Random(1)) for _ in range(3)]
+        b = [latency.sample(random.Random(1)) for _ in range(3)]
+        assert a == b
+        samples = sorted(latency.sample(random.Random(i)) for i in range(2000))
+        assert 0.01 < samples[1000] < 0.04
+    with pytest.raises(ValueError):
+        Latency(0.01, "pareto").sample(random.Random())
+
+
+def test_backend_rate_limit_throttles_beyond_burst():
+    backend = lh.SimulatedBackend("x", BackendProfile(Latency(0, "fixed"), rate_limit=1, burst=3))
+    outcomes = [backend.decide()[1] for _ in range(5)]
+    assert outcomes == ["ok", "ok", "ok", "throttled", "throttled"]
+    assert backend.stats() == {"calls": 5, "errors": 0, "throttled": 2}
+
+
+def test_synth_is_deterministic_and_round_trips():
+    synth = PlaylistSynth(tracks_per_playlist=5)
+    assert synth.tracks("p") == synth.tracks("p")
+    assert json.loads(synth.to_json(synth.freeform("p"))) == synth.tracks("p")
+
+
+def test_openai_load_completes_every_row():
+    report = lh.run_openai_load(rows=30, concurrency=10, openai=FAST, spotify=FAST)
+
+    assert report.rows == 30
+    assert report.failed_rows == 0
+    assert len(report.row_latencies) == 30
+    assert report.backends["openai"]["calls"] == 60
+    assert 0 < report.p50 <= report.p99
+    assert report.rows_per_sec > 0
+    assert report.cpu_per_row > 0
+
+
+def test_simulated_spotify_searches_go_through_logged_request():
+    from utils import metrics
+
+    backend = lh.SimulatedBackend("spotify", BackendProfile(Latency(0, "fixed"), error_rate=0.5), seed=1)
+    client = lh.SimulatedSpotifyClient(backend, PlaylistSynth(found_rate=1.0), retries=20, backoff_base=0)
+    track = PlaylistSynth().tracks("p")[0]
+
+    match = client.search_track(track["title"], track["artist"])
+
+    assert match["id"] == client.track_ids[(track["title"], track["artist"])]
+    assert backend.stats()["errors"] > 0
+    host = "spotify.simulated"
+    assert metrics.HTTP_RETRIES.value(host=host, cause="500") == backend.stats()["errors"]
+
+
+def test_openai_load_retries_through_errors_and_rate_limits():
+    flaky = BackendProfile(Latency(0.001, "fixed"), error_rate=0.2, rate_limit=2000, burst=5)
+    report = lh.run_openai_load(rows=20, concurrency=10, openai=flaky, spotify=FAST, backoff_base=0.001)
+
+    stats = report.backends["openai"]
+    assert stats["errors"] + stats["throttled"] > 0
+    assert stats["calls"] > 40
+    assert report.rows == 20
+
+
+def test_openai_runner_overlaps_rows():
+    # 20 rows x 2 LLM calls of 20ms each would take >= 0.8s run serially
+    slow = BackendProfile(Latency(0.02, "fixed"))
+    report = lh.run_openai_load(rows=20, concurrency=20, openai=slow, spotify=FAST)
+    assert report.wall_seconds < 0.4
+
+
+def test_openai_runner_pulls_combos_lazily_with_bounded_inflight(tmp_path):
+    manager = lh.simulated_manager_factory(profile=FAST)
+    bench = OpenAIModelAsyncBenchmark(
+        prompts=[], models=[], manager=manager, output_csv=str(tmp_path / "out.csv"),
+        spotify_client=lh.simulated_spotify_factory(FAST),
+    )
+    pulled, inflight, peak = [], [0], [0]
+    run_single = bench._run_single
+
+    async def tracked(*args):
+        inflight[0] += 1
+        peak[0] = max(peak[0], inflight[0])
+        try:
+            return await run_single(*args)
+        finally:
+            inflight[0] -= 1
+
+    def source():
+        for i in range(40):
+            # Never more than `concurrency` combos pulled ahead of completed rows
+            assert len(pulled) - len(bench.results) <= 4
+            pulled.append(i)
+            yield (f"prompt {i}", "sim-model", "minimal", "low")
+
+    bench._run_single = tracked
+    asyncio.run(bench.run(concurrency=4, combos=source(), progress=False))
+
+    assert len(bench.results) == len(pulled) == 40
+    assert peak[0] == 4
+
+
+def test_ollama_load_records_failed_rows_without_aborting():
+    flaky = BackendProfile(Latency(0.001, "fixed"), error_rate=0.5)
+    report = lh.run_ollama_load(rows=10, ollama=flaky, spotify=FAST)
+
+    assert report.rows == 10
+    assert report.failed_rows == report.backends["ollama"]["errors"]
+    assert len(report.row_latencies) == 10
+
+
+def test_cli_prints_json_report(capsys):
+    assert lh.main(["--rows", "4", "--llm-latency-ms", "1", "--spotify-latency-ms", "0", "--json"]) == 0
+    out = capsys.readouterr().out
+    report = json.loads(out)
+    assert report["rows"] == 4
+    assert set(report) >= {"rows_per_sec", "p50_seconds", "p99_seconds", "cpu_ms_per_row"}
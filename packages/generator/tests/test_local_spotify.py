@@ -0,0 +1,89 @@
+import json
+import time
+
+import pytest
+import requests
+
+from api_clients.local_spotify import LocalSpotifyServer, load_catalog, synthetic_catalog
+from api_clients.spotify_client import SpotifyClient
+from api_clients.token_handler import TokenHandler
+from utils import helpers
+
+
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "local-id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "local-secret")
+
+
+def test_token_and_search_round_trip_via_env_urls(monkeypatch, credentials):
+    tracks, artists = synthetic_catalog(20)
+    with LocalSpotifyServer(tracks, artists) as server:
+        monkeypatch.setenv("SPOTIFY_TOKEN_URL", server.token_url)
+        monkeypatch.setenv("SPOTIFY_API_BASE_URL", server.base_url)
+
+        token = TokenHandler().get_new_token()
+        client = SpotifyClient(token)
+
+        found, text = client.track_exists("song 7", "ARTIST 7")
+        missing, _ = client.track_exists("Song 7", "Artist 8")
+
+    assert token["access_token"].startswith("local-")
+    assert token["expires_in"] == 3600
+    assert found is True and "open.spotify.com/track/t7" in text
+    assert missing is False
+    assert client.track_ids == {("song 7", "ARTIST 7"): "t7"}
+    assert server.tokens_issued == 1
+
+
+def test_explicit_urls_take_precedence_over_env(monkeypatch):
+    monkeypatch.setenv("SPOTIFY_TOKEN_URL", "http://env/token")
+    monkeypatch.setenv("SPOTIFY_API_BASE_URL", "http://env/v1")
+    assert TokenHandler(token_url="http://arg/token").token_url == "http://arg/token"
+    assert SpotifyClient({}, base_url="http://arg/v1/").base_url == "http://arg/v1"
+    assert SpotifyClient({}).base_url == "http://env/v1"
+
+
+def test_api_requires_bearer_token():
+    with LocalSpotifyServer() as server:
+        resp = requests.get(f"{server.base_url}/search", params={"q": "track:a artist:b"})
+        token = requests.post(server.token_url, data={"grant_type": "client_credentials"})
+    assert resp.status_code == 401
+    assert token.status_code == 401
+
+
+def test_injected_429s_are_retried_by_logged_request(monkeypatch):
+    delays = []
+    monkeypatch.setattr(helpers.time, "sleep", delays.append)
+    tracks, artists = synthetic_catalog(5)
+    with LocalSpotifyServer(tracks, artists, throttle_every=2, retry_after=0.25) as server:
+        client = SpotifyClient({"access_token": "x"}, base_url=server.base_url)
+        results = [client.track_exists(f"Song {i}", f"Artist {i}")[0] for i in range(3)]
+
+    assert results == [True, True, True]
+    assert server.throttled == 2
+    assert delays == [0.25, 0.25]
+
+
+def test_rate_limit_rejects_bursts():
+    with LocalSpotifyServer(rate_limit=1, burst=2, retry_after=2) as server:
+        headers = {"Authorization": "Bearer x"}
+        statuses = [requests.get(f"{server.base_url}/search", headers=headers).status_code for _ in range(3)]
+        retry_after = requests.get(f"{server.base_url}/search", headers=headers).headers.get("Retry-After")
+    assert statuses == [200, 200, 429]
+    assert retry_after == "2"
+
+
+def test_latency_is_injected():
+    with LocalSpotifyServer(latency=lambda: 0.05) as server:
+        start = time.perf_counter()
+        requests.get(f"{server.base_url}/search", headers={"Authorization": "Bearer x"})
+        assert time.perf_counter() - start >= 0.05
+
+
+def test_load_catalog_reads_json_and_jsonl(tmp_path):
+    tracks, _ = synthetic_catalog(3)
+    (tmp_path / "a.json").write_text(json.dumps(tracks))
+    (tmp_path / "b.jsonl").write_text("\n".join(json.dumps(t) for t in tracks) + "\n")
+    assert load_catalog(str(tmp_path / "a.json")) == tracks
+    assert load_catalog(str(tmp_path / "b.jsonl")) == tracks
@@ -0,0 +1,90 @@
+import logging
+import threading
+
+import pytest
+
+from utils import logger_config
+from utils.logger_config import logger, set_log_file, stop_queue_logging
+
+
+@pytest.fixture
+def restore_handlers():
+    saved = list(logger.handlers)
+    yield
+    stop_queue_logging()
+    for h in list(logger.handlers):
+        if h not in saved:
+            logger.removeHandler(h)
+            h.close()
+
+
+class ThreadRecorder:
+    """Argument whose rendering records the thread that formatted it."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.get_ident())
+        return "rendered"
+
+
+def test_queued_logging_formats_off_the_calling_thread(tmp_path, restore_handlers, monkeypatch):
+    # Root handlers installed by pytest/conftest would format in this thread
+    monkeypatch.setattr(logger, "propagate", False)
+    log_path = tmp_path / "run.log"
+    set_log_file(str(log_path), mode="w", queued=True)
+    arg = ThreadRecorder()
+
+    logger.info("value=%s", arg)
+    stop_queue_logging()
+
+    assert "value=rendered" in log_path.read_text()
+    assert arg.threads and threading.get_ident() not in arg.threads
+
+
+def test_queued_logging_respects_handler_level(tmp_path, restore_handlers):
+    log_path = tmp_path / "run.log"
+    set_log_file(str(log_path), mode="w", level=logging.INFO, queued=True)
+
+    logger.debug("hidden detail")
+    logger.info("shown")
+    stop_queue_logging()
+
+    text = log_path.read_text()
+    assert "shown" in text
+    assert "hidden detail" not in text
+
+
+def test_message_cap_truncates_large_bodies(tmp_path, restore_handlers):
+    log_path = tmp_path / "run.log"
+    set_log_file(str(log_path), mode="w", queued=True, max_message_chars=100)
+
+    logger.debug("Response Body: %s", "x" * 5000)
+    stop_queue_logging()
+
+    line = log_path.read_text().strip()
+    assert line.endswith("chars]")
+    assert len(line) < 200
+
+
+def test_debug_sampling_keeps_one_in_n(tmp_path, restore_handlers):
+    log_path = tmp_path / "run.log"
+    set_log_file(str(log_path), mode="w", debug_sample_every=5)
+
+    for i in range(20):
+        logger.debug("debug %s", i)
+    logger.warning("always kept")
+    for h in logger.handlers:
+        h.flush()
+
+    lines = log_path.read_text().splitlines()
+    assert sum("debug" in line for line in lines) == 4
+    assert any("always kept" in line for line in lines)
+
+
+def test_reconfiguring_replaces_previous_pipeline(tmp_path, restore_handlers):
+    set_log_file(str(tmp_path / "a.log"), queued=True)
+    set_log_file(str(tmp_path / "b.log"), queued=True)
+
+    assert sum(isinstance(h, logger_config.LazyQueueHandler) for h in logger.handlers) == 1
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import urllib.request
+
+import pytest
+import requests
+
+from playlist_generation.openai_async_manager import OpenAIAsyncManager
+from utils import helpers, metrics, retry_policy
+from utils.metrics import MetricsRegistry
+
+from .mocks import (
+    FakeAsyncOpenAIClient,
+    FakeRequestsResponse,
+    FakeServerError,
+    make_openai_success,
+)
+
+
+async def _no_sleep(_):
+    return None
+
+
+def test_render_is_valid_openmetrics():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls", "Calls made.", ("backend",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("backend",), buckets=(0.1, 1.0))
+
+    calls.inc(backend="openai")
+    calls.inc(2, backend="openai")
+    latency.observe(0.05, backend="openai")
+    latency.observe(0.5, backend="openai")
+    latency.observe(5, backend="openai")
+
+    text = registry.render()
+
+    assert '# TYPE calls counter' in text
+    assert 'calls_total{backend="openai"} 3' in text
+    assert 'latency_seconds_bucket{backend="openai",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{backend="openai",le="1"} 2' in text
+    assert 'latency_seconds_bucket{backend="openai",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{backend="openai"} 3' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_labels_must_match_definition():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls", "Calls made.", ("backend",))
+
+    with pytest.raises(ValueError):
+        calls.inc(model="gpt-5-nano")
+    with pytest.raises(ValueError):
+        registry.gauge("calls", "Redefined with another type.")
+
+
+def test_gauge_tracks_inprogress():
+    registry = MetricsRegistry()
+    inflight = registry.gauge("inflight", "In flight.", ("backend",))
+
+    with inflight.track_inprogress(backend="openai"):
+        assert inflight.value(backend="openai") == 1
+    assert inflight.value(backend="openai") == 0
+
+
+def test_openai_retries_and_tokens_are_counted(monkeypatch):
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
+    client = FakeAsyncOpenAIClient(
+        [
+            FakeServerError(status=503),
+            FakeServerError(status=503),
+            make_openai_success("ok", {"input_tokens": 12, "output_tokens": 30}),
+        ]
+    )
+    manager = OpenAIAsyncManager(api_key="key", max_retries=4, client=client, sleep=_no_sleep)
+
+    asyncio.run(manager.get_response("prompt", model_name="gpt-5-nano"))
+
+    assert metrics.LLM_RETRIES.value(backend="openai", cause="503") == 2
+    assert metrics.LLM_REQUEST_SECONDS.count(backend="openai", operation="generate", model="gpt-5-nano") == 3
+    assert metrics.LLM_TOKENS.value(backend="openai", model="gpt-5-nano", direction="input") == 12
+    assert metrics.LLM_TOKENS.value(backend="openai", model="gpt-5-nano", direction="output") == 30
+    assert metrics.LLM_INFLIGHT.value(backend="openai") == 0
+
+
+def test_openai_final_failure_is_counted():
+    client = FakeAsyncOpenAIClient([FakeServerError(status=400, message="Bad request")])
+    manager = OpenAIAsyncManager(api_key="key", max_retries=3, client=client, sleep=_no_sleep)
+
+    with pytest.raises(FakeServerError):
+        asyncio.run(manager.get_response("prompt"))
+
+    assert metrics.LLM_FAILURES.value(backend="openai", cause="400") == 1
+    assert metrics.LLM_RETRIES.value(backend="openai", cause="400") == 0
+
+
+def test_logged_request_records_latency_and_retries(monkeypatch):
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
+    monkeypatch.setattr(helpers.time, "sleep", lambda _: None)
+    sequence = [
+        requests.exceptions.Timeout("timeout"),
+        FakeRequestsResponse(429, headers={"Retry-After": "0"}),
+        FakeRequestsResponse(200, text="ok"),
+    ]
+
+    def fake_request(method, url, **kwargs):
+        action = sequence.pop(0)
+        if isinstance(action, Exception):
+            raise action
+        return action
+
+    monkeypatch.setattr(helpers.requests, "request", fake_request)
+
+    helpers.logged_request("get", "https://api.spotify.com/v1/search")
+
+    host = "api.spotify.com"
+    assert metrics.HTTP_RETRIES.value(host=host, cause="Timeout") == 1
+    assert metrics.HTTP_RETRIES.value(host=host, cause="429") == 1
+    assert metrics.HTTP_REQUEST_SECONDS.count(host=host, method="GET", status="Timeout") == 1
+    assert metrics.HTTP_REQUEST_SECONDS.count(host=host, method="GET", status="429") == 1
+    assert metrics.HTTP_REQUEST_SECONDS.count(host=host, method="GET", status="200") == 1
+    assert metrics.HTTP_INFLIGHT.value(host=host) == 0
+
+
+def test_snapshot_file_and_endpoint(tmp_path):
+    metrics.TRACK_LOOKUPS.inc(result="exact")
+
+    metrics.write_snapshot(str(tmp_path / "metrics.json"))
+    metrics.write_snapshot(str(tmp_path / "metrics.prom"))
+
+    snapshot = json.loads((tmp_path / "metrics.json").read_text())
+    samples = snapshot["metrics"]["track_lookups"]["samples"]
+    assert samples == [{"labels": {"result": "exact"}, "value": 1.0}]
+    assert 'track_lookups_total{result="exact"} 1' in (tmp_path / "metrics.prom").read_text()
+
+    server = metrics.start_metrics_server()
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+            body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("application/openmetrics-text")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'track_lookups_total{result="exact"} 1' in body
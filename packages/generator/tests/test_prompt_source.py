@@ -0,0 +1,140 @@
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarking.prompt_source import (
+    iter_prompts,
+    load_prompts,
+    merge_csv_outputs,
+    parse_shard,
+    select_prompts,
+)
+
+CORPUS = Path(__file__).resolve().parents[3] / "shuffled_prompts.txt"
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "prompts.txt"
+    path.write_text("# comment\nFirst prompt\n\n  Second prompt  \n" + "".join(f"P{i}\n" for i in range(200)))
+    return str(path)
+
+
+def test_text_file_skips_blanks_and_comments(text_file):
+    records = list(iter_prompts(text_file))
+    assert [r.text for r in records[:2]] == ["First prompt", "Second prompt"]
+    assert [r.index for r in records[:3]] == [0, 1, 2]
+    assert len(records) == 202
+
+
+def test_jsonl_formats(tmp_path):
+    path = tmp_path / "prompts.jsonl"
+    lines = [
+        "\"bare string\"",
+        json.dumps({"id": "a", "prompt": "plain"}),
+        json.dumps({"custom_id": "b", "method": "POST", "url": "/v1/responses",
+                    "body": {"model": "gpt-5-nano", "input": "batch line"}}),
+        json.dumps({"request_id": "c", "title": "t", "body": "ticket body"}),
+    ]
+    path.write_text("\n".join(lines) + "\n")
+
+    records = list(iter_prompts(str(path)))
+
+    assert [(r.key, r.text) for r in records] == [
+        ("bare string", "bare string"), ("a", "plain"), ("b", "batch line"), ("c", "ticket body"),
+    ]
+
+
+def test_jsonl_without_prompt_is_an_error(tmp_path):
+    path = tmp_path / "bad.jsonl"
+    path.write_text(json.dumps({"id": 1}) + "\n")
+    with pytest.raises(ValueError, match="bad.jsonl:1"):
+        list(iter_prompts(str(path)))
+
+
+def test_shards_partition_the_corpus(text_file):
+    everything = load_prompts(text_file)
+    shards = [load_prompts(text_file, shard=i, num_shards=4) for i in range(4)]
+
+    assert sorted(p for shard in shards for p in shard) == sorted(everything)
+    assert all(shards)
+    # Same selection regardless of file order
+    reversed_file = Path(text_file).with_name("reversed.txt")
+    reversed_file.write_text("\n".join(reversed(everything)))
+    assert sorted(load_prompts(str(reversed_file), shard=1, num_shards=4)) == sorted(shards[1])
+
+
+def test_sampling_is_seeded(text_file):
+    a = load_prompts(text_file, sample_rate=0.25, seed=3)
+    assert a == load_prompts(text_file, sample_rate=0.25, seed=3)
+    assert a != load_prompts(text_file, sample_rate=0.25, seed=4)
+    assert 20 < len(a) < 80
+
+    sized = list(select_prompts(iter_prompts(text_file), sample_size=10, seed=1))
+    assert len(sized) == 10
+    assert [r.index for r in sized] == sorted(r.index for r in sized)
+    assert load_prompts(text_file, limit=3) == ["First prompt", "Second prompt", "P0"]
+
+
+def test_parse_shard():
+    assert parse_shard("2/8") == (2, 8)
+    for bad in ("8/8", "x", "1/0", "-1/3"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_bundled_corpus_loads():
+    prompts = load_prompts(str(CORPUS))
+    assert len(prompts) == 456
+    assert len(load_prompts(str(CORPUS), shard=0, num_shards=2)) + \
+        len(load_prompts(str(CORPUS), shard=1, num_shards=2)) == 456
+
+
+def _write_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["prompt", "model", "effort", "verbosity", "runtime"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_merge_csv_outputs_dedupes_and_skips_summaries(tmp_path):
+    row = {"prompt": "p1", "model": "m", "effort": "minimal", "verbosity": "low", "runtime": "1"}
+    _write_csv(tmp_path / "a.csv", [row, dict(row, prompt="p2")])
+    _write_csv(tmp_path / "b.csv", [dict(row, runtime="2"), dict(row, prompt="p3"),
+                                    {"prompt": "=== Summary by Model ==="}, dict(row, prompt="p4")])
+
+    n = merge_csv_outputs([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")], str(tmp_path / "out.csv"))
+
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        merged = list(csv.DictReader(f))
+    assert n == 3
+    # The re-run (later-listed) row wins
+    assert [(r["prompt"], r["runtime"]) for r in merged] == [("p2", "1"), ("p1", "2"), ("p3", "1")]
+
+
+def test_merge_prefers_successful_rows_over_errors(tmp_path):
+    fields = ["prompt", "model", "effort", "verbosity", "output"]
+    ok = {"prompt": "p1", "model": "m", "effort": "low", "verbosity": "low", "output": "[...]"}
+    openai_error = {"prompt": "p2", "model": "ERROR: timed out", "effort": "", "verbosity": "", "output": ""}
+    for name, rows in (("a.csv", [dict(ok, output="ERROR: Ollama down"), openai_error, ok | {"prompt": "p3"}]),
+                       ("b.csv", [ok, ok | {"prompt": "p2"}, ok | {"prompt": "p3", "output": "ERROR: x"}])):
+        with open(tmp_path / name, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    merge_csv_outputs([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")], str(tmp_path / "out.csv"))
+
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        merged = list(csv.DictReader(f))
+    assert [(r["prompt"], r["model"], r["output"]) for r in merged] == [
+        ("p3", "m", "[...]"), ("p1", "m", "[...]"), ("p2", "m", "[...]")]
+
+
+def test_merge_rejects_mismatched_headers(tmp_path):
+    _write_csv(tmp_path / "a.csv", [])
+    (tmp_path / "b.csv").write_text("other,columns\n")
+    with pytest.raises(ValueError):
+        merge_csv_outputs([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")], str(tmp_path / "out.csv"))
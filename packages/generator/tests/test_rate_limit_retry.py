@@ -3,9 +3,8 @@ import asyncio
 import pytest
 import requests
 
-from playlist_generation import openai_async_manager as oam
 from playlist_generation.openai_async_manager import OpenAIAsyncManager
-from utils import helpers
+from utils import helpers, retry_policy
 
 from .mocks import (
     FakeAsyncOpenAIClient,
@@ -50,7 +49,7 @@ def test_openai_manager_exponential_backoff(monkeypatch):
     async def fake_sleep(duration: float) -> None:
         delays.append(duration)
 
-    monkeypatch.setattr(oam.random, "uniform", lambda *_: 0.0)
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
 
     client = FakeAsyncOpenAIClient(
         [
@@ -87,7 +86,7 @@ def test_openai_manager_raises_after_retry_exhaustion(monkeypatch):
     async def fake_sleep(duration: float) -> None:
         delays.append(duration)
 
-    monkeypatch.setattr(oam.random, "uniform", lambda *_: 0.0)
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
 
     client = FakeAsyncOpenAIClient(
         [FakeServerError(status=502) for _ in range(5)]
@@ -112,7 +111,7 @@ def test_openai_manager_retries_invalid_prompt(monkeypatch):
     async def fake_sleep(duration: float) -> None:
         delays.append(duration)
 
-    monkeypatch.setattr(oam.random, "uniform", lambda *_: 0.0)
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
 
     client = FakeAsyncOpenAIClient(
         [
@@ -143,7 +142,7 @@ def test_logged_request_retries_on_rate_limit(monkeypatch):
     def fake_sleep(duration: float) -> None:
         delays.append(duration)
 
-    monkeypatch.setattr(helpers.random, "uniform", lambda *_: 0.0)
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
     monkeypatch.setattr(helpers.time, "sleep", fake_sleep)
 
     sequence = [
@@ -175,7 +174,7 @@ def test_logged_request_retries_on_timeout(monkeypatch):
     def fake_sleep(duration: float) -> None:
         delays.append(duration)
 
-    monkeypatch.setattr(helpers.random, "uniform", lambda *_: 0.0)
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
     monkeypatch.setattr(helpers.time, "sleep", fake_sleep)
 
     sequence = [
@@ -207,7 +206,7 @@ def test_logged_request_raises_after_exhausting_retries(monkeypatch):
     def fake_sleep(duration: float) -> None:
         delays.append(duration)
 
-    monkeypatch.setattr(helpers.random, "uniform", lambda *_: 0.0)
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
     monkeypatch.setattr(helpers.time, "sleep", fake_sleep)
 
     sequence = [FakeRequestsResponse(503, text="down")] * 4
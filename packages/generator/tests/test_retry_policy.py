@@ -0,0 +1,103 @@
+import asyncio
+import random
+
+import pytest
+import requests
+
+from playlist_generation.openai_async_manager import OpenAIAsyncManager
+from utils import metrics
+from utils.retry_policy import RETRY_DECISIONS, RetryBudget, RetryPolicy
+
+from .mocks import FakeAsyncOpenAIClient, FakeInvalidPromptError, FakeRateLimitError, FakeServerError
+
+
+class APITimeoutError(Exception):
+    """Named like the OpenAI SDK's timeout error, which the table matches by name."""
+
+
+def _policy(**kwargs):
+    kwargs.setdefault("budget", RetryBudget())
+    return RetryPolicy("test", **kwargs)
+
+
+@pytest.mark.parametrize("err, error_class, retryable", [
+    (FakeRateLimitError(), "rate_limit", True),
+    (FakeServerError(status=503, message="anything"), "server", True),
+    (FakeServerError(status=501), "server_other", False),
+    (FakeServerError(status=400, message="Server error, please retry"), "client", False),
+    (FakeInvalidPromptError(), "invalid_prompt", True),
+    (APITimeoutError("request timed out"), "timeout", True),
+    (requests.exceptions.ReadTimeout(), "timeout", True),
+    (requests.exceptions.ConnectionError(), "connection", True),
+    (ValueError("rate limit in the message does not matter"), "unknown", False),
+])
+def test_classifies_by_type_and_status_not_message(err, error_class, retryable):
+    cls = _policy().classify(err)
+    assert (cls.error_class, cls.retryable) == (error_class, retryable)
+
+
+def test_classifies_responses_and_reads_retry_after():
+    cls = _policy().classify(status=429, headers={"retry-after": "1.5"})
+    assert cls == ("rate_limit", True, 1.5)
+
+
+def test_decorrelated_jitter_grows_from_previous_delay(monkeypatch):
+    spreads = []
+
+    def fake_uniform(lo, hi):
+        spreads.append(hi)
+        return hi
+
+    monkeypatch.setattr(random, "uniform", fake_uniform)
+    retry = _policy(max_attempts=10, backoff_base=0.1, jitter=0.05, max_delay=2.0).start()
+    server = _policy().classify(status=503)
+
+    delays = [retry.next_delay(server) for _ in range(5)]
+    # floor 0.1 + 0.05; then spread 3 x prev - floor, capped at max_delay
+    assert delays[0] == pytest.approx(0.15)
+    assert delays[1] == pytest.approx(0.45)
+    assert delays[2] == pytest.approx(1.35)
+    assert delays[3:] == [2.0, 2.0]
+
+
+def test_zero_jitter_is_plain_exponential_backoff():
+    retry = _policy(max_attempts=10, backoff_base=0.1, jitter=0.0, max_delay=0.5).start()
+    server = _policy().classify(status=503)
+
+    assert [retry.next_delay(server) for _ in range(4)] == pytest.approx([0.1, 0.2, 0.4, 0.5])
+
+
+def test_total_retry_time_cap_gives_up():
+    retry = _policy(max_elapsed=1.0).start()
+    assert retry.next_delay(_policy().classify(status=429, headers={"Retry-After": "5"})) is None
+    assert retry.decision == "deadline"
+    assert RETRY_DECISIONS.value(policy="test", error_class="rate_limit", decision="deadline") == 1
+
+
+def test_budget_caps_retries_to_a_fraction_of_traffic():
+    budget = RetryBudget(ratio=0.5, min_per_sec=0.0, capacity=2.0)
+    policy = _policy(budget=budget, backoff_base=0.0, jitter=0.0)
+    server = policy.classify(status=500)
+
+    granted = []
+    for _ in range(6):
+        retry = policy.start()
+        granted.append(retry.next_delay(server) is not None)
+    # The stored tokens plus deposits cover three, then one retry per two calls
+    assert granted == [True, True, True, False, True, False]
+    assert RETRY_DECISIONS.value(policy="test", error_class="server", decision="budget") == 2
+
+
+def test_manager_stops_retrying_when_budget_is_spent():
+    async def no_sleep(_):
+        return None
+
+    policy = _policy(backoff_base=0.0, budget=RetryBudget(ratio=0.0, min_per_sec=0.0, capacity=1.0))
+    client = FakeAsyncOpenAIClient([FakeServerError(status=500) for _ in range(5)])
+    manager = OpenAIAsyncManager(api_key="k", client=client, sleep=no_sleep, retry_policy=policy)
+
+    with pytest.raises(FakeServerError):
+        asyncio.run(manager.get_response("prompt"))
+
+    assert metrics.LLM_RETRIES.value(backend="openai", cause="500") == 1
+    assert RETRY_DECISIONS.value(policy="test", error_class="server", decision="budget") == 1
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+import benchmark_cli
+import runs_cli
+from benchmarking.load_harness import BackendProfile, Latency, run_ollama_load, run_openai_load
+from benchmarking.sweep_config import SweepConfig
+from utils.run_store import RunStore
+
+FAST = BackendProfile(Latency(0.001, "fixed"))
+
+
+def _rows(model, runtimes, **extra):
+    return [{"prompt": f"p{i}", "model": model, "effort": "low", "verbosity": "low",
+             "runtime": str(r), "tracks_parsed": "20", "tracks_found": "15", **extra}
+            for i, r in enumerate(runtimes)]
+
+
+def test_imports_both_runners_csvs(tmp_path):
+    openai_dir, ollama_dir = tmp_path / "20260101_120000", tmp_path / "20260102_120000"
+    openai_dir.mkdir()
+    ollama_dir.mkdir()
+    run_openai_load(rows=6, openai=FAST, spotify=FAST,
+                    output_csv=str(openai_dir / "openai_benchmark_results_async_shard1of4.csv"))
+    run_ollama_load(rows=4, ollama=FAST, spotify=FAST,
+                    output_csv=str(ollama_dir / "ollama_benchmark_results.csv"))
+
+    with RunStore(tmp_path / "runs.sqlite") as store:
+        runs_cli.main(["--db", store.path, "import", str(openai_dir), str(ollama_dir)])
+        # Re-importing a run replaces it
+        store.import_csv(ollama_dir / "ollama_benchmark_results.csv")
+
+        runs = {r["run_id"]: r for r in store.runs()}
+        assert set(runs) == {"20260101_120000-shard1of4", "20260102_120000"}
+        assert runs["20260101_120000-shard1of4"]["backend"] == "openai"
+        # Ollama's appended summary tables are not rows
+        assert runs["20260102_120000"]["rows"] == 4
+        assert runs["20260102_120000"]["backend"] == "ollama"
+        assert [r["run_id"] for r in store.runs(last=1)] == ["20260102_120000"]
+        summary = {r["model"]: r for r in store.summary()}
+        assert summary["sim-model"]["rows"] == 6 and summary["sim-ollama"]["rows"] == 4
+
+
+def test_latency_percentiles_over_recent_runs():
+    with RunStore(":memory:") as store:
+        store.add_run("old", _rows("nano", [9.0] * 10), started_at=1.0)
+        store.add_run("new", _rows("nano", range(1, 11)) + _rows("mini", [0.5]), started_at=2.0)
+        store.add_run("failed", [{"prompt": "p", "model": "ERROR: deadline exceeded during generate",
+                                  "stage_timings": "{}"}], started_at=3.0)
+
+        recent = {r["model"]: r for r in store.latency_percentiles((50, 90), last=2)}
+        assert recent["nano"] == {"model": "nano", "rows": 10, "p50": 5.0, "p90": 9.0}
+        assert recent["mini"]["p50"] == 0.5
+        assert store.latency_percentiles(model="nano")[0]["rows"] == 20
+
+        by_run = store.summary(by=("run_id",))
+        assert [(r["run_id"], r["rows"], r["failed_rows"]) for r in by_run] == [
+            ("failed", 1, 1), ("new", 11, 0), ("old", 10, 0)]
+        assert by_run[1]["found_rate"] == pytest.approx(0.75)
+        with pytest.raises(ValueError, match="group by"):
+            store.summary(by=("raw_text",))
+
+
+def test_benchmark_cli_records_the_run(tmp_path, capsys):
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    (run_dir / "openai_benchmark_results_async.csv").write_text(
+        "prompt,model,runtime,tracks_parsed,tracks_found\np,nano,1.5,20,18\n")
+    config = SweepConfig(output_dir=str(run_dir), run_store=str(tmp_path / "runs.sqlite"))
+
+    assert benchmark_cli.record_run(config, run_dir, started_at=5.0) == "run"
+    capsys.readouterr()
+
+    runs_cli.main(["--db", config.run_store, "--json", "latency", "--percentiles", "50"])
+    assert json.loads(capsys.readouterr().out) == [{"model": "nano", "rows": 1, "p50": 1.5}]
@@ -0,0 +1,153 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarking.model_benchmark import ModelBenchmark
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+from playlist_generation.llm_manager import OllamaManager
+from playlist_generation.openai_async_manager import OpenAIAsyncManager, StreamInterrupted
+from utils import helpers
+from utils.retry_policy import RetryBudget, RetryPolicy
+from utils.track_lines import TrackLineParser
+
+from .mocks import FakeRequestsResponse, FakeServerError
+
+PLAYLIST = "1. Hurt [Live] — Johnny Cash\nCreep – Radiohead\n\n- Mr. Blue Sky — ELO"
+TRACKS = [
+    {"title": "Hurt [Live]", "artist": "Johnny Cash"},
+    {"title": "Creep", "artist": "Radiohead"},
+    {"title": "Mr. Blue Sky", "artist": "ELO"},
+]
+
+
+class StreamingClient:
+    """responses.create streaming `text` line by line; JSON conversion is not expected."""
+
+    def __init__(self, text=PLAYLIST, fail_at=None, stall_at=None, errors=()):
+        self.text = text
+        self.fail_at = fail_at
+        self.stall_at = stall_at
+        self.errors = list(errors)
+        self.calls = 0
+        self.finished = False
+        self.responses = SimpleNamespace(create=self._create)
+
+    async def _create(self, *, stream=False, **_):
+        assert stream
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self._events()
+
+    async def _events(self):
+        for i, line in enumerate(self.text.splitlines(keepends=True)):
+            if i == self.fail_at:
+                raise ConnectionError("connection reset")
+            if i == self.stall_at:
+                await asyncio.sleep(60)
+            await asyncio.sleep(0.02)
+            yield SimpleNamespace(type="response.output_text.delta", delta=line)
+        self.finished = True
+        usage = SimpleNamespace(input_tokens=3, output_tokens=5, total_tokens=8)
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(output_text="", usage=usage))
+
+
+class RecordingSpotify:
+    def __init__(self, client=None):
+        self.client = client
+        self.seen = []
+
+    def track_exists(self, title, artist):
+        self.seen.append((title, self.client.finished if self.client else None))
+        return title != "Creep", f"{title} by {artist}"
+
+
+def _manager(client, **kwargs):
+    policy = RetryPolicy("test", backoff_base=0.01, jitter=0.0, budget=RetryBudget())
+    return OpenAIAsyncManager(api_key="k", model="m", client=client, retry_policy=policy, **kwargs)
+
+
+def test_track_line_parser_handles_chunks_and_the_last_line():
+    parser = TrackLineParser()
+    seen = []
+    for i in range(0, len(PLAYLIST), 5):
+        seen.extend(parser.feed(PLAYLIST[i:i + 5]))
+
+    assert seen == TRACKS[:2]
+    assert parser.close() == TRACKS
+
+
+def test_streamed_response_is_delivered_and_retried_only_before_text():
+    client = StreamingClient(errors=[FakeServerError(503)])
+    deltas = []
+
+    text, usage = asyncio.run(_manager(client).get_response("p", on_delta=deltas.append))
+
+    assert text == PLAYLIST == "".join(deltas)
+    assert usage.total_tokens == 8
+    assert client.calls == 2
+
+    broken = StreamingClient(fail_at=2)
+    with pytest.raises(StreamInterrupted):
+        asyncio.run(_manager(broken).get_response("p", on_delta=lambda _: None))
+    assert broken.calls == 1
+
+
+def test_stream_stalling_after_output_is_not_replayed():
+    # The per-attempt timeout would normally be retried as a timeout
+    client = StreamingClient(stall_at=1)
+    deltas = []
+
+    with pytest.raises(StreamInterrupted):
+        asyncio.run(_manager(client, request_timeout=0.1).get_response("p", on_delta=deltas.append))
+
+    assert client.calls == 1
+    assert deltas == ["1. Hurt [Live] — Johnny Cash\n"]
+
+
+def test_streaming_row_validates_while_generating():
+    client = StreamingClient()
+    spotify = RecordingSpotify(client)
+    bench = OpenAIModelAsyncBenchmark(prompts=["p"], models=["m"], manager=_manager(client),
+                                      output_csv=None, spotify_client=spotify, stream=True)
+
+    asyncio.run(bench.run(progress=False))
+
+    row = bench.results[0]
+    assert json.loads(row["json"]) == TRACKS
+    assert (row["tracks_parsed"], row["tracks_found"]) == (3, 2)
+    assert row["check_results"] == "".join(f"{t['title']} by {t['artist']}\n" for t in TRACKS)
+    # The first lookups ran before the model finished
+    assert spotify.seen[0] == ("Hurt [Live]", False)
+    assert set(json.loads(row["stage_timings"])) == {"generate", "validate"}
+
+
+def test_ollama_stream_matches_unstreamed_results(monkeypatch):
+    body = json.dumps({"playlist": TRACKS})
+    pieces = [body[i:i + 7] for i in range(0, len(body), 7)]
+    lines = [json.dumps({"response": p, "done": False}).encode() for p in pieces]
+    lines.append(json.dumps({"response": "", "done": True, "eval_count": 9}).encode())
+
+    def request(method, url, json=None, **kw):
+        if json["stream"]:
+            response = FakeRequestsResponse(200)
+            response.iter_lines = lambda: iter(lines)
+            response.close = lambda: None
+            return response
+        response = FakeRequestsResponse(200)
+        response.json = lambda: {"response": body}
+        return response
+
+    monkeypatch.setattr(helpers.requests, "request", request)
+    results = {}
+    for stream in (False, True):
+        bench = ModelBenchmark(["m"], ["p"], None, RecordingSpotify(), llm_manager=OllamaManager(),
+                               stream=stream)
+        bench.llm_manager.is_ollama_running = lambda model: True
+        bench.run_benchmarks()
+        results[stream] = {k: bench.results[0][k] for k in ("tracks_parsed", "tracks_found", "check_results")}
+
+    assert results[True] == results[False]
+    assert results[True]["tracks_parsed"] == 3
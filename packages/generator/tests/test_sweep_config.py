@@ -0,0 +1,137 @@
+import json
+from datetime import datetime
+
+import pytest
+
+import benchmark_cli
+from api_clients.track_index import TrackLookupIndex
+from benchmarking.sweep_config import SweepConfig, config_from_args, track_lookup
+
+
+def _config(argv, backend=None):
+    return config_from_args(benchmark_cli.build_parser(backend).parse_args(argv))
+
+
+def test_flags_override_the_config_file(tmp_path):
+    path = tmp_path / "sweep.json"
+    path.write_text(json.dumps({
+        "models": ["gpt-5-nano", "gpt-5-mini"],
+        "effort": ["minimal", "low"],
+        "concurrency": 24,
+        "stage_timeouts": {"generate": 60},
+    }))
+
+    config = _config(["--config", str(path), "--concurrency", "32", "--shard", "2/8",
+                      "--stage-timeout", "validate=5"])
+
+    assert config.models == ["gpt-5-nano", "gpt-5-mini"]
+    assert config.effort == ["minimal", "low"]
+    assert config.concurrency == 32
+    assert config.stage_timeouts == {"generate": 60, "validate": 5.0}
+    assert config.selection()["shard"] == 2 and config.selection()["num_shards"] == 8
+    assert config.csv_name() == "openai_benchmark_results_async_shard2of8.csv"
+
+
+def test_toml_config_and_backend_defaults(tmp_path):
+    pytest.importorskip("tomllib")
+    path = tmp_path / "sweep.toml"
+    path.write_text('backend = "ollama"\ncache = "exact"\n# models = ["mistral:latest"]\n')
+
+    config = _config(["--config", str(path)])
+
+    assert config.backend == "ollama"
+    assert config.models == ["gemma2:2b"]
+    assert config.csv_name() == "ollama_benchmark_results.csv"
+    assert _config([], backend="ollama").backend == "ollama"
+
+
+def test_invalid_configs_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown config key"):
+        SweepConfig.from_dict({"concurency": 5})
+    with pytest.raises(ValueError, match="only supported by the openai backend"):
+        SweepConfig(backend="ollama", workers=4)
+    with pytest.raises(ValueError, match="stage"):
+        SweepConfig(stage_timeouts={"render": 1})
+    with pytest.raises(SystemExit):
+        benchmark_cli.main(["--stage-timeout", "validate"])
+
+
+def test_prompt_file_selection_and_cache_modes(tmp_path):
+    prompts = tmp_path / "prompts.txt"
+    prompts.write_text("".join(f"prompt {i}\n" for i in range(20)))
+    config = SweepConfig(prompts_file=str(prompts), limit=3)
+
+    assert config.load_prompts() == ["prompt 0", "prompt 1", "prompt 2"]
+
+    inline = [f"prompt {i}" for i in range(20)]
+    assert SweepConfig(prompts=inline, limit=3).load_prompts() == inline[:3]
+    shards = [SweepConfig(prompts=inline, shard=f"{i}/4").load_prompts() for i in range(4)]
+    assert sorted(p for shard in shards for p in shard) == sorted(inline)
+    assert shards == [SweepConfig(prompts_file=str(prompts), shard=f"{i}/4").load_prompts() for i in range(4)]
+
+    client = object()
+    assert track_lookup(client, "off") is client
+    assert track_lookup(client, "exact").fuzzy_threshold > 1.0
+    assert isinstance(track_lookup(client), TrackLookupIndex)
+
+
+def test_run_dir_gets_the_resolved_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark_cli, "OUTPUT_ROOT", tmp_path)
+    config = _config(["--models", "m1", "--output-dir", str(tmp_path / "run")])
+
+    run_dir = benchmark_cli.prepare_run_dir(config)
+
+    saved = json.loads((run_dir / "config.json").read_text())
+    assert saved["models"] == ["m1"]
+    assert saved["track_store"] == str(tmp_path / "track_store.sqlite")
+    assert SweepConfig.from_dict(saved) == config
+
+
+def test_repeating_a_sweep_from_its_config_gets_a_new_run_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark_cli, "OUTPUT_ROOT", tmp_path)
+    times = iter([datetime(2026, 1, 1, 0, 0), datetime(2026, 1, 1, 0, 1)])
+
+    class Clock:
+        @staticmethod
+        def now():
+            return next(times)
+
+    monkeypatch.setattr(benchmark_cli, "datetime", Clock)
+
+    first = benchmark_cli.prepare_run_dir(_config(["--models", "m1"]))
+    saved = json.loads((first / "config.json").read_text())
+    assert saved["output_dir"] is None
+
+    again = benchmark_cli.prepare_run_dir(_config(["--config", str(first / "config.json")]))
+    assert again == tmp_path / "20260101_000100" != first
+
+
+def test_failed_ollama_run_still_writes_metrics_and_closes_server(tmp_path, monkeypatch):
+    import benchmark_main
+    from utils import metrics
+
+    monkeypatch.setattr(benchmark_cli, "OUTPUT_ROOT", tmp_path)
+    monkeypatch.setenv("PLAYLIST_METRICS_PORT", "0")
+    servers = []
+    start = metrics.start_metrics_server
+
+    def tracked_server(port):
+        servers.append(start(port))
+        return servers[-1]
+
+    monkeypatch.setattr(metrics, "start_metrics_server", tracked_server)
+
+    def crash(config, run_dir):
+        metrics.TRACK_LOOKUPS.inc(result="exact")
+        raise RuntimeError("ollama down")
+
+    monkeypatch.setattr(benchmark_main, "run", crash)
+    config = _config(["--output-dir", str(tmp_path / "run"), "--run-store", ""], backend="ollama")
+
+    with pytest.raises(RuntimeError):
+        benchmark_cli.run(config)
+
+    snapshot = json.loads((tmp_path / "run" / "metrics.json").read_text())
+    assert snapshot["metrics"]["track_lookups"]["samples"][0]["value"] == 1.0
+    assert (tmp_path / "run" / "metrics.prom").exists()
+    assert servers and servers[0].socket.fileno() == -1
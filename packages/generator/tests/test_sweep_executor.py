@@ -0,0 +1,91 @@
+import asyncio
+import csv
+import functools
+import time
+
+import pytest
+
+from benchmarking.load_harness import (
+    BackendProfile,
+    Latency,
+    simulated_manager_factory,
+    simulated_spotify_factory,
+)
+from benchmarking.sweep_executor import run_sweep, split_combos
+from utils.rate_limiter import SharedRateLimiter
+
+FAST = BackendProfile(Latency(0.001, "fixed"))
+MANAGER = functools.partial(simulated_manager_factory, profile=FAST)
+SPOTIFY = functools.partial(simulated_spotify_factory, profile=FAST)
+
+
+def test_rate_limiter_allows_burst_then_spaces_requests():
+    limiter = SharedRateLimiter(rate=100, burst=2)
+    waits = [limiter.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.01, abs=0.003)
+    assert waits[3] == pytest.approx(0.02, abs=0.003)
+
+
+def test_rate_limiter_async_acquire_waits():
+    limiter = SharedRateLimiter(rate=50, burst=1)
+
+    async def take(n):
+        for _ in range(n):
+            await limiter.acquire()
+
+    start = time.perf_counter()
+    asyncio.run(take(6))
+    assert time.perf_counter() - start >= 0.09
+
+
+def test_rate_limiter_rejects_bad_config():
+    with pytest.raises(ValueError):
+        SharedRateLimiter(rate=0)
+
+
+def test_split_combos_round_robin():
+    shares = split_combos(list(range(7)), 3)
+    assert shares == [[0, 3, 6], [1, 4], [2, 5]]
+
+
+def test_sweep_merges_rows_from_all_workers(tmp_path):
+    out = tmp_path / "sweep.csv"
+    prompts = [f"prompt {i}" for i in range(12)]
+
+    summary = run_sweep(
+        prompts, ["sim-model"], str(out), effort=["minimal", "low"], workers=3, concurrency=4,
+        manager_factory=MANAGER, spotify_factory=SPOTIFY, log_dir=str(tmp_path), progress=False,
+    )
+
+    with out.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert summary["errors"] == {}
+    assert summary["rows"] == len(rows) == 24
+    assert sorted(summary["workers"].values()) == [8, 8, 8]
+    assert {(r["prompt"], r["effort"]) for r in rows} == {(p, e) for p in prompts for e in ("minimal", "low")}
+    assert summary["failed_rows"] == 0
+    assert summary["track_ids"]
+    assert sorted(p.name for p in tmp_path.glob("worker*.log")) == ["worker0.log", "worker1.log", "worker2.log"]
+
+
+def test_sweep_shares_one_rate_budget(tmp_path):
+    # 8 rows x 2 OpenAI calls at 40/s with no burst needs >= 15/40 s in total
+    start = time.perf_counter()
+    summary = run_sweep(
+        [f"p{i}" for i in range(8)], ["sim-model"], str(tmp_path / "out.csv"), workers=2,
+        rate_limit=40, burst=1, manager_factory=MANAGER, spotify_factory=SPOTIFY, progress=False,
+    )
+    assert summary["rows"] == 8
+    assert time.perf_counter() - start >= 15 / 40
+
+
+def test_sweep_reports_worker_failures(tmp_path):
+    broken = functools.partial(simulated_manager_factory, profile=None)
+    summary = run_sweep(
+        ["p1", "p2"], ["sim-model"], str(tmp_path / "out.csv"), workers=2,
+        manager_factory=broken, spotify_factory=SPOTIFY, progress=False,
+    )
+    assert summary["rows"] == 0
+    assert set(summary["errors"]) == {0, 1}
+    assert "AttributeError" in summary["errors"][0]
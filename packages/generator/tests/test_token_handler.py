@@ -0,0 +1,114 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from api_clients.local_spotify import LocalSpotifyServer
+from api_clients.spotify_client import SpotifyClient
+from api_clients.token_handler import TokenHandler
+from utils import helpers
+
+from .mocks import FakeRequestsResponse
+
+
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "local-id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "local-secret")
+
+
+def _handler(server, tmp_path, **kwargs):
+    return TokenHandler(token_url=server.token_url, token_file=tmp_path / "token.json", **kwargs)
+
+
+def test_concurrent_threads_share_one_fetch_and_save_to_token_file(tmp_path, monkeypatch, credentials):
+    (tmp_path / "cwd").mkdir()
+    monkeypatch.chdir(tmp_path / "cwd")
+    with LocalSpotifyServer(latency=0.1) as server:
+        handler = _handler(server, tmp_path)
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(handler.get_token())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # A second handler (e.g. the next run) reuses the saved token
+        again = _handler(server, tmp_path).load_token()
+
+    assert server.tokens_issued == 1
+    assert len({t["access_token"] for t in seen}) == 1
+    assert again["access_token"] == seen[0]["access_token"]
+    assert json.loads((tmp_path / "token.json").read_text())["expires_at"] > time.time()
+    assert not (tmp_path / "cwd" / "token.json").exists()
+
+
+def test_near_expiry_token_is_served_while_refreshed_in_background(tmp_path, credentials):
+    with LocalSpotifyServer(token_lifetime=600) as server:
+        handler = _handler(server, tmp_path, refresh_margin=3600)
+        first = handler.get_token()
+        server.latency = 0.2
+
+        start = time.monotonic()
+        assert handler.get_token() is first  # kicks off the refresh
+        assert handler.get_token() is first  # refresh already in flight
+        assert time.monotonic() - start < 0.1
+
+        while handler.token is first and time.monotonic() - start < 5:
+            time.sleep(0.01)
+
+    assert server.tokens_issued == 2
+    assert handler.get_token()["access_token"] != first["access_token"]
+
+
+def test_failed_background_save_backs_off_instead_of_retrying(tmp_path, credentials):
+    with LocalSpotifyServer(token_lifetime=600) as server:
+        handler = _handler(server, tmp_path, refresh_margin=3600)
+        first = handler.get_token()
+
+        def disk_full(*_):
+            raise OSError("No space left on device")
+
+        handler.save_token = disk_full
+        assert handler.get_token() is first  # kicks off the failing refresh
+        deadline = time.monotonic() + 5
+        while not handler._retry_at and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert handler._retry_at > time.time()
+        assert handler.get_token() is first
+        assert handler._lock.acquire(blocking=False)
+        handler._lock.release()
+
+    assert server.tokens_issued == 2
+
+
+def test_asyncio_tasks_share_one_fetch(tmp_path, credentials):
+    async def fetch_all(handler):
+        return await asyncio.gather(*(handler.aget_token() for _ in range(10)))
+
+    with LocalSpotifyServer(latency=0.1) as server:
+        tokens = asyncio.run(fetch_all(_handler(server, tmp_path)))
+
+    assert server.tokens_issued == 1
+    assert len({t["access_token"] for t in tokens}) == 1
+
+
+def test_client_refetches_token_once_after_401(tmp_path, monkeypatch, credentials):
+    sent = []
+
+    def fake_request(method, url, headers=None, **kwargs):
+        sent.append(headers["Authorization"])
+        return FakeRequestsResponse(401 if len(sent) == 1 else 200)
+
+    with LocalSpotifyServer() as server:
+        handler = _handler(server, tmp_path)
+        handler.get_token()
+        monkeypatch.setattr(helpers.requests, "request", fake_request)
+        client = SpotifyClient(handler, base_url="https://api.example/v1")
+        client._get("https://api.example/v1/search", {"q": "x"})
+
+    assert server.tokens_issued == 2
+    assert len(sent) == 2 and sent[0] != sent[1]
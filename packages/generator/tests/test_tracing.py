@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarking.openai_async_benchmark import OpenAIModelAsyncBenchmark
+from playlist_generation.openai_async_manager import OpenAIAsyncManager
+from utils import retry_policy, tracing
+from utils.tracing import TRACER, Tracer
+
+from .mocks import FakeAsyncOpenAIClient, FakeServerError, make_openai_success
+
+
+@pytest.fixture
+def tracer():
+    TRACER.clear()
+    TRACER.enable()
+    yield TRACER
+    TRACER.disable()
+    TRACER.clear()
+
+
+class FakeSpotify:
+    def track_exists(self, title, artist):
+        return title != "Missing", f"{title} - {artist}"
+
+
+PLAYLIST = json.dumps([
+    {"title": "Imperial March", "artist": "John Williams"},
+    {"title": "Missing", "artist": "Nobody"},
+])
+
+
+async def _no_sleep(_):
+    return None
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span("row") as s:
+        s.set(status="ok")
+    assert tracer.spans == []
+
+
+def test_spans_nest_and_record_errors():
+    tracer = Tracer(enabled=True)
+    with pytest.raises(ValueError):
+        with tracer.span("row", root=True):
+            with tracer.span("child"):
+                raise ValueError("boom")
+
+    child, row = tracer.spans
+    assert child.parent_id == row.span_id
+    assert child.lane == row.lane
+    assert child.attrs["error"] == row.attrs["error"] == "ValueError"
+
+
+def test_benchmark_row_spans_cover_attempts_backoff_lookups_and_sink(tracer, tmp_path, monkeypatch):
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda *_: 0.0)
+    client = FakeAsyncOpenAIClient([
+        FakeServerError(status=503),
+        make_openai_success("freeform"),
+        make_openai_success(PLAYLIST),
+    ])
+    manager = OpenAIAsyncManager(api_key="key", backoff_base=0.01, client=client, sleep=_no_sleep)
+    bench = OpenAIModelAsyncBenchmark(
+        ["Darth Vader's tea party"], ["gpt-5-nano"], manager,
+        output_csv=str(tmp_path / "out.csv"), spotify_client=FakeSpotify(),
+    )
+
+    asyncio.run(bench.run(concurrency=1))
+
+    spans = tracer.spans
+    (row,) = [s for s in spans if s.name == "row"]
+    assert row.attrs["status"] == "ok"
+    names = [s.name for s in spans]
+    assert names.count("llm.attempt") == 3
+    assert names.count("llm.backoff") == 1
+    assert names.count("spotify.lookup") == 2
+    assert "sink.write" in names
+
+    by_id = {s.span_id: s for s in spans}
+    # Lookups run on a worker thread but still nest under the row
+    lookup = next(s for s in spans if s.name == "spotify.lookup")
+    assert by_id[lookup.parent_id].name == "validate"
+    assert by_id[by_id[lookup.parent_id].parent_id] is row
+    assert all(s.lane == row.lane for s in spans)
+
+    out = tmp_path / "trace.json"
+    assert TRACER.export_chrome_trace(str(out)) == len(spans)
+    events = json.loads(out.read_text())["traceEvents"]
+    assert {e["ph"] for e in events} == {"X", "M"}
+    assert all(e["dur"] >= 0 for e in events if e["ph"] == "X")
+
+
+def test_concurrent_rows_get_separate_lanes(tracer, tmp_path):
+    client = FakeAsyncOpenAIClient([make_openai_success(PLAYLIST)] * 4)
+    manager = OpenAIAsyncManager(api_key="key", client=client, sleep=_no_sleep)
+    bench = OpenAIModelAsyncBenchmark(
+        ["p1", "p2"], ["gpt-5-nano"], manager,
+        output_csv=str(tmp_path / "out.csv"), spotify_client=FakeSpotify(),
+    )
+
+    asyncio.run(bench.run(concurrency=2))
+
+    rows = [s for s in tracer.spans if s.name == "row"]
+    assert len({r.lane for r in rows}) == 2
+    for s in tracer.spans:
+        assert s.lane in {r.lane for r in rows}
+
+
+def test_span_helper_uses_global_tracer(tracer):
+    with tracing.span("standalone", detail=1):
+        pass
+    assert [s.name for s in tracer.spans] == ["standalone"]
@@ -0,0 +1,92 @@
+import sqlite3
+
+from api_clients.spotify_client import SpotifyClient
+from api_clients.track_enricher import TrackEnricher
+from utils.track_store import TrackStore
+
+from .mocks import FakeSpotifyServer
+
+
+TOKEN = {"access_token": "test-token"}
+
+
+def _catalog(n: int):
+    tracks = [
+        {
+            "id": f"t{i}",
+            "name": f"Song {i}",
+            "artists": [{"id": f"a{i % 3}", "name": f"Artist {i % 3}"}],
+            "popularity": i,
+            "duration_ms": 1000 * i,
+        }
+        for i in range(n)
+    ]
+    artists = [{"id": f"a{j}", "name": f"Artist {j}", "genres": [f"genre-{j}", "pop"]} for j in range(3)]
+    features = [{"id": f"t{i}", "energy": i / n, "tempo": 100.0 + i} for i in range(n)]
+    return tracks, artists, features
+
+
+def test_track_exists_captures_track_id():
+    tracks, artists, features = _catalog(2)
+    with FakeSpotifyServer(tracks, artists, features) as server:
+        client = SpotifyClient(TOKEN, base_url=server.base_url)
+        found, text = client.track_exists("Song 1", "Artist 1")
+        missing, _ = client.track_exists("Nope", "Nobody")
+
+    assert found is True
+    assert "t1" in text
+    assert missing is False
+    assert client.track_ids == {("Song 1", "Artist 1"): "t1"}
+
+
+def test_get_several_batches_by_endpoint_limit():
+    tracks, artists, features = _catalog(120)
+    ids = [t["id"] for t in tracks]
+    with FakeSpotifyServer(tracks, artists, features) as server:
+        client = SpotifyClient(TOKEN, base_url=server.base_url)
+        fetched = client.get_tracks(ids + ids[:10])
+        feats = client.get_audio_features(ids)
+
+        assert server.count("tracks") == 3
+        assert server.count("audio-features") == 2
+
+    assert set(fetched) == set(ids)
+    assert feats["t5"]["tempo"] == 105.0
+
+
+def test_enricher_stores_metadata_and_skips_known_tracks(tmp_path):
+    tracks, artists, features = _catalog(60)
+    with FakeSpotifyServer(tracks, artists, features) as server:
+        client = SpotifyClient(TOKEN, base_url=server.base_url)
+        for t in tracks:
+            client.track_exists(t["name"], t["artists"][0]["name"])
+
+        with TrackStore(str(tmp_path / "tracks.db")) as store:
+            enricher = TrackEnricher(client, store)
+            assert enricher.enrich_from_client() == 60
+            assert server.count("tracks") == 2
+            assert server.count("artists") == 1
+            assert server.count("audio-features") == 1
+
+            # A second pass is served entirely from the store
+            assert enricher.enrich_from_client() == 0
+            assert server.count("tracks") == 2
+
+            assert store.track_id_for("  song 7 ", "ARTIST 1") == "t7"
+
+    conn = sqlite3.connect(tmp_path / "tracks.db")
+    genres, tempo = conn.execute("SELECT genres, tempo FROM tracks WHERE id = 't4'").fetchone()
+    assert genres == '["genre-1", "pop"]'
+    assert tempo == 104.0
+
+
+def test_enricher_tolerates_missing_audio_features(tmp_path):
+    tracks, artists, _ = _catalog(3)
+    with FakeSpotifyServer(tracks, artists) as server:
+        client = SpotifyClient(TOKEN, base_url=server.base_url)
+        # Unknown IDs come back as nulls, which are skipped; the features
+        # endpoint answers 403
+        with TrackStore(":memory:") as store:
+            assert TrackEnricher(client, store).enrich(["t0", "t1", "bogus"]) == 2
+            assert store.known_track_ids(["t0", "t1", "t2"]) == {"t0", "t1"}
+        assert server.count("audio-features") == 1
@@ -0,0 +1,179 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from api_clients.track_index import TrackLookupIndex, artist_key, title_key, track_key
+
+
+class CountingClient:
+    """Minimal SpotifyClient stand-in that records every search."""
+
+    def __init__(self, catalog=None, fail=False):
+        self.catalog = catalog or {}
+        self.fail = fail
+        self.searches = []
+        self.track_ids = {}
+
+    def search_track(self, title, artist):
+        self.searches.append((title, artist))
+        if self.fail:
+            raise requests.exceptions.ConnectionError("down")
+        match = self.catalog.get(title)
+        if match:
+            self.track_ids[(title, artist)] = match["id"]
+        return match
+
+
+QUEEN = {"id": "q1", "external_urls": {"spotify": "https://open.spotify.com/track/q1"}}
+
+
+@pytest.mark.parametrize(
+    "title, artist",
+    [
+        ("Don't Stop Me Now", "Queen"),
+        ("Don’t Stop Me Now", "Queen"),
+        ("Don't Stop Me Now (Remastered)", "Queen"),
+        ("Don't Stop Me Now - Remastered 2011", "QUEEN"),
+        ("don't  stop me now", "Queen feat. Nobody"),
+    ],
+)
+def test_spelling_variants_share_a_key(title, artist):
+    assert track_key(title, artist) == track_key("Don't Stop Me Now", "Queen")
+
+
+def test_keys_fold_accents_dashes_and_leading_the():
+    assert title_key("Café—Del Mar") == title_key("cafe - del mar")
+    assert artist_key("The Beatles") == artist_key("Beatles")
+    assert artist_key("Simon & Garfunkel") == artist_key("Simon and Garfunkel")
+
+
+def test_title_key_keeps_title_when_only_suffix_present():
+    assert title_key("(Live)") == "live"
+
+
+def test_index_collapses_near_duplicates_into_one_request():
+    client = CountingClient({"Don't Stop Me Now": QUEEN})
+    index = TrackLookupIndex(client)
+
+    results = [
+        index.track_exists("Don't Stop Me Now", "Queen"),
+        index.track_exists("Don’t Stop Me Now", "Queen"),
+        index.track_exists("Don't Stop Me Now (Remastered)", "Queen"),
+        index.track_exists("Dont Stop Me Now!", "Queen"),
+    ]
+
+    assert len(client.searches) == 1
+    assert all(found for found, _ in results)
+    # Output text echoes the spelling that was asked for
+    assert results[1][1].startswith("Don’t Stop Me Now, Queen,")
+    assert client.track_ids[("Don’t Stop Me Now", "Queen")] == "q1"
+    assert index.stats()["requests"] == 1
+    assert index.hit_rate == pytest.approx(0.75)
+
+
+def test_index_fuzzy_matches_typos_by_same_artist_only():
+    client = CountingClient({"Bohemian Rhapsody": QUEEN})
+    index = TrackLookupIndex(client)
+
+    index.lookup("Bohemian Rhapsody", "Queen")
+    index.lookup("Bohemian Rapsody", "Queen")
+    index.lookup("Bohemian Rapsody", "Panic! at the Disco")
+
+    assert index.fuzzy_hits == 1
+    assert len(client.searches) == 2
+
+
+@pytest.mark.parametrize("known, other, artist", [
+    ("Symphony No. 5", "Symphony No. 6", "Beethoven"),
+    ("Another Brick in the Wall, Pt. 1", "Another Brick in the Wall, Pt. 2", "Pink Floyd"),
+    ("Another Brick in the Wall, Part I", "Another Brick in the Wall, Part II", "Pink Floyd"),
+])
+def test_index_never_fuzzy_matches_a_different_number(known, other, artist):
+    client = CountingClient({known: QUEEN})
+    index = TrackLookupIndex(client)
+
+    index.lookup(known, artist)
+    assert index.lookup(other, artist) is None
+
+    assert index.fuzzy_hits == 0
+    assert len(client.searches) == 2
+    assert list(client.track_ids) == [(known, artist)]
+
+
+def test_index_caches_misses_but_not_errors():
+    client = CountingClient()
+    index = TrackLookupIndex(client)
+    assert index.track_exists("Imaginary", "Nobody")[0] is False
+    assert index.track_exists("imaginary", "nobody")[0] is False
+    assert len(client.searches) == 1
+
+    client.fail = True
+    found, text = index.track_exists("Other", "Someone")
+    assert found is False and text.startswith("HTTP Error")
+    client.fail = False
+    index.track_exists("Other", "Someone")
+    assert client.searches[-1] == ("Other", "Someone")
+    assert len(client.searches) == 3
+
+
+class BlockingClient(CountingClient):
+    """Holds every search until `release` is set."""
+
+    def __init__(self, catalog=None, fail=False):
+        super().__init__(catalog, fail)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def search_track(self, title, artist):
+        self.started.set()
+        assert self.release.wait(5)
+        return super().search_track(title, artist)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_concurrent_identical_lookups_share_one_search():
+    client = BlockingClient({"Don't Stop Me Now": QUEEN})
+    index = TrackLookupIndex(client)
+    spellings = ["Don’t Stop Me Now", "Don't Stop Me Now (Remastered)", "DON'T STOP ME NOW", "Don't Stop Me Now"]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(index.track_exists, "Don't Stop Me Now", "Queen")
+        assert client.started.wait(5)
+        followers = [pool.submit(index.track_exists, t, "Queen") for t in spellings]
+        _wait_for(lambda: index.coalesced == len(spellings))
+        client.release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(client.searches) == 1
+    assert all(found for found, _ in results)
+    assert index.stats()["coalesced"] == 4
+    assert index.hit_rate == pytest.approx(0.8)
+    assert "4 coalesced" in index.format_stats()
+
+
+def test_coalesced_lookups_share_failure_without_caching_it():
+    client = BlockingClient(fail=True)
+    index = TrackLookupIndex(client)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(index.lookup, "Song", "Band")
+        assert client.started.wait(5)
+        follower = pool.submit(index.lookup, "song", "band")
+        _wait_for(lambda: index.coalesced == 1)
+        client.release.set()
+        for fut in (leader, follower):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                fut.result()
+
+    client.fail = False
+    assert index.lookup("Song", "Band") is None
+    assert len(client.searches) == 2